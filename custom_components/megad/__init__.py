@@ -1,13 +1,13 @@
 import asyncio
 import logging
 import sys
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional
 
 import async_timeout
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv, device_registry as dr
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.device_registry import DeviceInfo
@@ -16,21 +16,29 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator, UpdateFailed
 )
 from .const import (
-    TIME_UPDATE, DOMAIN, MANUFACTURER, COUNTER_CONNECT, PLATFORMS, ENTRIES,
-    CURRENT_ENTITY_IDS, STATUS_THERMO, TIME_SLEEP_REQUEST, OFF,
-    FIRMWARE_CHECKER, TIME_OUT_UPDATE_DATA_GENERAL,
+    DOMAIN, MANUFACTURER, COUNTER_CONNECT, PLATFORMS, ENTRIES,
+    CURRENT_ENTITY_IDS, STATUS_THERMO, OFF,
+    FIRMWARE_CHECKER, TIME_OUT_UPDATE_DATA_GENERAL, ORCHESTRATOR, ROUTER,
     WATCHDOG_CHECK_INTERVAL, WATCHDOG_PING_TIMEOUT, WATCHDOG_MAX_FAILURES,
-    WATCHDOG_RECOVERY_DELAY, WATCHDOG_INACTIVITY_TIMEOUT
+    WATCHDOG_RECOVERY_DELAY, WATCHDOG_INACTIVITY_TIMEOUT, POLL_INTERVALS,
+    PUSH_FIRST, PUSH_FRESHNESS, DEFAULT_PUSH_FIRST, DEFAULT_PUSH_FRESHNESS,
+    TIME_CONFIRM_UPDATE, COALESCE_WINDOWS, DEFAULT_COALESCE_WINDOWS,
+    REPLY_RULES, DEFAULT_REPLY_RULES, FEEDBACK_EVENT, EVENT_PORT_EDGE
 )
 from .core.base_ports import OneWireSensorPort, ReaderPort, PWMPortOut
 from .core.config_manager import MegaDConfigManager
 from .core.enums import ModeInMegaD, TypePortMegaD
 from .core.exceptions import InvalidSettingPort, FirmwareUpdateInProgress
-from .core.megad import MegaD
+from .core.ingest import IngestQueue, PortCoalescer
+from .core.megad import MegaD, port_key, FEEDBACK_KEY
 from .core.models_megad import DeviceMegaD, PIDConfig
+from .core.reply_rules import ReplyRules, parse_reply_rules
 from .core.request_to_ablogru import FirmwareChecker
+from .core.router import ControllerRouter
 from .core.server import MegadHttpView
-from .core.utils import get_action_turnoff
+from .core.transport import MegaDTransport
+from .core.utils import get_action_turnoff, parse_coalesce_windows
+from .orchestrator import PollOrchestrator
 from .watchdog import MegaDWatchdog
 
 _LOGGER = logging.getLogger(__name__)
@@ -181,7 +189,11 @@ async def async_setup(hass: HomeAssistant, config: dict):
                         message += f"• Счётчик ошибок: {status.get('failure_count', 0)}/{status.get('max_failures', 3)}\n"
                         message += f"• IP адрес: {status.get('megad_ip', 'unknown')}\n"
                         message += f"• Без данных: {status.get('inactivity_seconds', 0)} сек\n"
-                        
+                        message += "\nПоследние события:\n"
+                        for event in coordinator.watchdog.get_recent_events(10):
+                            message += (f"• {event['timestamp']} {event['type']}, "
+                                        f"порт {event['port_id']}: {event['detail']}\n")
+
                         from homeassistant.components import persistent_notification
                         persistent_notification.async_create(
                             hass,
@@ -497,6 +509,18 @@ async def async_setup(hass: HomeAssistant, config: dict):
                             message += "• ✅ Есть атрибут 'megad'\n"
                             if hasattr(coordinator.megad, 'id'):
                                 message += f"• ID контроллера: {coordinator.megad.id}\n"
+                            message += (f"• Регулятор запросов: "
+                                        f"{coordinator.megad.governor.get_stats()}\n")
+                            orchestrator = domain_data.get(ORCHESTRATOR)
+                            if orchestrator:
+                                cycle_stats = orchestrator.get_cycle_stats(entry_id)
+                                message += f"• Длительность цикла опроса, с: {cycle_stats}\n"
+                            message += (f"• Очередь событий: "
+                                        f"{coordinator.ingest.get_stats()}\n")
+                            message += (f"• Объединение событий: "
+                                        f"{coordinator.coalescer.get_stats()}\n")
+                            message += (f"• Ответы на события: "
+                                        f"{coordinator.reply_rules.get_stats()}\n")
                         else:
                             message += "• ❌ Нет атрибута 'megad'\n"
                             
@@ -675,8 +699,16 @@ async def async_setup_entry(
     file_path = config_entry.data.get('file_path')
     url = config_entry.data.get('url')
     
+    transport = MegaDTransport(
+        url, lambda coro: config_entry.async_create_background_task(
+            hass, coro, f'megad_transport_{entry_id}'
+        )
+    )
+    # Сессия и очередь транспорта создаются первым запросом, поэтому
+    # закрываются и при ошибке настройки (в т.ч. ConfigEntryNotReady)
+    config_entry.async_on_unload(transport.close)
     manager_config = MegaDConfigManager(
-        url, file_path, async_get_clientsession(hass)
+        url, file_path, async_get_clientsession(hass), transport
     )
     await manager_config.read_config_file(file_path)
     megad_config = await manager_config.create_config_megad()
@@ -685,6 +717,9 @@ async def async_setup_entry(
     hass.data[DOMAIN].setdefault(FIRMWARE_CHECKER, {})
     hass.data[DOMAIN].setdefault(ENTRIES, {})
     hass.data[DOMAIN][ENTRIES][entry_id] = None
+    if ORCHESTRATOR not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][ORCHESTRATOR] = PollOrchestrator(hass)
+    hass.data[DOMAIN].setdefault(ROUTER, ControllerRouter())
     
     if not hass.data[DOMAIN][FIRMWARE_CHECKER]:
         fw_checker = FirmwareChecker(hass)
@@ -698,18 +733,45 @@ async def async_setup_entry(
         config=megad_config,
         url=url,
         config_path=file_path,
-        fw_checker=hass.data[DOMAIN][FIRMWARE_CHECKER]
+        fw_checker=hass.data[DOMAIN][FIRMWARE_CHECKER],
+        poll_intervals=config_entry.data.get(POLL_INTERVALS),
+        push_first=config_entry.data.get(PUSH_FIRST, DEFAULT_PUSH_FIRST),
+        push_freshness=config_entry.data.get(
+            PUSH_FRESHNESS, DEFAULT_PUSH_FRESHNESS
+        ),
+        transport=transport
     )
     
     await megad.async_init_i2c_bus()
     await megad.check_local_software()
 
-    coordinator = MegaDCoordinator(hass=hass, megad=megad)
+    try:
+        coalesce_windows = parse_coalesce_windows(config_entry.data.get(
+            COALESCE_WINDOWS, DEFAULT_COALESCE_WINDOWS
+        ))
+    except ValueError as e:
+        _LOGGER.warning(f'MegaD-{megad.id}: окна объединения событий не '
+                        f'применены: {e}')
+        coalesce_windows = {}
+    try:
+        reply_rules = parse_reply_rules(config_entry.data.get(
+            REPLY_RULES, DEFAULT_REPLY_RULES
+        ))
+    except ValueError as e:
+        _LOGGER.warning(f'MegaD-{megad.id}: правила ответов на события не '
+                        f'применены: {e}')
+        reply_rules = {}
+
+    coordinator = MegaDCoordinator(
+        hass=hass, megad=megad, coalesce_windows=coalesce_windows,
+        reply_rules=reply_rules
+    )
     await coordinator.async_config_entry_first_refresh()
 
     hass.data[DOMAIN].setdefault(CURRENT_ENTITY_IDS, {})
     hass.data[DOMAIN][CURRENT_ENTITY_IDS][entry_id] = []
     hass.data[DOMAIN][ENTRIES][entry_id] = coordinator
+    hass.data[DOMAIN][ROUTER].add(entry_id, coordinator)
     
     # ✅ Регистрируем основное устройство
     device_registry = dr.async_get(hass)
@@ -736,6 +798,9 @@ async def async_setup_entry(
         config_entry, PLATFORMS
     )
     
+    # Периодический опрос запускает общий оркестратор
+    hass.data[DOMAIN][ORCHESTRATOR].register(config_entry, coordinator)
+
     current_entries_id = hass.data[DOMAIN][CURRENT_ENTITY_IDS][entry_id]
     remove_entity(hass, current_entries_id, config_entry)
     
@@ -760,6 +825,8 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     try:
         entry_id = entry.entry_id
         coordinator = hass.data[DOMAIN][ENTRIES].get(entry_id)
+        hass.data[DOMAIN][ROUTER].remove(entry_id)
+        await hass.data[DOMAIN][ORCHESTRATOR].unregister(entry_id)
         
         # Останавливаем watchdog перед выгрузкой
         if coordinator:
@@ -769,6 +836,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
             entry, PLATFORMS
         )
         hass.data[DOMAIN][ENTRIES].pop(entry_id)
+        if coordinator:
+            coordinator.coalescer.close()
+            await coordinator.ingest.close()
+            coordinator.cancel_scheduled_updates()
+            await coordinator.megad.transport.close()
 
         return unload_ok
     except Exception as e:
@@ -783,12 +855,15 @@ class MegaDCoordinator(DataUpdateCoordinator):
     _was_unavailable: bool = False
     _recovery_in_progress: bool = False
 
-    def __init__(self, hass, megad):
+    def __init__(self, hass, megad, coalesce_windows=None, reply_rules=None):
         super().__init__(
             hass,
             _LOGGER,
             name=f'MegaD Coordinator id: {megad.id}',
-            update_interval=timedelta(seconds=TIME_UPDATE),
+            # Опрос по таймеру выполняет PollOrchestrator
+            update_interval=None,
+            # Сущности уведомляются только об изменившихся портах
+            always_update=False,
         )
         self.megad: MegaD = megad
         self.watchdog: Optional[MegaDWatchdog] = None
@@ -797,6 +872,96 @@ class MegaDCoordinator(DataUpdateCoordinator):
         # Сохраняем базовый уникальный ID устройства
         self._device_unique_id = f"{DOMAIN}_{megad.id}"
 
+        # Изменения, ожидающие уведомления сущностей
+        self._pending_changes: set = set()
+        self._flush_handle: asyncio.Handle | None = None
+        self._confirm_changes: set = set()
+        self._confirm_handle: asyncio.TimerHandle | None = None
+
+        # События, присланные контроллером, обрабатываются по очереди
+        self.ingest = IngestQueue(f'MegaD-{megad.id}', self.process_push)
+        # Частые события портов с заданным окном объединяются до очереди
+        self.coalescer = PortCoalescer(
+            f'MegaD-{megad.id}', coalesce_windows or {}, self.ingest.put
+        )
+        # Команды, которые контроллер выполнит по ответу на своё событие
+        self.reply_rules = ReplyRules(reply_rules or {})
+
+    async def process_push(
+            self, port_id, data: dict, ext: bool, edges: tuple = (),
+            count: int = 0
+    ):
+        """
+        Обработка события порта из очереди.
+
+        :param edges: события окна объединения, из которых собрано data.
+        :param count: число событий окна (edges хранит только последние).
+        """
+        await self.update_port_state(port_id=port_id, data=data, ext=ext)
+        if edges:
+            self.fire_port_edges(port_id, edges, count)
+
+    @callback
+    def fire_port_edges(self, port_id, edges: tuple, count: int):
+        """
+        Передаёт в HA каждое событие окна объединения порта.
+
+        Состояние порта получает только итог окна (click=2 после click=1),
+        а автоматизации получают все фронты событиями EVENT_PORT_EDGE.
+        """
+        skipped = count - len(edges)
+        for index, params in enumerate(edges, skipped + 1):
+            self.hass.bus.async_fire(EVENT_PORT_EDGE, {
+                'megad_id': self.megad.id, 'port_id': int(port_id),
+                'edge': index, 'edges': count, 'params': params
+            })
+
+    def apply_reply(self, command: str):
+        """
+        Учитывает команду, отправленную контроллеру в ответе на его событие.
+
+        Известные значения выходов применяются сразу. Остальные порты
+        (переключение, группы, действия после паузы) читаются из очереди
+        событий, не дожидаясь цикла опроса, и опрашиваются в ближайшем
+        цикле ещё раз.
+        """
+        actions = self.reply_rules.get_actions(command)
+        changed = set()
+        reads = list(actions.ports)
+        for port_id, value in actions.values.items():
+            result = self.megad.apply_reply_value(port_id, value)
+            if result is None:
+                reads.append(port_id)
+            else:
+                changed |= result
+        for group in actions.groups:
+            reads.extend(self.megad.get_group_ports(group))
+        self.schedule_update(changed)
+        if not reads:
+            return
+        for port_id in dict.fromkeys(str(p).partition('e')[0] for p in reads):
+            self.megad.expedite_port(int(port_id))
+        self.ingest.put_call(self.process_reads, reads)
+
+    async def process_reads(self, port_ids: list):
+        """
+        Чтение портов, изменённых ответом контроллеру, из очереди.
+
+        Контроллер выполняет команду ответа до того, как примет следующее
+        соединение, поэтому запрос видит уже изменённые выходы.
+        """
+        changed = await self.megad.read_ports(port_ids)
+        _LOGGER.debug(f'MegaD-{self.megad.id}: прочитаны порты {port_ids}, '
+                      f'изменились {changed}')
+        self.schedule_update(changed)
+
+    async def process_bulk(self, status_ports: list[str], ext_states: dict):
+        """Обработка снимка состояний всех портов из очереди."""
+        changed = self.megad.apply_status(status_ports, ext_states)
+        _LOGGER.debug(f'MegaD-{self.megad.id}: снимок портов применён, '
+                      f'изменились {changed}')
+        self.schedule_update(changed)
+
     def device_base_info(self, suggested_area=None):
         """Базовый device_info для всего контроллера с поддержкой областей."""
         megad_id = self.megad.id
@@ -936,8 +1101,71 @@ class MegaDCoordinator(DataUpdateCoordinator):
         """Запрос обновления данных (совместимость с HA)."""
         _LOGGER.debug(f"Запрос принудительного обновления данных для MegaD-{self.megad.id}")
         await self.async_refresh()
-        # Немедленно обновляем слушателей
-        self.async_update_listeners()
+
+    @callback
+    def async_update_changed(self, changed: set, device: bool = False):
+        """
+        Уведомляет только сущности, подписанные на изменившиеся порты.
+
+        Контекст сущности - ключ порта (port_key, pid_key) или frozenset
+        ключей. Сущности без контекста показывают данные самого контроллера
+        и уведомляются только при device=True. Сенсоры watchdog подписаны
+        на FEEDBACK_KEY: он добавляется при каждом опросе и входящем запросе.
+        """
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                if device:
+                    update_callback()
+            elif isinstance(context, frozenset):
+                if not context.isdisjoint(changed):
+                    update_callback()
+            elif context in changed:
+                update_callback()
+
+    @callback
+    def schedule_update(self, changed: set, confirm: bool = False):
+        """
+        Планирует уведомление сущностей об изменившихся портах.
+
+        Все изменения за один проход цикла событий объединяются в одно
+        уведомление. При confirm=True через TIME_CONFIRM_UPDATE секунд
+        сущности уведомляются повторно; новый вызов переносит это
+        подтверждение, а не создаёт ещё одно.
+        """
+        if not changed:
+            return
+        self._pending_changes |= changed
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_soon(self._flush_changes)
+        if confirm:
+            self._confirm_changes |= changed
+            if self._confirm_handle is not None:
+                self._confirm_handle.cancel()
+            self._confirm_handle = self.hass.loop.call_later(
+                TIME_CONFIRM_UPDATE, self._flush_confirm
+            )
+
+    @callback
+    def _flush_changes(self):
+        self._flush_handle = None
+        changed, self._pending_changes = self._pending_changes, set()
+        self.async_update_changed(changed)
+
+    @callback
+    def _flush_confirm(self):
+        self._confirm_handle = None
+        changed, self._confirm_changes = self._confirm_changes, set()
+        self.async_update_changed(changed)
+
+    @callback
+    def cancel_scheduled_updates(self):
+        """Отменяет запланированные уведомления (выгрузка записи)."""
+        for handle in (self._flush_handle, self._confirm_handle):
+            if handle is not None:
+                handle.cancel()
+        self._flush_handle = self._confirm_handle = None
+        self._pending_changes.clear()
+        self._confirm_changes.clear()
     
     async def _async_update_data(self):
         """Обновление всех данных megad"""
@@ -962,12 +1190,15 @@ class MegaDCoordinator(DataUpdateCoordinator):
 
             self._count_connect = 0
             self.megad.is_available = True
+            self.async_update_changed(
+                self.megad.pop_changes() | {FEEDBACK_KEY}, device=True
+            )
 
             # ✅ ВАЖНОЕ ИСПРАВЛЕНИЕ: ОТМЕЧАЕМ ПОЛУЧЕНИЕ ДАННЫХ ДЛЯ WATCHDOG
             if self.watchdog:
                 self.watchdog.mark_data_received()
                 # ✅ ТАКЖЕ ОТМЕЧАЕМ КАК СОБЫТИЕ ОБРАТНОЙ СВЯЗИ
-                self.watchdog.mark_feedback_event({"type": "periodic_update", "source": "coordinator"})
+                self.watchdog.mark_feedback_event(FEEDBACK_EVENT.PERIODIC)
                 self.watchdog._failure_count = 0
                 self.watchdog._last_success = datetime.now()
                 self.watchdog._was_offline = False
@@ -1034,7 +1265,7 @@ class MegaDCoordinator(DataUpdateCoordinator):
                 # ✅ ОТМЕЧАЕМ ПОЛУЧЕНИЕ ДАННЫХ ДЛЯ WATCHDOG
                 if self.watchdog:
                     self.watchdog.mark_data_received()
-                    self.watchdog.mark_feedback_event({"type": "sync_update", "source": "force_sync"})
+                    self.watchdog.mark_feedback_event(FEEDBACK_EVENT.SYNC)
         except Exception as e:
             _LOGGER.error(f"Ошибка обновления данных при синхронизации: {e}")
     
@@ -1063,7 +1294,7 @@ class MegaDCoordinator(DataUpdateCoordinator):
                      f"feedback_enabled={self.watchdog._feedback_enabled}")
         
         # ✅ ИНИЦИАЛИЗИРУЕМ ПОСЛЕДНЕЕ СОБЫТИЕ ОБРАТНОЙ СВЯЗИ
-        self.watchdog.mark_feedback_event({"type": "initialization", "source": "start_watchdog"})
+        self.watchdog.mark_feedback_event(FEEDBACK_EVENT.INIT)
         
     async def stop_watchdog(self):
         """Остановка watchdog."""
@@ -1078,13 +1309,15 @@ class MegaDCoordinator(DataUpdateCoordinator):
         if self.watchdog:
             self.watchdog.mark_data_received()
             # ✅ ТАКЖЕ ОТМЕЧАЕМ КАК СОБЫТИЕ ОБРАТНОЙ СВЯЗИ
-            self.watchdog.mark_feedback_event({"type": "manual_mark", "source": "mark_watchdog_data_received"})
+            self.watchdog.mark_feedback_event(FEEDBACK_EVENT.MANUAL)
+            self.schedule_update({FEEDBACK_KEY})
             _LOGGER.debug(f"MegaD-{self.megad.id}: данные получены, watchdog обновлен")
     
     def mark_feedback_event(self, event_data=None):
         """Метод для отметки событий обратной связи."""
         if self.watchdog:
             self.watchdog.mark_feedback_event(event_data)
+            self.schedule_update({FEEDBACK_KEY})
             _LOGGER.debug(f"MegaD-{self.megad.id}: отмечено событие обратной связи")
     
     async def set_recovery_state(self, state: bool):
@@ -1100,34 +1333,31 @@ class MegaDCoordinator(DataUpdateCoordinator):
     async def set_flashing_state(self, state):
         """Устанавливает режим прошивки устройства."""
         self.megad.is_flashing = state
+        if not state:
+            self.megad.invalidate_static()
         self.hass.loop.call_soon(self.async_update_listeners)
         self.last_update_success = not state
 
-    async def _turn_off_state(self, state_off, delay, port_id, data):
+    def _turn_off_state(self, state_off, port_id):
         """Возвращает выключенное состояние порта."""
         # Определяем правильное значение выключения в зависимости от типа порта
         port = self.megad.get_port(port_id)
-        if port:
-            if isinstance(port, PWMPortOut):
-                # Для ШИМ портов выключение - это 0
-                state_off = 0
-        
-        self.megad.update_port(port_id, data)
-        self.hass.loop.call_soon(self.async_update_listeners)
-        await asyncio.sleep(delay)
-        self.megad.update_port(port_id, state_off)
-        self.hass.loop.call_soon(self.async_update_listeners)
+        if isinstance(port, PWMPortOut):
+            # Для ШИМ портов выключение - это 0
+            state_off = 0
+        changed = self.megad.update_port(port_id, state_off)
+        self.schedule_update(changed)
 
     def update_pid_state(self, pid_id: int, data: dict):
         """Обновление состояния ПИД регулятора."""
-        self.megad.update_pid(pid_id, data)
-        self.hass.loop.call_soon(self.async_update_listeners)
+        changed = self.megad.update_pid(pid_id, data)
+        self.schedule_update(changed)
 
     async def update_port_state(self, port_id, data, ext=False):
         """Обновление состояния конкретного порта с немедленной обратной связью."""
         _LOGGER.debug(f"Обновление состояния порта {port_id}: данные={data}, ext={ext}")
         
-        port = self.megad.get_port(port_id)
+        port = self.megad.get_port(port_id, ext=ext)
         if port is None:
             _LOGGER.warning(f"Порт {port_id} не найден")
             return
@@ -1164,26 +1394,11 @@ class MegaDCoordinator(DataUpdateCoordinator):
         try:
             # Для дополнительных портов
             if ext and isinstance(data, dict):
-                for key, value in data.items():
-                    if key.startswith('ext'):
-                        # Формируем правильный идентификатор доп. порта
-                        ext_id = int(key[3:])
-                        ext_port_id = f"{port_id}e{ext_id}"
-                        
-                        # ИСПРАВЛЕНИЕ: Если value - это словарь, извлекаем значение 'v'
-                        if isinstance(value, dict) and 'v' in value:
-                            actual_value = int(value['v'])
-                            _LOGGER.debug(f"Извлечение значения из JSON для доп. порта {ext_port_id}: {value} -> {actual_value}")
-                        else:
-                            actual_value = value
-                        
-                        # Обновляем состояние доп. порта
-                        self.megad.update_port(ext_port_id, actual_value)
-                        _LOGGER.debug(f"Обновление доп. порта {ext_port_id}: {actual_value}")
-                        
-                        # Обновляем состояние для дополнительных ШИМ портов
-                        if hasattr(port, '_state') and isinstance(port._state, dict):
-                            port._state[ext_id] = actual_value
+                # Для расширителя порт определяется по порту прерывания,
+                # состояния выводов передаются в параметрах extN
+                changed = self.megad.update_port(port.conf.id, data)
+                _LOGGER.debug(f"Обновление расширителя {port.conf.id}: "
+                              f"{data}")
             else:
                 # Для основных портов
                 # ИСПРАВЛЕНИЕ: Если data - это словарь для основного порта
@@ -1193,13 +1408,12 @@ class MegaDCoordinator(DataUpdateCoordinator):
                 else:
                     actual_data = data
                 
-                self.megad.update_port(port_id, actual_data)
+                changed = self.megad.update_port(port_id, actual_data)
                 _LOGGER.debug(f"Обновление основного порта {port_id}: {actual_data}")
                 
-                # Для ШИМ портов дополнительно обновляем через общий метод
+                # Состояние ШИМ порта выше уже записано вручную
                 if isinstance(port, PWMPortOut):
-                    # Вызываем update_port для мегада
-                    self.megad.update_port(port_id, actual_data)
+                    changed.add(port_key(port_id))
         except Exception as e:
             _LOGGER.error(f"Ошибка обновления состояния порта {port_id}: {e}")
             return
@@ -1214,39 +1428,14 @@ class MegaDCoordinator(DataUpdateCoordinator):
             # })
             # _LOGGER.debug(f"MegaD-{self.megad.id}: отмечено событие обратной связи для порта {port_id}")
 
-        # ВАЖНО: Многократно обновляем слушателей для немедленного отображения
-        # 1. Немедленно обновляем UI
-        self.async_update_listeners()
-        
-        # 2. Через event loop для гарантии
-        self.hass.loop.call_soon(self.async_update_listeners)
-        
-        # 3. Небольшая задержка и еще одно обновление
-        async def delayed_update():
-            await asyncio.sleep(0.1)
-            self.async_update_listeners()
-            _LOGGER.debug(f"Отложенное обновление UI для порта {port_id}")
-        
-        # Запускаем отложенное обновление
-        self.hass.async_create_task(delayed_update())
-        
-        # 4. Обновляем через refresh для синхронизации с контроллером
-        async def refresh_and_update():
-            await asyncio.sleep(2)
-            try:
-                # await self.async_refresh()
-                self.async_update_listeners()
-                _LOGGER.debug(f"Обновление данных с контроллера для порта {port_id}")
-            except Exception as e:
-                _LOGGER.error(f"Ошибка при обновлении данных с контроллера: {e}")
-        
-        self.hass.async_create_task(refresh_and_update())
-        
+        # Одно уведомление за проход цикла событий и одно подтверждение
+        self.schedule_update(changed, confirm=True)
         _LOGGER.debug(f"Состояние порта {port_id} обновлено, UI уведомлен")
 
-        # Если это порт в режиме C или ReaderPort, добавляем задержку выключения
+        # Если это порт в режиме C или ReaderPort, добавляем задержку выключения.
+        # Выключение планируется отдельно, чтобы не задерживать очередь событий
         if isinstance(port, ReaderPort) or (hasattr(port.conf, 'mode') and port.conf.mode == ModeInMegaD.C):
-            await self._turn_off_state('off', 0.5, port_id, data)
+            self.hass.loop.call_later(0.5, self._turn_off_state, 'off', port_id)
 
     def update_set_temperature(self, port_id, temperature):
         """Обновление заданной температуры порта сенсора"""
@@ -1254,16 +1443,17 @@ class MegaDCoordinator(DataUpdateCoordinator):
         if isinstance(port, OneWireSensorPort):
             port.conf.set_value = temperature
             _LOGGER.debug(f"Обновлена температура порта {port_id}: {temperature}")
-            self.hass.loop.call_soon(self.async_update_listeners)
+            self.schedule_update({port_key(port_id)})
         else:
             raise InvalidSettingPort(f'Проверьте настройки порта №{port_id}')
 
     def update_group_state(self, port_states: dict[int, str]):
         """Обновление состояний портов в группе"""
         _LOGGER.debug(f"Обновление группы портов: {port_states}")
+        changed = set()
         for port_id, state in port_states.items():
-            self.megad.update_port(port_id, state)
-        self.hass.loop.call_soon(self.async_update_listeners)
+            changed |= self.megad.update_port(port_id, state)
+        self.schedule_update(changed)
 
     async def restore_thermo(self, port):
         """Восстановление состояния терморегулятора после перезагрузки плк"""
@@ -1271,7 +1461,6 @@ class MegaDCoordinator(DataUpdateCoordinator):
             port.conf.id, port.conf.set_value
         )
         if not port.state[STATUS_THERMO]:
-            await asyncio.sleep(TIME_SLEEP_REQUEST)
             await self.megad.set_port(port.conf.id, OFF)
             await self.megad.send_command(get_action_turnoff(port.conf.action))
 
@@ -10,10 +10,10 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from . import MegaDCoordinator
-from .const import DOMAIN, ENTRIES, CURRENT_ENTITY_IDS
+from .const import DOMAIN, ENTRIES, CURRENT_ENTITY_IDS, FEEDBACK_EVENT
 from .core.base_ports import BinaryPortIn, I2CExtraMCP230xx
 from .core.enums import DeviceClassBinary
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key
 from .core.models_megad import MCP230PortInConfig
 
 _LOGGER = logging.getLogger(__name__)
@@ -66,7 +66,7 @@ class BinarySensorMegaD(CoordinatorEntity, BinarySensorEntity):
     _attr_has_entity_name = True  # ✅ ДОБАВИТЬ ЭТУ СТРОКУ
 
     def __init__(self, coordinator: MegaDCoordinator, port: BinaryPortIn, unique_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._megad: MegaD = coordinator.megad
         self._port: BinaryPortIn = port
         self._attr_unique_id = unique_id
@@ -139,11 +139,6 @@ class BinarySensorMegaD(CoordinatorEntity, BinarySensorEntity):
         """Вызывается когда сущность добавлена в HA."""
         await super().async_added_to_hass()
         
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
-        
         # Инициализируем последнее состояние
         self._last_state = self.is_on
         
@@ -156,12 +151,10 @@ class BinarySensorMegaD(CoordinatorEntity, BinarySensorEntity):
         
         # ✅ СРАЗУ ОТМЕЧАЕМ АКТИВНОСТЬ ПРИ СОЗДАНИИ
         if hasattr(self.coordinator, 'watchdog') and self.coordinator.watchdog:
-            self.coordinator.watchdog.mark_feedback_event({
-                "type": "binary_sensor_created",
-                "entity_id": self.entity_id,
-                "port_id": self._port.conf.id,
-                "initial_state": self._last_state
-            })
+            self.coordinator.watchdog.mark_feedback_event(
+                FEEDBACK_EVENT.SENSOR_CREATED, self._port.conf.id,
+                self._last_state
+            )
     
     def _handle_coordinator_update(self) -> None:
         """Обработчик обновлений от координатора."""
@@ -178,14 +171,10 @@ class BinarySensorMegaD(CoordinatorEntity, BinarySensorEntity):
                 
                 # ✅ ТАКЖЕ ОТМЕЧАЕМ КАК СОБЫТИЕ ОБРАТНОЙ СВЯЗИ
                 # (бинарные сенсоры часто меняют состояние при взаимодействии)
-                self.coordinator.watchdog.mark_feedback_event({
-                    "type": "binary_sensor_update",
-                    "entity_id": self.entity_id,
-                    "port_id": self._port.conf.id,
-                    "old_state": self._last_state,
-                    "new_state": current_state,
-                    "sensor_type": "binary"
-                })
+                self.coordinator.watchdog.mark_feedback_event(
+                    FEEDBACK_EVENT.SENSOR_UPDATE, self._port.conf.id,
+                    current_state
+                )
                 
                 _LOGGER.debug(f"Watchdog отмечен для binary sensor {self.entity_id}")
         
@@ -215,10 +204,9 @@ class BinarySensorMegaD(CoordinatorEntity, BinarySensorEntity):
         
         # Добавляем информацию о watchdog
         if hasattr(self.coordinator, 'watchdog') and self.coordinator.watchdog:
-            if hasattr(self.coordinator.watchdog, '_last_incoming_data'):
-                last_data = self.coordinator.watchdog._last_incoming_data
-                if last_data:
-                    attributes["watchdog_last_data"] = last_data.isoformat()
+            last_data = self.coordinator.watchdog.get_last_data_time()
+            if last_data:
+                attributes["watchdog_last_data"] = last_data.isoformat()
         
         return attributes
 
@@ -235,7 +223,10 @@ class BinarySensorExtraMegaD(CoordinatorEntity, BinarySensorEntity):
             config_extra_port: MCP230PortInConfig,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=port_key(port.conf.id, config_extra_port.id)
+        )
         self._megad: MegaD = coordinator.megad
         self._port = port
         self._config_extra_port = config_extra_port
@@ -303,11 +294,6 @@ class BinarySensorExtraMegaD(CoordinatorEntity, BinarySensorEntity):
         """Вызывается когда сущность добавлена в HA."""
         await super().async_added_to_hass()
         
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
-        
         # Инициализируем последнее состояние
         self._last_state = self.is_on
         
@@ -378,9 +364,8 @@ class BinarySensorExtraMegaD(CoordinatorEntity, BinarySensorEntity):
         
         # Добавляем информацию о watchdog
         if hasattr(self.coordinator, 'watchdog') and self.coordinator.watchdog:
-            if hasattr(self.coordinator.watchdog, '_last_incoming_data'):
-                last_data = self.coordinator.watchdog._last_incoming_data
-                if last_data:
-                    attributes["watchdog_last_data"] = last_data.isoformat()
+            last_data = self.coordinator.watchdog.get_last_data_time()
+            if last_data:
+                attributes["watchdog_last_data"] = last_data.isoformat()
         
         return attributes
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from propcache import cached_property
@@ -14,14 +13,14 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from . import MegaDCoordinator
 from .const import (
     DOMAIN, ENTRIES, CURRENT_ENTITY_IDS, TEMPERATURE_CONDITION, TEMPERATURE,
-    OFF, ON, STATUS_THERMO, DIRECTION, PID_OFF, TIME_SLEEP_REQUEST, INPUT_PID,
+    OFF, ON, STATUS_THERMO, DIRECTION, PID_OFF, INPUT_PID,
     TARGET_TEMP
 )
 from .core.base_pids import PIDControl
 from .core.base_ports import OneWireSensorPort
 from .core.enums import ModePIDMegaD
 from .core.exceptions import TemperatureOutOfRangeError
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key, pid_key
 from .core.utils import get_action_turnoff
 
 
@@ -75,7 +74,7 @@ class BaseClimateEntity(CoordinatorEntity, ClimateEntity):
             self, coordinator: MegaDCoordinator, port: OneWireSensorPort,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port: OneWireSensorPort = port
@@ -121,13 +120,10 @@ class BaseClimateEntity(CoordinatorEntity, ClimateEntity):
     @property
     def current_temperature(self):
         """Возвращает текущую температуру."""
-        current_temperature = None
-        try:
-            current_temperature = float(self._port.state[TEMPERATURE])
-        except KeyError:
+        if TEMPERATURE not in self._port.readings:
             _LOGGER.warning(f'{self.entity_id} не инициализирован. Проверьте '
                             f'доступность контроллера с id: {self._megad.id}')
-        return current_temperature
+        return self._port.get_value(TEMPERATURE)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Устанавливает режим HVAC."""
@@ -139,7 +135,6 @@ class BaseClimateEntity(CoordinatorEntity, ClimateEntity):
         else:
             await self._megad.set_port(self._port.conf.id, OFF)
             actions_off = get_action_turnoff(self._port.conf.action)
-            await asyncio.sleep(TIME_SLEEP_REQUEST)
             await self._megad.send_command(actions_off)
             for action in actions_off.split(';'):
                 if action:
@@ -238,7 +233,9 @@ class PIDClimateEntity(CoordinatorEntity, ClimateEntity):
             self, coordinator: MegaDCoordinator, pid: PIDControl,
             port: OneWireSensorPort, unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset(
+            (pid_key(pid.conf.id), port_key(port.conf.id))
+        ))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._pid: PIDControl = pid
@@ -293,13 +290,10 @@ class PIDClimateEntity(CoordinatorEntity, ClimateEntity):
     @property
     def current_temperature(self):
         """Возвращает текущую температуру."""
-        current_temperature = None
-        try:
-            current_temperature = float(self._port.state[TEMPERATURE])
-        except KeyError:
+        if TEMPERATURE not in self._port.readings:
             _LOGGER.warning(f'{self.entity_id} не инициализирован. Проверьте '
                             f'доступность контроллера с id: {self._megad.id}')
-        return current_temperature
+        return self._port.get_value(TEMPERATURE)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Устанавливает режим HVAC."""
@@ -311,7 +305,6 @@ class PIDClimateEntity(CoordinatorEntity, ClimateEntity):
         else:
             await self._megad.turn_off_pid(self._pid.conf.id)
             if self._megad.get_port(self._pid.conf.output).state:
-                await asyncio.sleep(TIME_SLEEP_REQUEST)
                 await self._megad.set_port(self._pid.conf.output, OFF)
             self._coordinator.update_pid_state(
                 self._pid.conf.id, {INPUT_PID: PID_OFF}
@@ -17,7 +17,11 @@ from homeassistant.core import callback, HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import selector
 from .const import (
-    DOMAIN, PATH_CONFIG_MEGAD, DEFAULT_IP, DEFAULT_PASSWORD, ENTRIES
+    DOMAIN, PATH_CONFIG_MEGAD, DEFAULT_IP, DEFAULT_PASSWORD, ENTRIES,
+    POLL_INTERVALS, DEFAULT_POLL_INTERVALS, POLL_MIN_INTERVAL,
+    POLL_MAX_INTERVAL, PUSH_FIRST, PUSH_FRESHNESS, DEFAULT_PUSH_FIRST,
+    DEFAULT_PUSH_FRESHNESS, COALESCE_WINDOWS, DEFAULT_COALESCE_WINDOWS,
+    REPLY_RULES, DEFAULT_REPLY_RULES
 )
 from .core.config_manager import MegaDConfigManager
 from .core.config_parser import (
@@ -27,10 +31,13 @@ from .core.const_fw import DEFAULT_IP_LIST
 from .core.exceptions import (
     WriteConfigError, InvalidPassword, InvalidAuthorized, InvalidSlug,
     InvalidIpAddressExist, NotAvailableURL, SearchMegaDError, InvalidIpAddress,
-    InvalidPasswordMegad, ChangeIPMegaDError, InvalidMegaDID
+    InvalidPasswordMegad, ChangeIPMegaDError, InvalidMegaDID, MegaDBusy
 )
+from .core.reply_rules import parse_reply_rules
+from .core.transport import MegaDTransport
 from .core.utils import (
-    get_list_config_megad, get_broadcast_ip, get_megad_ip, change_ip
+    get_list_config_megad, get_broadcast_ip, get_megad_ip, change_ip,
+    parse_coalesce_windows
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -113,6 +120,13 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
     """Базовый класс для ConfigFlow и OptionsFlow."""
 
     data = {}
+    _read_task: asyncio.Task | None = None
+    _read_name_file: str = ''
+    _read_error: str = ''
+    _write_task: asyncio.Task | None = None
+    _write_name_file: str = ''
+    _write_only_changes: bool = True
+    _write_error: str = ''
 
     def get_path_to_config(self, name_config='') -> str:
         """Возвращает путь до каталога с настройками контроллера"""
@@ -121,6 +135,14 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
         path = os.path.join(configs_path, name_config)
         return str(path)
 
+    def get_transport(self) -> MegaDTransport | None:
+        """Транспорт уже работающего контроллера (только для опций)."""
+        if not self.data.get('options'):
+            return None
+        entries = self.hass.data.get(DOMAIN, {}).get(ENTRIES, {})
+        coordinator = entries.get(self.config_entry.entry_id)
+        return coordinator.megad.transport if coordinator else None
+
     def data_schema_main(self):
         return vol.Schema(
                 {
@@ -165,6 +187,8 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
                 return await self.async_step_select_config()
             if user_input.get('config_menu') == 'write_config':
                 return await self.async_step_write_config()
+            if user_input.get('config_menu') == 'poll_settings':
+                return await self.async_step_poll_settings()
 
         menu = {
             'read_config': 'Прочитать конфигурацию с MegaD',
@@ -176,6 +200,8 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
         )
         if not config_list:
             menu = {'read_config': 'Прочитать конфигурацию с MegaD'}
+        if self.data.get('options'):
+            menu['poll_settings'] = 'Настроить интервалы опроса портов'
 
         return self.async_show_form(
             step_id='get_config',
@@ -205,7 +231,9 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
                 self.data['name_file'] = name_file
                 _LOGGER.debug(f'file_path: {file_path}')
                 _LOGGER.debug(f'name_file: {name_file}')
-                manager_config = MegaDConfigManager(url, file_path, session)
+                manager_config = MegaDConfigManager(
+                    url, file_path, session, self.get_transport()
+                )
                 await manager_config.read_config_file(file_path)
                 await validate_megad_id(manager_config.get_mega_id())
                 megad_config = await manager_config.create_config_megad()
@@ -274,25 +302,10 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
             _LOGGER.debug(f'step_read_config: {user_input}')
             if user_input.get('return_main_menu', False):
                 return await self.async_step_get_config()
-            try:
-                name_file = user_input.get('name_file')
-                config_path = self.get_path_to_config(name_file)
-                config_manager = MegaDConfigManager(
-                    self.data['url'],
-                    config_path,
-                    async_get_clientsession(self.hass)
-                )
-                await config_manager.read_config()
-                await config_manager.save_config_to_file()
-                self.data['name_file'] = name_file
-                return await self.async_step_select_config()
-            except aiohttp.ClientError as e:
-                _LOGGER.error(f'Ошибка запроса к контроллеру '
-                              f'при чтении конфигурации {e}')
-                errors['base'] = 'read_config_error'
-            except Exception as e:
-                _LOGGER.error(f'Что-то пошло не так, неизвестная ошибка. {e}')
-                errors["base"] = "unknown"
+            self._read_name_file = user_input.get('name_file')
+            return await self.async_step_read_config_progress()
+        if self._read_error:
+            errors['base'], self._read_error = self._read_error, ''
 
         return self.async_show_form(
             step_id='read_config',
@@ -300,6 +313,50 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
             errors=errors
         )
 
+    async def _read_config(self, config_manager: MegaDConfigManager):
+        """Чтение конфигурации в фоне, ход чтения показывается в форме."""
+
+        def progress(done: int, total: int):
+            if hasattr(self, 'async_update_progress'):
+                self.async_update_progress(done / total)
+
+        await config_manager.read_config(progress)
+        await config_manager.save_config_to_file()
+
+    async def async_step_read_config_progress(self, user_input=None):
+        """Ход считывания конфигурации контроллера"""
+        if self._read_task is None:
+            config_manager = MegaDConfigManager(
+                self.data['url'],
+                self.get_path_to_config(self._read_name_file),
+                async_get_clientsession(self.hass),
+                self.get_transport()
+            )
+            self._read_task = self.hass.async_create_task(
+                self._read_config(config_manager)
+            )
+        if not self._read_task.done():
+            return self.async_show_progress(
+                step_id='read_config_progress',
+                progress_action='read_config',
+                progress_task=self._read_task
+            )
+
+        task, self._read_task = self._read_task, None
+        try:
+            task.result()
+        except (aiohttp.ClientError, MegaDBusy) as e:
+            _LOGGER.error(f'Ошибка запроса к контроллеру '
+                          f'при чтении конфигурации {e}')
+            self._read_error = 'read_config_error'
+        except Exception as e:
+            _LOGGER.error(f'Что-то пошло не так, неизвестная ошибка. {e}')
+            self._read_error = 'unknown'
+        else:
+            self.data['name_file'] = self._read_name_file
+            return self.async_show_progress_done(next_step_id='select_config')
+        return self.async_show_progress_done(next_step_id='read_config')
+
     async def async_step_write_config(self, user_input=None):
         """Выбор конфигурации контроллера для записи в него"""
         errors: dict[str, str] = {}
@@ -309,23 +366,11 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
             _LOGGER.debug(f'step_write_config: {user_input}')
             if user_input.get('return_main_menu', False):
                 return await self.async_step_get_config()
-            try:
-                name_file = user_input.get('config_list')
-                config_path = self.get_path_to_config(name_file)
-                _LOGGER.debug(f'file_path: {config_path}')
-                _LOGGER.debug(f'name_file: {name_file}')
-                config_manager = MegaDConfigManager(
-                    self.data['url'],
-                    config_path,
-                    async_get_clientsession(self.hass)
-                )
-                await config_manager.read_config_file(config_path)
-                await config_manager.upload_config(timeout=0.2)
-                return await self.async_step_get_config()
-            except WriteConfigError as e:
-                _LOGGER.error(f'Ошибка записи конфигурации в контроллер: {e}')
-            except Exception as e:
-                _LOGGER.error(f'Что-то пошло не так, неизвестная ошибка. {e}')
+            self._write_name_file = user_input.get('config_list')
+            self._write_only_changes = user_input.get('only_changes', True)
+            return await self.async_step_write_config_progress()
+        if self._write_error:
+            errors['base'], self._write_error = self._write_error, ''
 
         config_list = await get_list_config_megad(
             name_file, self.get_path_to_config()
@@ -335,12 +380,73 @@ class MegaDBaseFlow(config_entries.ConfigEntryBaseFlow):
             data_schema=vol.Schema(
                 {
                     vol.Required('config_list'): vol.In(config_list),
+                    vol.Optional(schema='only_changes', default=True): bool,
                     vol.Optional(schema="return_main_menu"): bool
                 }
             ),
             errors=errors
         )
 
+    async def _write_config(
+            self, config_manager: MegaDConfigManager, only_changes: bool):
+        """
+        Запись конфигурации в фоне, ход показывается в форме.
+
+        Для записи только изменений сначала читается текущая конфигурация
+        контроллера - первая половина хода, запись - вторая.
+        """
+        share = 0.5 if only_changes else 1.0
+
+        def progress(start: float):
+            def update(done: int, total: int):
+                if hasattr(self, 'async_update_progress'):
+                    self.async_update_progress(start + share * done / total)
+            return update
+
+        await config_manager.read_config_file(config_manager.config_file_path)
+        current = None
+        if only_changes:
+            current = await config_manager.read_current_settings(progress(0))
+        await config_manager.upload_config(
+            timeout=0.2, diff=only_changes, current=current,
+            progress=progress(1 - share)
+        )
+
+    async def async_step_write_config_progress(self, user_input=None):
+        """Ход записи конфигурации в контроллер"""
+        if self._write_task is None:
+            config_path = self.get_path_to_config(self._write_name_file)
+            _LOGGER.debug(f'file_path: {config_path}')
+            _LOGGER.debug(f'name_file: {self._write_name_file}')
+            config_manager = MegaDConfigManager(
+                self.data['url'],
+                config_path,
+                async_get_clientsession(self.hass),
+                self.get_transport()
+            )
+            self._write_task = self.hass.async_create_task(
+                self._write_config(config_manager, self._write_only_changes)
+            )
+        if not self._write_task.done():
+            return self.async_show_progress(
+                step_id='write_config_progress',
+                progress_action='write_config',
+                progress_task=self._write_task
+            )
+
+        task, self._write_task = self._write_task, None
+        try:
+            task.result()
+        except (WriteConfigError, aiohttp.ClientError, MegaDBusy) as e:
+            _LOGGER.error(f'Ошибка записи конфигурации в контроллер: {e}')
+            self._write_error = 'write_config_error'
+        except Exception as e:
+            _LOGGER.error(f'Что-то пошло не так, неизвестная ошибка. {e}')
+            self._write_error = 'unknown'
+        else:
+            return self.async_show_progress_done(next_step_id='get_config')
+        return self.async_show_progress_done(next_step_id='write_config')
+
 
 class MegaDConfigFlow(MegaDBaseFlow, config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
@@ -558,3 +664,89 @@ class OptionsFlowHandler(MegaDBaseFlow, config_entries.OptionsFlow):
             data_schema=self.data_schema_main(),
             errors=errors
         )
+
+    def data_schema_poll_settings(self):
+        intervals = dict(DEFAULT_POLL_INTERVALS)
+        intervals.update(self.data.get(POLL_INTERVALS, {}))
+        schema = {
+            vol.Required(schema=poll_class, default=interval): vol.All(
+                vol.Coerce(int),
+                vol.Range(min=POLL_MIN_INTERVAL, max=POLL_MAX_INTERVAL)
+            )
+            for poll_class, interval in intervals.items()
+            if poll_class in DEFAULT_POLL_INTERVALS
+        }
+        schema[vol.Required(
+            schema=PUSH_FIRST,
+            default=self.data.get(PUSH_FIRST, DEFAULT_PUSH_FIRST)
+        )] = bool
+        schema[vol.Required(
+            schema=PUSH_FRESHNESS,
+            default=self.data.get(PUSH_FRESHNESS, DEFAULT_PUSH_FRESHNESS)
+        )] = vol.All(
+            vol.Coerce(int),
+            vol.Range(min=POLL_MIN_INTERVAL, max=POLL_MAX_INTERVAL)
+        )
+        schema[vol.Optional(
+            schema=COALESCE_WINDOWS,
+            default=self.data.get(COALESCE_WINDOWS, DEFAULT_COALESCE_WINDOWS)
+        )] = str
+        schema[vol.Optional(
+            schema=REPLY_RULES,
+            default=self.data.get(REPLY_RULES, DEFAULT_REPLY_RULES)
+        )] = selector({'text': {'multiline': True}})
+        schema[vol.Optional(schema="return_main_menu")] = bool
+        return vol.Schema(schema)
+
+    async def async_step_poll_settings(self, user_input=None):
+        """Настройка интервалов опроса портов по классам"""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            _LOGGER.debug(f'step_poll_settings: {user_input}')
+            if user_input.pop('return_main_menu', False):
+                return await self.async_step_get_config()
+            coalesce_windows = user_input.get(
+                COALESCE_WINDOWS, DEFAULT_COALESCE_WINDOWS
+            ).strip()
+            reply_rules = user_input.get(
+                REPLY_RULES, DEFAULT_REPLY_RULES
+            ).strip()
+            try:
+                parse_coalesce_windows(coalesce_windows)
+            except ValueError as e:
+                _LOGGER.warning(f'Неверные окна объединения событий '
+                                f'{coalesce_windows}: {e}')
+                errors['base'] = 'invalid_coalesce_windows'
+            try:
+                parse_reply_rules(reply_rules)
+            except ValueError as e:
+                _LOGGER.warning(f'Неверные правила ответов на события '
+                                f'{reply_rules}: {e}')
+                errors['base'] = 'invalid_reply_rules'
+            if not errors:
+                self.data[POLL_INTERVALS] = {
+                    poll_class: int(interval)
+                    for poll_class, interval in user_input.items()
+                    if poll_class in DEFAULT_POLL_INTERVALS
+                }
+                self.data[PUSH_FIRST] = user_input.get(
+                    PUSH_FIRST, DEFAULT_PUSH_FIRST
+                )
+                self.data[PUSH_FRESHNESS] = int(user_input.get(
+                    PUSH_FRESHNESS, DEFAULT_PUSH_FRESHNESS
+                ))
+                self.data[COALESCE_WINDOWS] = coalesce_windows
+                self.data[REPLY_RULES] = reply_rules
+                self.hass.config_entries.async_update_entry(
+                    self.config_entry, data=self.data
+                )
+                return self.async_create_entry(
+                    title=self.config_entry.title,
+                    data=self.data
+                )
+
+        return self.async_show_form(
+            step_id='poll_settings',
+            data_schema=self.data_schema_poll_settings(),
+            errors=errors
+        )
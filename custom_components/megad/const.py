@@ -13,16 +13,91 @@ MANUFACTURER = 'ab-log'
 ENTRIES = 'entries'
 CURRENT_ENTITY_IDS = 'current_entity_ids'
 FIRMWARE_CHECKER = 'firmware_checker'
+ORCHESTRATOR = 'orchestrator'
+ROUTER = 'router'
 
 # Таймауты
 TIME_UPDATE = 60
+TIME_UPDATE_TELEMETRY = 300
+TIME_REUSE_REQUEST = 0.5
+TIME_CONFIRM_UPDATE = 2
+TRANSPORT_CONNECT_TIMEOUT = 2
+TRANSPORT_KEEPALIVE = 15
+
+# Приоритеты запросов к контроллеру (меньше - раньше)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_WEBHOOK = 1
+PRIORITY_POLL = 2
 TIME_OUT_UPDATE_DATA = 5
 TIME_OUT_UPDATE_DATA_GENERAL = 30
-TIME_SLEEP_REQUEST = 0.2
-TIME_DISPLAY = 0.3
 
 COUNTER_CONNECT = 4
 
+# Регулятор частоты запросов к контроллеру (запросов в секунду)
+GOVERNOR_START_RATE = 5.0
+GOVERNOR_MIN_RATE = 0.5
+GOVERNOR_MAX_RATE = 20.0
+GOVERNOR_BURST = 2
+GOVERNOR_INCREASE = 0.5
+GOVERNOR_DECREASE = 0.5
+GOVERNOR_SLOW_DECREASE = 0.9
+GOVERNOR_TARGET_LATENCY = 0.3
+# Сколько токенов могут занять команды пользователя сверх запаса
+GOVERNOR_BORROW = 2
+# Повторы команды, на которую контроллер ответил busy
+GOVERNOR_BUSY_RETRIES = 1
+
+# Планировщик опроса портов
+POLL_INTERVALS = 'poll_intervals'
+POLL_MIN_INTERVAL = 10
+POLL_MAX_INTERVAL = 3600
+
+# Режим приоритета push-уведомлений контроллера над опросом
+PUSH_FIRST = 'push_first'
+PUSH_FRESHNESS = 'push_freshness'
+DEFAULT_PUSH_FIRST = False
+DEFAULT_PUSH_FRESHNESS = 300
+
+# Классы портов для планировщика опроса
+POLL_CLASS_RELAY = 'relay'
+POLL_CLASS_INPUT = 'input'
+POLL_CLASS_ONE_WIRE = 'one_wire'
+POLL_CLASS_ONE_WIRE_BUS = 'one_wire_bus'
+POLL_CLASS_ANALOG = 'analog'
+POLL_CLASS_I2C_SENSOR = 'i2c_sensor'
+POLL_CLASS_I2C_CO2 = 'i2c_co2'
+POLL_CLASS_EXTENDER = 'extender'
+POLL_CLASS_THERMOSTAT = 'thermostat'
+POLL_CLASS_PID = 'pid'
+
+# Интервалы опроса по умолчанию (в секундах)
+DEFAULT_POLL_INTERVALS = {
+    POLL_CLASS_RELAY: 300,
+    POLL_CLASS_INPUT: 120,
+    POLL_CLASS_ONE_WIRE: 60,
+    POLL_CLASS_ONE_WIRE_BUS: 60,
+    POLL_CLASS_ANALOG: 60,
+    POLL_CLASS_I2C_SENSOR: 120,
+    POLL_CLASS_I2C_CO2: 300,
+    POLL_CLASS_EXTENDER: 300,
+    POLL_CLASS_THERMOSTAT: 900,
+    POLL_CLASS_PID: 300,
+}
+
+# Приоритеты классов при одинаковом сроке опроса (меньше - раньше)
+POLL_PRIORITIES = {
+    POLL_CLASS_ONE_WIRE: 0,
+    POLL_CLASS_ONE_WIRE_BUS: 0,
+    POLL_CLASS_ANALOG: 1,
+    POLL_CLASS_INPUT: 1,
+    POLL_CLASS_THERMOSTAT: 2,
+    POLL_CLASS_PID: 2,
+    POLL_CLASS_I2C_SENSOR: 3,
+    POLL_CLASS_EXTENDER: 3,
+    POLL_CLASS_I2C_CO2: 4,
+    POLL_CLASS_RELAY: 5,
+}
+
 PATH_CONFIG_MEGAD = 'custom_components/config_megad/'
 RELEASE_URL = 'https://ab-log.ru/smart-house/ethernet/megad-2561-firmware'
 BASE_URL = 'https://ab-log.ru/'
@@ -140,6 +215,7 @@ ON = 1
 OFF = 0
 PID_OFF = 255
 GET_STATUS = 'get'
+GET_ID = 'id'
 
 # Параметры ответа MegaD
 MEGAD_ID = 'mdid'
@@ -157,6 +233,14 @@ TYPE_SENSOR = TypeSensor(
     TEMPERATURE='temp', HUMIDITY='hum', CO2='CO2', PRESSURE='press',
 )
 
+# Качество показаний сенсоров
+ReadingQuality = namedtuple('ReadingQuality', [
+    'OK', 'NA', 'BUSY', 'FILTERED'
+])
+READING_QUALITY = ReadingQuality(
+    OK='ok', NA='na', BUSY='busy', FILTERED='filtered'
+)
+
 StateButton = namedtuple('StateButton', ['SINGLE', 'DOUBLE', 'LONG', 'OFF'])
 STATE_BUTTON = StateButton(SINGLE="single", DOUBLE="double", LONG="long", OFF="off")
 
@@ -243,6 +327,37 @@ WATCHDOG_CHECK_INTERVAL = 60  # Интервал проверки (в секун
 WATCHDOG_FEEDBACK_TIMEOUT = 600  # Таймаут обратной связи (в секундах)
 WATCHDOG_PING_TIMEOUT = 2  # Таймаут ping (в секундах)
 WATCHDOG_RECOVERY_DELAY = 60  # Задержка после восстановления (в секундах)
+WATCHDOG_EVENT_HISTORY = 64  # Последних событий обратной связи для диагностики
+
+# Виды событий обратной связи watchdog
+FeedbackEvent = namedtuple('FeedbackEvent', [
+    'CALLBACK', 'POST', 'RESTORE', 'PERIODIC', 'SYNC', 'INIT', 'MANUAL',
+    'SENSOR_CREATED', 'SENSOR_UPDATE'
+])
+FEEDBACK_EVENT = FeedbackEvent(
+    CALLBACK='http_callback', POST='http_post', RESTORE='restore_after_reboot',
+    PERIODIC='periodic_update', SYNC='sync_update', INIT='initialization',
+    MANUAL='manual_mark', SENSOR_CREATED='binary_sensor_created',
+    SENSOR_UPDATE='binary_sensor_update'
+)
+
+# Оркестратор опроса контроллеров
+ORCHESTRATOR_MAX_CONCURRENT = 3  # Одновременных циклов опроса контроллеров
+
+# Очередь событий от контроллера
+INGEST_QUEUE_SIZE = 64  # Событий, при переполнении отбрасываются старые
+
+# Объединение частых событий порта: 'порт:секунды;...'
+COALESCE_WINDOWS = 'coalesce_windows'
+DEFAULT_COALESCE_WINDOWS = ''
+COALESCE_MAX_WINDOW = 60
+COALESCE_HISTORY = 32  # Последних событий окна порта передаётся в HA
+# Событие HA для каждого события порта, объединённого окном
+EVENT_PORT_EDGE = 'megad_port_edge'
+
+# Команды в ответе на события портов: 'порт[.событие]=команда, ...'
+REPLY_RULES = 'reply_rules'
+DEFAULT_REPLY_RULES = ''
 
 # Режимы работы портов (добавлено)
 PORT_MODE_C = 'C'      # Режим кнопки (нажатия)
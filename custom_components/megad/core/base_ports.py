@@ -1,11 +1,14 @@
 import logging
 import re
+import time
 from abc import ABC, abstractmethod
+from collections import namedtuple
 
 from .const_parse import EXTRA, WIENGAND, IBUTTON
 from .exceptions import (
     UpdateStateError, TypeSensorError, MegaDBusy, PortOFFError, PortNotInit
 )
+from .state_store import StateStore, PinStates
 from .models_megad import (
     PortConfig, PortInConfig, PortOutRelayConfig, PortOutPWMConfig,
     OneWireSensorConfig, PortSensorConfig, DHTSensorConfig,
@@ -16,23 +19,55 @@ from ..const import (
     STATE_RELAY, VALUE, RELAY_ON, MODE, COUNT, CLICK, STATE_BUTTON,
     TEMPERATURE, PLC_BUSY, HUMIDITY, PORT_OFF, CO2, DIRECTION, STATUS_THERMO,
     PORT, NOT_AVAILABLE, PRESSURE, MCP_MODUL, PCA_MODUL, CURRENT, VOLTAGE,
-    RAW_VALUE, LUXURY, BAR
+    RAW_VALUE, LUXURY, BAR, READING_QUALITY, TEMPERATURE_CONDITION,
+    DEVIATION_TEMPERATURE, ALLOWED_TEMP_JUMP, ALLOWED_HUM_JUMP, TYPE_SENSOR
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Показание сенсора: число, время приёма и качество
+Reading = namedtuple('Reading', ['value', 'timestamp', 'quality'])
+
+# Качество показания хранится в StateStore кодом - индексом в QUALITIES
+QUALITIES = tuple(READING_QUALITY)
+QUALITY_CODES = {quality: code for code, quality in enumerate(QUALITIES)}
+QUALITY_OK = QUALITY_CODES[READING_QUALITY.OK]
+
+# Служебные значения состояния сенсора, не являющиеся показаниями
+SERVICE_KEYS = frozenset((DIRECTION, STATUS_THERMO))
+
 
 class BasePort(ABC):
     """Абстрактный класс для всех портов."""
+
+    __slots__ = ('megad_id', 'conf', '_store')
+    # Атрибуты, значения которых лежат в StateStore
+    _stored: tuple[str, ...] = ()
+
     def __init__(self, conf, megad_id):
         self.megad_id = megad_id
         self.conf: PortConfig = conf
-        self._state: str = ''
+        self._store: StateStore = StateStore()
+        self._alloc()
 
     @property
     def state(self):
         return self._state
 
+    def _alloc(self):
+        """Выделяет в хранилище место под состояние порта."""
+        pass
+
+    def attach(self, store: StateStore):
+        """Переносит состояние порта в общее хранилище контроллера."""
+        if store is self._store:
+            return
+        values = [getattr(self, name) for name in self._stored]
+        self._store = store
+        self._alloc()
+        for name, value in zip(self._stored, values):
+            setattr(self, name, value)
+
     @abstractmethod
     def update_state(self, raw_data):
         """
@@ -41,6 +76,10 @@ class BasePort(ABC):
         """
         pass
 
+    def set_decoded(self, value):
+        """Применяет значение, разобранное из ответа cmd=all."""
+        self._state = value
+
     def __repr__(self):
         return (f'<Port(megad_id={self.megad_id}, id={self.conf.id}, '
                 f'type={self.conf.type_port}, state={self._state}, '
@@ -50,12 +89,26 @@ class BasePort(ABC):
 class BinaryPort(BasePort, ABC):
     """Базовый бинарный порт"""
 
+    __slots__ = ('_count_index',)
+    _stored = ('_count',)
+
     def __init__(self, conf: PortInConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: PortInConfig = conf
         self._state: bool = False
         self._count: int = 0
 
+    def _alloc(self):
+        self._count_index = self._store.alloc_values()
+
+    @property
+    def _count(self) -> int:
+        return self._store.get_value(self._count_index)
+
+    @_count.setter
+    def _count(self, value: int):
+        self._store.set_value(self._count_index, value)
+
     def __repr__(self):
         return (f'<Port(megad_id={self.megad_id}, id={self.conf.id}, '
                 f'type={self.conf.type_port}, state={self._state}, '
@@ -76,11 +129,26 @@ class BinaryPort(BasePort, ABC):
 class BinaryPortIn(BinaryPort):
     """Порт настроенный как бинарный сенсор"""
 
+    __slots__ = ('_bit', 'mode')
+    _stored = ('_state', '_count')
+
     def __init__(self, conf: PortInConfig, megad_id):
         super().__init__(conf, megad_id)
         self._state: bool = False
         self.mode = getattr(conf, 'mode', 'C')
 
+    def _alloc(self):
+        super()._alloc()
+        self._bit = self._store.alloc_bits()
+
+    @property
+    def _state(self) -> bool:
+        return self._store.get_bit(self._bit)
+
+    @_state.setter
+    def _state(self, value: bool):
+        self._store.set_bit(self._bit, value)
+
     def update_state(self, data: str | dict):
         """
         data: ON
@@ -132,10 +200,18 @@ class BinaryPortIn(BinaryPort):
                           f'данных порта №{self.conf.id}. data = {data}. '
                           f'Исключение: {e}')
 
+    def set_decoded(self, value: tuple[bool, int | None]):
+        state, count = value
+        self._state = not state if self.conf.inverse else state
+        if count is not None:
+            self._count = count
+
 
 class BinaryPortClick(BinaryPort):
     """Класс для порта настроенного как нажатие."""
 
+    __slots__ = ('_state',)
+
     def __init__(self, conf: PortInConfig, megad_id):
         super().__init__(conf, megad_id)
         self._state: str = 'off'
@@ -210,10 +286,17 @@ class BinaryPortClick(BinaryPort):
                           f'данных порта №{self.conf.id}. data = {data}. '
                           f'Исключение: {e}')
 
+    def set_decoded(self, value: tuple[str, int | None]):
+        self._state, count = value
+        if count is not None:
+            self._count = count
+
 
 class BinaryPortCount(BinaryPort):
     """Класс настроенный как бинарный сенсор для счетчиков"""
 
+    __slots__ = ('_state', 'mode')
+
     def __init__(self, conf: PortInConfig, megad_id):
         super().__init__(conf, megad_id)
         self._state = None
@@ -248,15 +331,32 @@ class BinaryPortCount(BinaryPort):
                           f'данных порта №{self.conf.id}. data = {data}. '
                           f'Исключение: {e}')
 
+    def set_decoded(self, value: tuple[None, int]):
+        self._count = value[1]
+
 
 class RelayPortOut(BasePort):
     """Класс для порта настроенного как релейный выход"""
 
+    __slots__ = ('_bit',)
+    _stored = ('_state',)
+
     def __init__(self, conf: PortOutRelayConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: PortOutRelayConfig = conf
         self._state: bool = False
 
+    def _alloc(self):
+        self._bit = self._store.alloc_bits()
+
+    @property
+    def _state(self) -> bool:
+        return self._store.get_bit(self._bit)
+
+    @_state.setter
+    def _state(self, value: bool):
+        self._store.set_bit(self._bit, value)
+
     @staticmethod
     def _validate_general_request_data(data):
         """Валидация строковых данных общего запроса состояний"""
@@ -301,15 +401,32 @@ class RelayPortOut(BasePort):
                           f'данных порта №{self.conf.id}. data = {data}. '
                           f'Исключение: {e}')
 
+    def set_decoded(self, value: bool):
+        self._state = not value if self.conf.inverse else value
+
 
 class PWMPortOut(BasePort):
     """Клас для портов с ШИМ регулированием"""
 
+    __slots__ = ('_index',)
+    _stored = ('_state',)
+
     def __init__(self, conf: PortOutPWMConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: PortOutPWMConfig = conf
         self._state: int = 0
 
+    def _alloc(self):
+        self._index = self._store.alloc_values()
+
+    @property
+    def _state(self) -> int:
+        return self._store.get_value(self._index)
+
+    @_state.setter
+    def _state(self, value: int):
+        self._store.set_value(self._index, value)
+
     def update_state(self, data: str):
         """
         data: 100
@@ -342,13 +459,150 @@ class PWMPortOut(BasePort):
 
 
 class DigitalSensorBase(BasePort):
-    """Базовый класс для цифровых сенсоров"""
+    """
+    Базовый класс для цифровых сенсоров.
+
+    Показания хранятся в StateStore: под каждый ключ показания при первом
+    приёме выделяется ячейка значения, времени и качества. Состояние порта
+    строится по этим ячейкам, а разобранные данные ответа не сохраняются.
+    """
+
+    __slots__ = ('prefix', '_slots')
 
     def __init__(self, conf: PortSensorConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id)
         self.conf: PortSensorConfig = conf
-        self._state: dict = {}
         self.prefix = prefix
+        self._slots: dict[str, int] = {}
+
+    def attach(self, store: StateStore):
+        """Переносит состояние и показания в общее хранилище."""
+        if store is self._store:
+            return
+        old_store = self._store
+        super().attach(store)
+        for key, index in self._slots.items():
+            self._slots[key] = store.alloc_readings()
+            store.set_reading(
+                self._slots[key], old_store.get_reading(index),
+                old_store.get_timestamp(index), old_store.get_quality(index)
+            )
+
+    def _get_slot(self, key: str) -> int:
+        """Индекс ячейки показания, при первом приёме ключа - новой."""
+        index = self._slots.get(key)
+        if index is None:
+            index = self._slots[key] = self._store.alloc_readings()
+        return index
+
+    @property
+    def _state(self) -> dict:
+        return self._get_state()
+
+    def _get_state(self) -> dict:
+        """Значения показаний по ключам."""
+        store = self._store
+        return {
+            key: store.get_reading(index)
+            for key, index in self._slots.items()
+        }
+
+    @property
+    def readings(self) -> dict[str, Reading]:
+        store = self._store
+        return {
+            key: Reading(
+                store.get_reading(index), store.get_timestamp(index),
+                QUALITIES[store.get_quality(index)]
+            )
+            for key, index in self._slots.items()
+        }
+
+    def get_value(self, key: str) -> float | None:
+        """Числовое значение показания сенсора."""
+        index = self._slots.get(key)
+        return None if index is None else self._store.get_reading(index)
+
+    def filter_kind(self, key: str) -> str:
+        """Тип показания для фильтрации."""
+        return key
+
+    def filter_value(self, key: str, value: float, last: float | None):
+        """Фильтрация неадекватных значений сенсоров."""
+        match self.filter_kind(key):
+            case TYPE_SENSOR.TEMPERATURE:
+                min_value, max_value = TEMPERATURE_CONDITION[
+                    self.conf.device_class
+                ]
+                min_value -= DEVIATION_TEMPERATURE
+                max_value += DEVIATION_TEMPERATURE
+                value_jump = ALLOWED_TEMP_JUMP
+            case TYPE_SENSOR.HUMIDITY:
+                min_value, max_value = 0, 100
+                value_jump = ALLOWED_HUM_JUMP
+            case _:
+                return value
+        value = min(max(value, min_value), max_value)
+        if last is not None:
+            if value in (min_value, max_value) and (
+                    abs(value - last) > value_jump):
+                return last
+            elif value == 0 and abs(last) > value_jump:
+                return last
+        return value
+
+    def decode_reading(self, key: str, raw) -> tuple[float | None, int]:
+        """
+        Переводит значение в число и фильтрует его.
+
+        :return: значение и код качества.
+        """
+        use_filter = getattr(self.conf, 'filter', False)
+        last = self.get_value(key) if use_filter else None
+        try:
+            value = float(raw)
+        except (TypeError, ValueError):
+            return last, QUALITY_CODES[READING_QUALITY.NA]
+        if not use_filter:
+            return value, QUALITY_CODES[READING_QUALITY.OK]
+        accepted = self.filter_value(key, value, last)
+        quality = (
+            READING_QUALITY.OK if accepted == value
+            else READING_QUALITY.FILTERED
+        )
+        return accepted, QUALITY_CODES[quality]
+
+    def _ingest(self, values: dict):
+        """
+        Записывает показания в ячейки хранилища.
+
+        Новое значение декодируется и фильтруется при приёме, у
+        неизменившегося обновляется только время.
+        """
+        now = time.monotonic()
+        store = self._store
+        for key, raw in values.items():
+            if key in SERVICE_KEYS:
+                continue
+            index = self._get_slot(key)
+            if store.get_quality(index) == QUALITY_OK:
+                try:
+                    if float(raw) == store.get_reading(index):
+                        store.set_timestamp(index, now)
+                        continue
+                except (TypeError, ValueError):
+                    pass
+            value, quality = self.decode_reading(key, raw)
+            store.set_reading(index, value, now, quality)
+
+    def _mark_busy(self):
+        """Отмечает показания, которые контроллер не смог обновить."""
+        busy = QUALITY_CODES[READING_QUALITY.BUSY]
+        for index in self._slots.values():
+            self._store.set_quality(index, busy)
+
+    def set_decoded(self, value: dict):
+        self._ingest(value)
 
     @staticmethod
     def get_states(raw_data: str) -> dict:
@@ -364,13 +618,14 @@ class DigitalSensorBase(BasePort):
             states[category] = value if value != NOT_AVAILABLE else None
         return states
 
-    def short_data(self, data):
+    def short_data(self, data) -> dict:
         """Прописать правильную обработку короткого вида записи данных"""
         _LOGGER.info(f'Megad id={self.megad_id}. Получен сокращённый '
                      f'вариант ответа от контроллера.'
                      f' Порт {self.conf.id}, значение: {data}')
+        return {}
 
-    def check_type_sensor(self, data):
+    def check_type_sensor(self, data, values: dict):
         """Проверка типа сенсора по полученным данным"""
         pass
 
@@ -382,15 +637,17 @@ class DigitalSensorBase(BasePort):
               temp:NA
         """
         try:
-            self._state = self.get_states(data)
-            if not self._state:
+            values = self.get_states(data)
+            if not values:
                 raise UpdateStateError
 
-            self.check_type_sensor(data)
+            self._ingest(values)
+            self.check_type_sensor(data, values)
 
         except ValueError:
-            self.short_data(data)
+            self._ingest(self.short_data(data))
         except MegaDBusy:
+            self._mark_busy()
             _LOGGER.info(f'Megad id={self.megad_id}. Неуспешная попытка '
                          f'обновить данные порта id={self.conf.id}, '
                          f'Ответ = {data}')
@@ -416,10 +673,46 @@ class DigitalSensorBase(BasePort):
 class OneWireSensorPort(DigitalSensorBase):
     """Клас для портов 1 wire сенсоров"""
 
+    __slots__ = ('_bit',)
+    _stored = ('_direction', '_status_thermo')
+
     def __init__(self, conf: OneWireSensorConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: OneWireSensorConfig = conf
-        self._state.update({DIRECTION: False, STATUS_THERMO: True})
+        self._direction: bool = False
+        self._status_thermo: bool = True
+
+    def _alloc(self):
+        self._bit = self._store.alloc_bits(2)
+
+    @property
+    def _direction(self) -> bool:
+        return self._store.get_bit(self._bit)
+
+    @_direction.setter
+    def _direction(self, value: bool):
+        self._store.set_bit(self._bit, value)
+
+    @property
+    def _status_thermo(self) -> bool:
+        return self._store.get_bit(self._bit + 1)
+
+    @_status_thermo.setter
+    def _status_thermo(self, value: bool):
+        self._store.set_bit(self._bit + 1, value)
+
+    def _set_service(self, values: dict):
+        """Служебные значения термостата: направление и его включение."""
+        if DIRECTION in values:
+            self._direction = bool(values[DIRECTION])
+        if STATUS_THERMO in values:
+            self._status_thermo = bool(values[STATUS_THERMO])
+
+    def _get_state(self) -> dict:
+        state = super()._get_state()
+        state[DIRECTION] = self._direction
+        state[STATUS_THERMO] = self._status_thermo
+        return state
 
     def get_states(self, raw_data: str) -> dict:
         """
@@ -427,50 +720,45 @@ class OneWireSensorPort(DigitalSensorBase):
               {'pt': '38', 'v': '2712', 'dir': '1', 'mdid': '44'}
               {'dir': True, 'status_thermo': False}
         """
-        state = self._state
         if isinstance(raw_data, dict):
             if raw_data.get(PORT) is None:
-                state.update(raw_data)
-                return state
+                self._set_service(raw_data)
+                return raw_data
             else:
-                direction = bool(int(raw_data.get(DIRECTION)))
+                self._direction = bool(int(raw_data.get(DIRECTION)))
                 value = int(raw_data.get(VALUE))/100
-                state.update({TEMPERATURE: value, DIRECTION: direction})
-                return state
+                return {TEMPERATURE: value}
         else:
-            state_temperature = super().get_states(raw_data)
-            state.update(state_temperature)
-            return state
+            return super().get_states(raw_data)
 
-    def short_data(self, data):
+    def short_data(self, data) -> dict:
         """Обработка данных если температура получена одним числом"""
-        if data.isdigit():
-            self._state[TEMPERATURE] = data
-        else:
-            self._state[TEMPERATURE] = None
+        return {TEMPERATURE: data if data.isdigit() else None}
 
 
 class TempHumSensor(DigitalSensorBase):
     """Класс для сенсора с температурой и влажностью"""
 
+    __slots__ = ()
+
     def __init__(self, conf: PortConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: PortConfig = conf
 
-    def short_data(self, data):
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 25/38
         """
         try:
             temp, hum = data.split('/')
-            self._state[TEMPERATURE] = temp
-            self._state[HUMIDITY] = hum
+            return {TEMPERATURE: temp, HUMIDITY: hum}
         except ValueError:
             _LOGGER.warning(f'Неизвестный формат данных {self.megad_id}-'
                             f'port{self.conf.id}{self.prefix}: {data}')
+            return {}
 
-    def check_type_sensor(self, data):
+    def check_type_sensor(self, data, values: dict):
         """Проверка типа сенсора по полученным данным"""
         if data:
             if len(data.split('/')) != 2:
@@ -480,13 +768,15 @@ class TempHumSensor(DigitalSensorBase):
 class DHTSensorPort(TempHumSensor):
     """Клас для портов dht сенсоров"""
 
+    __slots__ = ()
+
     def __init__(self, conf: DHTSensorConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: DHTSensorConfig = conf
 
-    def check_type_sensor(self, data):
+    def check_type_sensor(self, data, values: dict):
         """Проверка что данные относятся к порту настроенного как dht"""
-        if not all(type_sensor in self._state for type_sensor in (
+        if not all(type_sensor in values for type_sensor in (
                 TEMPERATURE, HUMIDITY)):
             raise TypeSensorError
 
@@ -494,10 +784,16 @@ class DHTSensorPort(TempHumSensor):
 class OneWireBusSensorPort(DigitalSensorBase):
     """Клас для портов 1 wire сенсоров соединённых шиной"""
 
+    __slots__ = ()
+
     def __init__(self, conf: OneWireBusSensorConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: OneWireBusSensorConfig = conf
 
+    def filter_kind(self, key: str) -> str:
+        """Все сенсоры шины измеряют температуру."""
+        return TEMPERATURE
+
     @staticmethod
     def get_states(raw_data: str) -> dict:
         """
@@ -521,25 +817,25 @@ class OneWireBusSensorPort(DigitalSensorBase):
 class I2CSensorXXX(DigitalSensorBase):
     """Класс для сенсора I2C интерфейса с тройными данными."""
 
+    __slots__ = ()
+
     def __init__(self, conf: I2CConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id, prefix)
         self.conf: I2CConfig = conf
 
-    def parse_data(self, data, keys):
+    def parse_data(self, data, keys) -> dict:
         """
         Общий метод обработки данных.
         data: Х/Х/Х
         """
-        try:
-            values = data.split('/')
-            if len(values) != len(keys):
-                raise ValueError
-            self._state.update(dict(zip(keys, values)))
-        except ValueError:
+        values = data.split('/')
+        if len(values) != len(keys):
             _LOGGER.warning(f'Неизвестный формат данных {self.megad_id}-'
                             f'port{self.conf.id}{self.prefix}: {data}')
+            return {}
+        return dict(zip(keys, values))
 
-    def check_type_sensor(self, data):
+    def check_type_sensor(self, data, values: dict):
         """Проверка типа сенсора по полученным данным"""
         if data:
             if len(data.split('/')) != 3:
@@ -549,39 +845,47 @@ class I2CSensorXXX(DigitalSensorBase):
 class I2CSensorSCD4x(I2CSensorXXX):
     """Класс для сенсора типа SCD4x I2C интерфейса"""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 980/25/38
         """
-        self.parse_data(data, [CO2, TEMPERATURE, HUMIDITY])
+        return self.parse_data(data, [CO2, TEMPERATURE, HUMIDITY])
 
 
 class I2CSensorMBx280(I2CSensorXXX):
     """Класс для сенсора типа MBx280 I2C интерфейса."""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 25.5/754.86/22.59
         """
-        self.parse_data(data, [TEMPERATURE, PRESSURE, HUMIDITY])
+        return self.parse_data(data, [TEMPERATURE, PRESSURE, HUMIDITY])
 
 
 class I2CSensorINA226(I2CSensorXXX):
     """Класс для сенсора измерителя тока и напряжения."""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 0.11/12.22/94
         """
-        self.parse_data(data, [CURRENT, VOLTAGE, RAW_VALUE])
+        return self.parse_data(data, [CURRENT, VOLTAGE, RAW_VALUE])
 
 
 class I2CSensorSTH31(TempHumSensor):
     """Класс для сенсора типа STH31 I2C интерфейса."""
 
+    __slots__ = ()
+
     def __init__(self, conf: I2CConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id)
         self.conf: I2CConfig = conf
@@ -591,6 +895,8 @@ class I2CSensorSTH31(TempHumSensor):
 class I2CSensorHTUxxD(TempHumSensor):
     """Класс для сенсора типа HTUxxD I2C интерфейса"""
 
+    __slots__ = ()
+
     def __init__(self, conf: I2CConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id)
         self.conf: I2CConfig = conf
@@ -600,25 +906,25 @@ class I2CSensorHTUxxD(TempHumSensor):
 class I2CSensorXX(DigitalSensorBase):
     """Класс для сенсоров I2C интерфейса с одним параметром."""
 
+    __slots__ = ()
+
     def __init__(self, conf: I2CConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id, prefix)
         self.conf: I2CConfig = conf
 
-    def parse_data(self, data, keys):
+    def parse_data(self, data, keys) -> dict:
         """
         Общий метод обработки данных.
         data: Х/Х
         """
-        try:
-            values = data.split('/')
-            if len(values) != len(keys):
-                raise ValueError
-            self._state.update(dict(zip(keys, values)))
-        except ValueError:
+        values = data.split('/')
+        if len(values) != len(keys):
             _LOGGER.warning(f'Неизвестный формат данных {self.megad_id}-'
                             f'port{self.conf.id}{self.prefix}: {data}')
+            return {}
+        return dict(zip(keys, values))
 
-    def check_type_sensor(self, data):
+    def check_type_sensor(self, data, values: dict):
         """Проверка типа сенсора по полученным данным"""
         if data:
             if len(data.split('/')) != 2:
@@ -628,87 +934,93 @@ class I2CSensorXX(DigitalSensorBase):
 class I2CSensorBMP180(I2CSensorXX):
     """Класс для сенсора BMP180"""
 
-    def short_data(self, data):
-        self.parse_data(data, [TEMPERATURE, PRESSURE])
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
+        return self.parse_data(data, [TEMPERATURE, PRESSURE])
 
 
 class I2CSensorX(DigitalSensorBase):
     """Класс для сенсоров I2C интерфейса с одним параметром."""
 
+    __slots__ = ()
+
     def __init__(self, conf: I2CConfig, megad_id, prefix=''):
         super().__init__(conf, megad_id, prefix)
         self.conf: I2CConfig = conf
 
-    def parse_data(self, data: str, key: str):
+    def parse_data(self, data: str, key: str) -> dict:
         """
         Общий метод обработки данных.
         data: Х
         """
-        try:
-            if data == NOT_AVAILABLE:
-                data = None
-            self._state[key] = data
-        except ValueError:
-            _LOGGER.warning(f'Неизвестный формат данных {self.megad_id}-'
-                            f'port{self.conf.id}{self.prefix}: {data}')
+        return {key: None if data == NOT_AVAILABLE else data}
 
 
 class I2CSensorILLUM(I2CSensorX):
     """Класс для сенсора освещённости I2C интерфейса."""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 125
         """
-        self.parse_data(data, LUXURY)
+        return self.parse_data(data, LUXURY)
 
 
 class I2CSensorBH1750(I2CSensorILLUM):
     """Класс для сенсора BH1750 I2C интерфейса."""
-    pass
+    __slots__ = ()
 
 
 class I2CSensorMAX44009(I2CSensorILLUM):
     """Класс для сенсора MAX44009 I2C интерфейса."""
-    pass
+    __slots__ = ()
 
 
 class I2CSensorTSL2591(I2CSensorILLUM):
     """Класс для сенсора TSL2591 I2C интерфейса."""
-    pass
+    __slots__ = ()
 
 
 class I2CSensorOPT3001(I2CSensorILLUM):
     """Класс для сенсора OPT3001 I2C интерфейса."""
-    pass
+    __slots__ = ()
 
 
 class I2CSensorT67xx(I2CSensorX):
     """Класс для сенсора CO2 I2C интерфейса."""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 826
         """
-        self.parse_data(data, CO2)
+        return self.parse_data(data, CO2)
 
 
 class I2CSensorPT(I2CSensorX):
     """Класс для сенсора давления жидкости I2C интерфейса."""
 
-    def short_data(self, data):
+    __slots__ = ()
+
+    def short_data(self, data) -> dict:
         """
         Обработка короткой записи данных сенсора
         data: 3.13
         """
-        self.parse_data(data, BAR)
+        return self.parse_data(data, BAR)
 
 
 class AnalogSensor(BasePort):
     """Класс для аналоговых сенсоров"""
 
+    __slots__ = ('_state',)
+
     def __init__(self, conf: AnalogPortConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: AnalogPortConfig = conf
@@ -749,12 +1061,30 @@ class AnalogSensor(BasePort):
 class I2CExtraBase(BasePort):
     """Базовый класс для расширителей портов I2C"""
 
+    __slots__ = ('extra_confs', '_pins')
+    _stored = ('_state',)
+    # Выводы хранятся битами (только вкл/выкл) или целыми значениями
+    _pin_bits = False
+
     def __init__(self, conf, megad_id, extra_confs):
+        self.extra_confs: list = extra_confs
         super().__init__(conf, megad_id)
         self.conf = conf
-        self.extra_confs: list = extra_confs
         self._state: list = []
 
+    def _alloc(self):
+        self._pins = PinStates(
+            self._store, len(self.extra_confs), self._pin_bits
+        )
+
+    @property
+    def _state(self) -> PinStates:
+        return self._pins
+
+    @_state.setter
+    def _state(self, values: list):
+        self._pins.assign(values)
+
     def __repr__(self):
         return (f'<Port(megad_id={self.megad_id}, id={self.conf.id}, '
                 f'type={self.conf.type_port}, state={self._state}, '
@@ -836,17 +1166,20 @@ class I2CExtraBase(BasePort):
 
 class I2CExtraMCP230xx(I2CExtraBase):
     """Порт расширения MCP230xx"""
-    pass
+    __slots__ = ()
+    _pin_bits = True
 
 
 class I2CExtraPCA9685(I2CExtraBase):
     """Порт расширения PCA9685"""
-    pass
+    __slots__ = ()
 
 
 class ReaderPort(BasePort):
     """Класс для считывателей ключей"""
 
+    __slots__ = ('_state',)
+
     def __init__(self, conf: WiegandConfig | IButtonConfig, megad_id):
         super().__init__(conf, megad_id)
         self.conf: WiegandConfig | IButtonConfig = conf
@@ -893,8 +1226,11 @@ class ReaderPort(BasePort):
 class I2CDisplayPort(BasePort):
     """Класс для дисплеев."""
 
+    __slots__ = ('_state',)
+
     def __init__(self, conf: I2CSDAConfig, megad_id):
         super().__init__(conf, megad_id)
+        self._state: str = ''
 
     def update_state(self, raw_data):
         """Состояние порта всегда пустое."""
@@ -1,21 +1,21 @@
 import asyncio
 import logging
 import re
+from collections.abc import Callable
 from http import HTTPStatus
 from urllib.parse import parse_qsl
 
 import aiofiles
 import aiohttp
-import async_timeout
 from aiohttp import ClientResponse
-from bs4 import BeautifulSoup
 
 from .const_parse import *
 from .enums import (
     TypePortMegaD, TypeDSensorMegaD, ModeOutMegaD,ModeWiegandMegaD,
     ModeI2CMegaD, DeviceI2CMegaD
 )
-from .exceptions import WriteConfigError, InvalidAuthorized
+from .exceptions import WriteConfigError, InvalidAuthorized, MegaDBusy
+from .html_extract import get_form_params
 from .models_megad import (
     DeviceMegaD, PortConfig, PortInConfig, PortOutRelayConfig,
     PortOutPWMConfig, OneWireSensorConfig, IButtonConfig, WiegandD0Config,
@@ -23,7 +23,8 @@ from .models_megad import (
     AnalogPortConfig, SystemConfigMegaD, PIDConfig, PCA9685PWMConfig,
     PCA9685RelayConfig, MCP230PortInConfig, MCP230RelayConfig
 )
-from ..const import MEGAD_ID, RESTART, ON
+from .transport import MegaDTransport
+from ..const import MEGAD_ID, RESTART, ON, PLC_BUSY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,30 +36,39 @@ class MegaDConfigManager:
             self, url: str,
             config_file_path: str,
             session: aiohttp.ClientSession,
+            transport: MegaDTransport | None = None,
     ):
         self.url = url
         self.config_file_path = config_file_path
         self.session = session
+        self.transport = transport
         self.settings = []
         self.len_main_settings = 0
+        self._progress: Callable[[int, int], None] | None = None
+        self._pages_done = 0
+        self._pages_total = 0
+        # Без транспорта запросы идут по общей сессии HA, а контроллер
+        # обслуживает одно соединение - запросы выполняются по одному
+        self._connection = asyncio.Lock()
 
     async def request_to_megad(self, params: dict | str) -> ClientResponse:
-        """Отправка запроса к контроллеру"""
-        # ✅ ИСПРАВЛЕНИЕ: поддержка новых версий Python (3.11+) и старых
-        try:
-            # Для Python 3.11+ используем встроенный asyncio.timeout
-            async with asyncio.timeout(TIME_OUT_UPDATE):
-                if isinstance(params, str):
-                    response = await self.session.get(url=f'{self.url}?{params}')
-                else:
-                    response = await self.session.get(url=self.url, params=params)
-        except AttributeError:
-            # Fallback для старых версий Python
-            async with async_timeout.timeout(TIME_OUT_UPDATE):
-                if isinstance(params, str):
-                    response = await self.session.get(url=f'{self.url}?{params}')
-                else:
-                    response = await self.session.get(url=self.url, params=params)
+        """
+        Отправка запроса к контроллеру.
+
+        Если контроллер уже работает в интеграции, запрос идёт через его
+        транспорт, чтобы не конкурировать с опросом за соединение. Иначе
+        запросы выполняются по одному: страницы читаются с перекрытием, но
+        к контроллеру одновременно идёт только один запрос.
+        """
+        if isinstance(params, str):
+            url, query = f'{self.url}?{params}', None
+        else:
+            url, query = self.url, params
+        if self.transport is not None:
+            return await self.transport.request(url, query, TIME_OUT_UPDATE)
+        async with self._connection, asyncio.timeout(TIME_OUT_UPDATE):
+            response = await self.session.get(url=url, params=query)
+            await response.read()
         return response
 
     async def fetch_page(self, params: dict) -> str:
@@ -101,26 +111,7 @@ class MegaDConfigManager:
     @staticmethod
     def get_params(page: str) -> str:
         """Получает параметры настройки страницы контроллера"""
-        params = ''
-        soup = BeautifulSoup(page, 'lxml')
-        for form in soup.find_all('form'):
-            if form.get('style') == 'display:inline':
-                continue
-            for inp in form.find_all('input'):
-                if inp.get('type') != "submit":
-                    name = inp.get('name')
-                    value = inp.get('value', '')
-                    if inp.get('type') == "checkbox":
-                        value = '1' if inp.has_attr('checked') else ''
-                    params += f"{name}={value}&"
-
-            for select in soup.find_all('select'):
-                name = select.get('name')
-                selected_option = select.find('option', selected=True)
-                if selected_option:
-                    value = selected_option.get('value', '')
-                    params += f"{name}={value}&"
-        return params.rstrip('&')
+        return get_form_params(page)
 
     @staticmethod
     def decode_title(input_string: str) -> str:
@@ -170,12 +161,31 @@ class MegaDConfigManager:
         if type_port == I2C and type_device in (PCA9685, MCP230XX):
             return int(params.get(PORT_NUMBER))
 
+    async def fetch_config_page(self, params: dict) -> str:
+        """Получает страницу конфигурации, повторяя запрос при busy и
+        ошибке соединения."""
+        for attempt in range(CONFIG_READ_RETRIES + 1):
+            try:
+                page = await self.fetch_page(params)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == CONFIG_READ_RETRIES:
+                    raise
+                _LOGGER.debug(f'Ошибка соединения ({e!r}), повтор запроса '
+                              f'{params}')
+            else:
+                if page.strip().lower() != PLC_BUSY:
+                    return page
+                _LOGGER.debug(f'Контроллер занят, повтор запроса {params}')
+            await asyncio.sleep(CONFIG_READ_BUSY_DELAY * (attempt + 1))
+        raise MegaDBusy(f'Контроллер занят, страница {params} не прочитана')
+
     async def process_page(self, params, check: bool) -> str:
         """Получает url настроек для файла конфигурации."""
-        page_content = await self.fetch_page(params)
+        page_content = await self.fetch_config_page(params)
         if not page_content:
             return ''
-        conf_url = self.get_params(page_content)
+        # Разбор страницы не задерживает цикл событий и следующий запрос
+        conf_url = await asyncio.to_thread(self.get_params, page_content)
         if conf_url and conf_url != 'cf=<br':
             if not self._check_url(conf_url, check):
                 conf_url = conf_url + '&nr=1'
@@ -183,35 +193,64 @@ class MegaDConfigManager:
             return conf_url + '\n'
         return ''
 
+    async def read_pages(self, pages: list[tuple[dict, bool]]) -> list[str]:
+        """
+        Читает страницы конфигурации с ограниченным числом запросов в работе.
+
+        Пока разбирается одна страница, следующая уже запрашивается, но не
+        более CONFIG_READ_WINDOW страниц одновременно. Строки возвращаются
+        в порядке страниц, независимо от порядка ответов.
+
+        :param pages: параметры запроса страницы и признак последней строки.
+        """
+        lines = [''] * len(pages)
+        window = asyncio.Semaphore(CONFIG_READ_WINDOW)
+        self._pages_total += len(pages)
+
+        async def read(index: int, params: dict, check: bool):
+            async with window:
+                lines[index] = await self.process_page(params, check)
+            self._pages_done += 1
+            if self._progress is not None:
+                self._progress(self._pages_done, self._pages_total)
+
+        async with asyncio.TaskGroup() as group:
+            for index, (params, check) in enumerate(pages):
+                group.create_task(read(index, params, check))
+        return lines
+
     async def add_extra_config(self, extended_ports: list):
         """Добавляет порты расширителей к настройкам конфигурации"""
-        count_ports = len(extended_ports)
-        i = 1
-        for port_id in extended_ports:
-            j = 0
-            for extra_port_id in range(16):
-                params = {PORT: port_id, EXTRA: extra_port_id}
-                check = False
-                if i == count_ports and j == 15:
-                    check = True
-                j += 1
-                setting_line = await self.process_page(params, check)
-                if setting_line:
-                    self.settings.append(setting_line)
-            i += 1
-
-    async def read_config(self):
-        """Чтение конфигурации с контроллера"""
+        pages = [
+            ({PORT: port_id, EXTRA: extra_port_id}, False)
+            for port_id in extended_ports
+            for extra_port_id in range(16)
+        ]
+        if pages:
+            pages[-1] = (pages[-1][0], True)
+        for setting_line in await self.read_pages(pages):
+            if setting_line:
+                self.settings.append(setting_line)
+
+    async def read_config(
+            self, progress: Callable[[int, int], None] | None = None
+    ):
+        """
+        Чтение конфигурации с контроллера.
+
+        :param progress: вызывается после каждой страницы с числом
+                         прочитанных и известных на этот момент страниц.
+        """
+        self._progress = progress
+        self._pages_done = self._pages_total = 0
         extended_ports: list[int] = []
         page_params = await self.get_base_params()
         count_line = len(page_params)
-        i = 1
-        for page_param in page_params:
-            check = False
-            if i == count_line:
-                check = True
-            i += 1
-            setting_line = await self.process_page(page_param, check)
+        setting_lines = await self.read_pages([
+            (page_param, i == count_line - 1)
+            for i, page_param in enumerate(page_params)
+        ])
+        for setting_line in setting_lines:
             if setting_line:
                 self.settings.append(setting_line)
             id_extend_port = self._check_extend_port(setting_line)
@@ -257,18 +296,98 @@ class MegaDConfigManager:
             url_list[-2] = pwd_from_config
             self.url = '/'.join(url_list)
 
-    async def upload_config(self, timeout=0):
-        """Загрузка конфигурации на контроллер."""
-        for i, config in enumerate(self.settings):
-            config = config.strip()
-            if not config:
+    @staticmethod
+    def parse_setting(setting_line: str) -> dict:
+        """Параметры строки конфигурации без признака nr=1."""
+        params = dict(parse_qsl(
+            setting_line.strip(), keep_blank_values=True, encoding='cp1251'
+        ))
+        params.pop(NO_RESTART, None)
+        return params
+
+    @staticmethod
+    def get_page_key(params: dict) -> tuple:
+        """Страница конфигурации, к которой относится строка."""
+        return tuple((key, params[key]) for key in PAGE_KEYS if key in params)
+
+    @staticmethod
+    def needs_restart(params: dict, current: dict | None) -> bool:
+        """Требует ли изменение страницы перезагрузки контроллера."""
+        if current is None or params.get(CONFIG) in (MAIN_CONFIG, ID_CONFIG):
+            return True
+        return any(params.get(key) != current.get(key) for key in RESTART_KEYS)
+
+    def diff_settings(self, current: list[str]) -> tuple[list[str], bool]:
+        """
+        Сравнивает конфигурацию с текущей по страницам.
+
+        :param current: строки текущей конфигурации контроллера.
+        :return: строки изменившихся страниц и нужна ли перезагрузка.
+        """
+        pages = {}
+        for setting_line in current:
+            params = self.parse_setting(setting_line)
+            pages[self.get_page_key(params)] = params
+        changed = []
+        restart = False
+        for setting_line in self.settings:
+            if not setting_line.strip():
                 continue
+            params = self.parse_setting(setting_line)
+            current_params = pages.get(self.get_page_key(params))
+            if params == current_params:
+                continue
+            changed.append(setting_line)
+            restart = restart or self.needs_restart(params, current_params)
+        return changed, restart
+
+    async def read_current_settings(
+            self, progress: Callable[[int, int], None] | None = None
+    ) -> list[str]:
+        """Читает текущую конфигурацию контроллера, не меняя загружаемую."""
+        reader = MegaDConfigManager(
+            self.url, self.config_file_path, self.session, self.transport
+        )
+        await reader.read_config(progress)
+        return reader.settings
+
+    async def upload_config(
+            self,
+            timeout=0,
+            diff: bool = False,
+            current: list[str] | None = None,
+            progress: Callable[[int, int], None] | None = None
+    ):
+        """
+        Загрузка конфигурации на контроллер.
+
+        :param diff: загрузить только страницы, отличающиеся от текущей
+                     конфигурации, и перезагрузить контроллер, только если
+                     этого требуют изменения.
+        :param current: снимок текущей конфигурации для diff, None -
+                        конфигурация читается с контроллера.
+        :param progress: вызывается после каждой записанной страницы с
+                         числом записанных и всех страниц.
+        """
+        settings, restart = self.settings, True
+        if diff:
+            if current is None:
+                current = await self.read_current_settings()
+            settings, restart = self.diff_settings(current)
+            _LOGGER.info(f'Изменённых страниц конфигурации: {len(settings)}, '
+                         f'перезагрузка: {restart}')
+        settings = [config.strip() for config in settings if config.strip()]
+        for index, config in enumerate(settings, 1):
             await self.set_config(config)
-            if i == 0:
+            if self.parse_setting(config).get(CONFIG) == MAIN_CONFIG:
                 self.check_pwd_form_config(config)
             if 'nr=1' not in config:
                 await asyncio.sleep(2)
             await asyncio.sleep(timeout)
+            if progress is not None:
+                progress(index, len(settings))
+        if not restart:
+            return
         await asyncio.sleep(1)
         await self.request_to_megad({RESTART: ON})
 
@@ -3,9 +3,12 @@ from datetime import timedelta
 from urllib.parse import parse_qsl
 
 import aiohttp
-from bs4 import BeautifulSoup
 
 from .config_manager import MegaDConfigManager
+from .html_extract import (
+    START, find_input_value, find_text, get_link_texts, get_select_tail,
+    get_text_after
+)
 from ..const import NAME_SCRIPT_MEGAD, CONFIG, PORT, BASE_URL
 
 _LOGGER = logging.getLogger(__name__)
@@ -34,22 +37,22 @@ async def async_get_page_config(
 
 def get_status_thermostat(page: str) -> bool:
     """Получает включенное состояние порта термостата"""
-    soup = BeautifulSoup(page, 'lxml')
-    select_mode = soup.find('select', {'name': 'm'})
-    return False if 'DIS' in select_mode.next_sibling else True
+    return False if 'DIS' in get_select_tail(page, 'm') else True
 
 
 def get_set_temp_thermostat(page: str) -> float:
     """Получить установленную температуру термостата"""
-    soup = BeautifulSoup(page, 'lxml')
-    val_input = soup.find('input', {'name': 'misc'})
-    return float(val_input.get('value'))
+    return float(find_input_value(page, 'misc'))
+
+
+def get_thermostat_params(page: str) -> tuple[bool, float]:
+    """Получить состояние и заданную температуру термостата"""
+    return get_status_thermostat(page), get_set_temp_thermostat(page)
 
 
 def get_uptime(page_cf: str) -> int:
     """Получить время работы контроллера в минутах"""
-    soup = BeautifulSoup(page_cf, 'lxml')
-    uptime_text = soup.find(string=lambda text: "Uptime" in text)
+    uptime_text = find_text(page_cf, 'Uptime')
     if uptime_text:
         uptime = uptime_text.replace("Uptime:", "").strip()
         days, time = uptime.split('d')
@@ -63,8 +66,7 @@ def get_uptime(page_cf: str) -> int:
 
 def get_temperature_megad(page_cf: str) -> float:
     """Получить температуру на плате контроллера"""
-    soup = BeautifulSoup(page_cf, 'lxml')
-    temp_text = soup.find(string=lambda text: "Temp" in text)
+    temp_text = find_text(page_cf, 'Temp')
     if temp_text:
         temperature = temp_text.replace("Temp:", "").strip()
         return float(temperature)
@@ -73,31 +75,24 @@ def get_temperature_megad(page_cf: str) -> float:
 
 def get_version_software(page_cf: str) -> str:
     """Получить версию прошивки контроллера"""
-    soup = BeautifulSoup(page_cf, 'lxml')
-    software_text = soup.find(string=lambda text: '(fw:' in text)
+    software_text = find_text(page_cf, '(fw:')
     software = software_text.replace("(fw:", "").strip().strip(')')
     return software
 
 
 async def get_slug_server(page_cf: str) -> str:
     """Получает поле script в интерфейсе конфигурации megad"""
-    soup = BeautifulSoup(page_cf, 'lxml')
-    teg = soup.find('input', {'name': NAME_SCRIPT_MEGAD})
-    return teg.get('value')
+    return find_input_value(page_cf, NAME_SCRIPT_MEGAD)
 
 
 async def get_megad_id_server(page_cf: str) -> str:
     """Получает Megad-ID в интерфейсе конфигурации megad"""
-    soup = BeautifulSoup(page_cf, 'lxml')
-    mdid_input = soup.find('input', {'name': 'mdid'})
-    return mdid_input.get('value')
+    return find_input_value(page_cf, 'mdid')
 
 
 def get_names_i2c(page: str) -> list[str]:
     """Получает названия сенсоров I2C из html."""
-    soup = BeautifulSoup(page, 'lxml')
-    hrefs = soup.find_all('a')
-    return [href.text for href, in hrefs[1:]]
+    return get_link_texts(page)[1:]
 
 
 def get_params_pid(page: str) -> dict:
@@ -108,9 +103,7 @@ def get_params_pid(page: str) -> dict:
         encoding='cp1251'
     ))
     value = ''
-    soup = BeautifulSoup(page, 'lxml')
-    for br in soup.find_all('br'):
-        text = str(br.next_sibling)
+    for text in get_text_after(page, START, 'br'):
         if 'Val:' in text:
             value = text.split('Val:')[-1].strip()
     params.update({'value': value})
@@ -144,6 +137,8 @@ def create_short_description(descr: str) -> str:
 
 def get_latest_version(page: str, current_version: str) -> dict:
     """Получает последнею версию ПО контроллера и описание."""
+    from bs4 import BeautifulSoup
+
     passed_versions = []
     all_versions = []
 
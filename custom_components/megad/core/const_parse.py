@@ -18,6 +18,12 @@ EXTRA_TYPE = 'ety'
 WIENGAND = 'wg'
 IBUTTON = 'ib'
 PASSWORD = 'pwd'
+NO_RESTART = 'nr'
+
+# Параметры, определяющие страницу конфигурации строки
+PAGE_KEYS = (CONFIG, PORT, EXTRA, CONDITION, PID, SECTION, ELEMENT)
+# Изменение этих параметров порта применяется после перезагрузки
+RESTART_KEYS = (TYPE_PORT, TYPE_DEVICE)
 
 # Номера конфигураций
 MAIN_CONFIG = '1'
@@ -37,3 +43,9 @@ I2C = '4'
 
 # Таймауты
 TIME_OUT_UPDATE = 5
+
+# Чтение конфигурации: страниц в работе одновременно, повторы при busy и
+# ошибке соединения
+CONFIG_READ_WINDOW = 2
+CONFIG_READ_RETRIES = 3
+CONFIG_READ_BUSY_DELAY = 0.5
@@ -5,7 +5,7 @@ from propcache import cached_property
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .base_ports import RelayPortOut
-from .megad import MegaD
+from .megad import MegaD, port_key
 from .. import MegaDCoordinator
 from ..const import PORT_COMMAND
 
@@ -56,8 +56,9 @@ class MegaDAssumedStateEntity:
 class BaseMegaDEntity(CoordinatorEntity):
     """Базовый класс для сущностей MegaD с индивидуальным device_info"""
     
-    def __init__(self, coordinator, unique_id, name, model=None):
-        super().__init__(coordinator)
+    def __init__(self, coordinator, unique_id, name, model=None,
+                 context=None):
+        super().__init__(coordinator, context=context)
         self._attr_unique_id = unique_id
         self._attr_name = name
         self._attr_has_entity_name = True
@@ -80,7 +81,10 @@ class PortOutEntity(BaseMegaDEntity, MegaDAssumedStateEntity):
             self, coordinator: MegaDCoordinator, port: RelayPortOut,
             unique_id: str
     ) -> None:
-        BaseMegaDEntity.__init__(self, coordinator, unique_id, port.conf.name)
+        BaseMegaDEntity.__init__(
+            self, coordinator, unique_id, port.conf.name,
+            context=port_key(port.conf.id)
+        )
         MegaDAssumedStateEntity.__init__(self)
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
@@ -211,7 +215,10 @@ class PortOutExtraEntity(BaseMegaDEntity, MegaDAssumedStateEntity):
             self, coordinator: MegaDCoordinator, port,
             config_extra_port, unique_id: str
     ) -> None:
-        BaseMegaDEntity.__init__(self, coordinator, unique_id, config_extra_port.name)
+        BaseMegaDEntity.__init__(
+            self, coordinator, unique_id, config_extra_port.name,
+            context=port_key(port.conf.id, config_extra_port.id)
+        )
         MegaDAssumedStateEntity.__init__(self)
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
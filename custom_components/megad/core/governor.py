@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import time
+
+from ..const import (
+    GOVERNOR_START_RATE, GOVERNOR_MIN_RATE, GOVERNOR_MAX_RATE, GOVERNOR_BURST,
+    GOVERNOR_INCREASE, GOVERNOR_DECREASE, GOVERNOR_SLOW_DECREASE,
+    GOVERNOR_TARGET_LATENCY, GOVERNOR_BORROW
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestGovernor:
+    """
+    Регулятор частоты запросов к одному контроллеру.
+
+    Корзина токенов, скорость пополнения которой меняется по схеме AIMD:
+    быстрые ответы линейно увеличивают скорость, ответ busy и таймауты
+    уменьшают её в разы, медленные ответы - понемногу.
+
+    Команды пользователя не ждут в общей очереди и могут занять до borrow
+    токенов в долг, а опрос ждёт, пока долг не будет погашен. Поэтому
+    команды идут раньше опроса, но серия команд всё равно выравнивается
+    по скорости регулятора.
+    """
+
+    def __init__(
+            self,
+            name: str = '',
+            rate: float = GOVERNOR_START_RATE,
+            min_rate: float = GOVERNOR_MIN_RATE,
+            max_rate: float = GOVERNOR_MAX_RATE,
+            burst: int = GOVERNOR_BURST,
+            borrow: int = GOVERNOR_BORROW,
+    ):
+        self.name = name
+        self.rate: float = rate
+        self.min_rate: float = min_rate
+        self.max_rate: float = max_rate
+        self.burst: int = burst
+        self.borrow: int = borrow
+        self.latency: float | None = None
+        self.count_busy: int = 0
+        self.count_timeout: int = 0
+        self.count_success: int = 0
+        self._tokens: float = burst
+        self._updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def __repr__(self):
+        return (f'<RequestGovernor({self.name}, rate={self.rate:.2f}, '
+                f'latency={self.latency})>')
+
+    def _refill(self, now: float):
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def _take(self, floor: float):
+        """Забирает токен, как только баланс после этого не ниже floor."""
+        while True:
+            self._refill(time.monotonic())
+            if self._tokens - 1 >= floor:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((floor + 1 - self._tokens) / self.rate)
+
+    async def acquire(self, interactive: bool = False):
+        """
+        Ожидает разрешения на отправку запроса.
+
+        :param interactive: команда пользователя - без очереди и с правом
+                            занять токены в долг.
+        """
+        if interactive:
+            await self._take(-self.borrow)
+            return
+        async with self._lock:
+            await self._take(0)
+
+    def _set_rate(self, rate: float):
+        rate = min(max(rate, self.min_rate), self.max_rate)
+        if rate != self.rate:
+            _LOGGER.debug(f'{self.name}: частота запросов изменена с '
+                          f'{self.rate:.2f} на {rate:.2f} в секунду')
+        self.rate = rate
+
+    def on_success(self, latency: float):
+        """Учитывает успешный ответ контроллера."""
+        self.count_success += 1
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency = 0.8 * self.latency + 0.2 * latency
+        if latency <= GOVERNOR_TARGET_LATENCY:
+            self._set_rate(self.rate + GOVERNOR_INCREASE)
+        else:
+            self._set_rate(self.rate * GOVERNOR_SLOW_DECREASE)
+
+    def on_busy(self):
+        """Учитывает ответ busy - контроллер перегружен."""
+        self.count_busy += 1
+        self._tokens = min(self._tokens, 0)
+        self._set_rate(self.rate * GOVERNOR_DECREASE)
+
+    def on_timeout(self):
+        """Учитывает отсутствие ответа контроллера."""
+        self.count_timeout += 1
+        self._tokens = min(self._tokens, 0)
+        self._set_rate(self.rate * GOVERNOR_DECREASE)
+
+    def get_stats(self) -> dict:
+        """Текущее состояние регулятора для диагностики."""
+        return {
+            'rate': round(self.rate, 2),
+            'latency': round(self.latency, 3) if self.latency else None,
+            'success': self.count_success,
+            'busy': self.count_busy,
+            'timeout': self.count_timeout,
+        }
@@ -0,0 +1,189 @@
+import re
+from collections.abc import Iterator
+from html import unescape
+
+# Комментарий, <!DOCTYPE>, открывающий или закрывающий тег
+TOKEN = re.compile(
+    r'<!--.*?-->|<![^>]*>|<(/?)([a-zA-Z][a-zA-Z0-9]*)'
+    r'((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>',
+    re.DOTALL
+)
+ATTR = re.compile(
+    r'([^\s"\'=/>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?'
+)
+# Содержимое этих тегов - текст до закрывающего тега
+RAW_TEXT = {
+    tag: re.compile(f'</{tag}', re.IGNORECASE) for tag in ('script', 'style')
+}
+
+START = 'start'
+END = 'end'
+TEXT = 'text'
+
+
+def iter_tokens(page: str) -> Iterator[tuple[str, str, str]]:
+    """
+    Разбирает страницу контроллера на теги и текст по мере чтения.
+
+    :return: (START, тег, строка атрибутов), (END, тег, '') или
+             (TEXT, '', текст). Имена тегов в нижнем регистре, текст и
+             атрибуты не декодированы (см. get_text, parse_attrs).
+    """
+    pos = 0
+    length = len(page)
+    while pos < length:
+        match = TOKEN.search(page, pos)
+        if match is None:
+            yield TEXT, '', page[pos:]
+            return
+        if match.start() > pos:
+            yield TEXT, '', page[pos:match.start()]
+        pos = match.end()
+        closing, tag, attrs = match.groups()
+        if tag is None:
+            continue
+        tag = tag.lower()
+        if closing:
+            yield END, tag, ''
+            continue
+        yield START, tag, attrs
+        if tag in RAW_TEXT:
+            match = RAW_TEXT[tag].search(page, pos)
+            end = length if match is None else match.start()
+            if end > pos:
+                yield TEXT, '', page[pos:end]
+            pos = end
+
+
+def parse_attrs(attrs: str) -> dict[str, str]:
+    """Атрибуты тега, у атрибута без значения (checked) - пустая строка."""
+    result = {}
+    for name, double, single, bare in ATTR.findall(attrs):
+        value = double or single or bare
+        if '&' in value:
+            value = unescape(value)
+        result.setdefault(name.lower(), value)
+    return result
+
+
+def get_text(text: str) -> str:
+    """Текст с декодированными HTML-сущностями."""
+    return unescape(text) if '&' in text else text
+
+
+def get_form_params(page: str) -> str:
+    """
+    Параметры формы настройки страницы: name=value через '&'.
+
+    Учитываются поля всех форм, кроме форм кнопок (display:inline): для
+    флажка - 1 или пусто, для списка - значение выбранного пункта.
+    """
+    params = []
+    selects = []
+    forms = 0
+    in_form = False
+    skip_form = False
+    select = None
+    for kind, tag, attrs in iter_tokens(page):
+        if kind == START:
+            if tag == 'form':
+                if not in_form:
+                    in_form = True
+                    skip_form = (
+                        parse_attrs(attrs).get('style') == 'display:inline'
+                    )
+                    forms += not skip_form
+            elif tag == 'input' and in_form and not skip_form:
+                values = parse_attrs(attrs)
+                input_type = values.get('type')
+                if input_type == 'submit':
+                    continue
+                if input_type == 'checkbox':
+                    value = '1' if 'checked' in values else ''
+                else:
+                    value = values.get('value', '')
+                params.append(f'{values.get("name")}={value}')
+            elif tag == 'select':
+                select = [parse_attrs(attrs).get('name'), None]
+                selects.append(select)
+            elif tag == 'option' and select is not None and select[1] is None:
+                values = parse_attrs(attrs)
+                if 'selected' in values:
+                    select[1] = values.get('value', '')
+        elif kind == END:
+            if tag == 'form':
+                in_form = False
+            elif tag == 'select':
+                select = None
+    # Выбранные значения списков документа добавляются после полей один
+    # раз, а не для каждой формы, как при разборе BeautifulSoup
+    if forms:
+        params.extend(
+            f'{name}={value}' for name, value in selects if value is not None
+        )
+    return '&'.join(params)
+
+
+def find_input_value(page: str, name: str) -> str | None:
+    """Значение первого поля с именем name или None, если поля нет."""
+    for kind, tag, attrs in iter_tokens(page):
+        if kind == START and tag == 'input' and name in attrs:
+            values = parse_attrs(attrs)
+            if values.get('name') == name:
+                return values.get('value', '')
+    return None
+
+
+def find_text(page: str, marker: str) -> str | None:
+    """Первый текстовый фрагмент, содержащий marker."""
+    for kind, _, text in iter_tokens(page):
+        if kind == TEXT:
+            text = get_text(text)
+            if marker in text:
+                return text
+    return None
+
+
+def get_text_after(page: str, kind: str, tag: str) -> Iterator[str]:
+    """
+    Тексты, следующие сразу за тегом (START) или его закрытием (END);
+    пустая строка, если за ним сразу идёт другой тег.
+    """
+    waiting = False
+    for token, name, text in iter_tokens(page):
+        if waiting:
+            yield get_text(text) if token == TEXT else ''
+            waiting = False
+        if token == kind and name == tag:
+            waiting = True
+    if waiting:
+        yield ''
+
+
+def get_select_tail(page: str, name: str) -> str | None:
+    """Текст сразу после списка с именем name или None, если списка нет."""
+    found = False
+    closed = False
+    for kind, tag, attrs in iter_tokens(page):
+        if closed:
+            return get_text(attrs) if kind == TEXT else ''
+        if kind == START and tag == 'select' and not found:
+            found = parse_attrs(attrs).get('name') == name
+        elif kind == END and tag == 'select' and found:
+            closed = True
+    return '' if found else None
+
+
+def get_link_texts(page: str) -> list[str]:
+    """Тексты всех ссылок страницы по порядку."""
+    links = []
+    current = None
+    for kind, tag, text in iter_tokens(page):
+        if kind == START and tag == 'a':
+            current = []
+        elif kind == END and tag == 'a' and current is not None:
+            links.append(''.join(current))
+            current = None
+        elif kind == TEXT and current is not None:
+            current.append(get_text(text))
+    return links
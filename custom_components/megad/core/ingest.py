@@ -0,0 +1,181 @@
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+from .transport import request_priority
+from ..const import INGEST_QUEUE_SIZE, PRIORITY_WEBHOOK, COALESCE_HISTORY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class IngestQueue:
+    """
+    Очередь событий, присланных контроллером.
+
+    Обработчик HTTP только проверяет запрос, кладёт событие в очередь и
+    сразу отвечает контроллеру, а события по порядку обрабатывает одна
+    задача. Очередь ограничена: при переполнении отбрасывается самое
+    старое событие, так как более новое всё равно перезапишет состояние.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            handler: Callable[..., Awaitable],
+            maxsize: int = INGEST_QUEUE_SIZE
+    ):
+        self.name = name
+        self._handler = handler
+        self._maxsize = maxsize
+        self._queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._closed = False
+        self._stats = {
+            'received': 0, 'processed': 0, 'dropped': 0, 'errors': 0,
+            'max_depth': 0
+        }
+
+    def __repr__(self):
+        return f'<IngestQueue({self.name}, depth={len(self._queue)})>'
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(self, *event) -> bool:
+        """
+        Добавляет событие в очередь без ожидания.
+
+        :return: False, если очередь закрыта.
+        """
+        return self.put_call(self._handler, *event)
+
+    def put_call(self, handler: Callable[..., Awaitable], *event) -> bool:
+        """Добавляет событие, которое обработает handler, а не обработчик
+        очереди. Порядок с остальными событиями сохраняется."""
+        if self._closed:
+            return False
+        self._stats['received'] += 1
+        if len(self._queue) >= self._maxsize:
+            dropped = self._queue.popleft()
+            self._stats['dropped'] += 1
+            _LOGGER.warning(f'{self.name}: очередь событий переполнена, '
+                            f'отброшено событие {dropped[1]}')
+        self._queue.append((handler, event))
+        self._stats['max_depth'] = max(
+            self._stats['max_depth'], len(self._queue)
+        )
+        self._wakeup.set()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self):
+        """Последовательно обрабатывает события."""
+        request_priority.set(PRIORITY_WEBHOOK)
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            handler, event = self._queue.popleft()
+            try:
+                await handler(*event)
+            except Exception as e:
+                self._stats['errors'] += 1
+                _LOGGER.error(f'{self.name}: ошибка обработки события '
+                              f'{event}: {e}')
+            else:
+                self._stats['processed'] += 1
+
+    def get_stats(self) -> dict:
+        """Счётчики очереди событий."""
+        return {**self._stats, 'depth': len(self._queue)}
+
+    async def close(self):
+        """Останавливает обработку, необработанные события отбрасываются."""
+        self._closed = True
+        self._queue.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+
+class PortCoalescer:
+    """
+    Объединение частых событий порта (счётчики, дребезг, выводы MCP).
+
+    Для портов с заданным окном первое событие открывает окно, а все
+    события до его окончания объединяются в одно: параметры более позднего
+    события перекрывают ранние, поэтому сохраняются последний счётчик,
+    последнее состояние и состояния всех изменившихся выводов расширителя.
+    Вместе с объединённым событием передаются число событий окна и
+    последние COALESCE_HISTORY из них, чтобы промежуточные фронты (click=1
+    перед click=2) не терялись. Порты без окна передаются дальше сразу.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            windows: dict[int, float],
+            emit: Callable[..., object]
+    ):
+        self.name = name
+        self._windows = windows
+        self._emit = emit
+        self._pending: dict[int, tuple[dict, bool, deque]] = {}
+        self._counts: dict[int, int] = {}
+        self._handles: dict[int, asyncio.TimerHandle] = {}
+        self._stats = {'received': 0, 'emitted': 0}
+
+    def push(self, port_id, params: dict, ext: bool):
+        """Принимает событие порта."""
+        self._stats['received'] += 1
+        window = self._windows.get(int(port_id))
+        if not window:
+            self._stats['emitted'] += 1
+            self._emit(port_id, params, ext)
+            return
+        port_id = int(port_id)
+        pending = self._pending.get(port_id)
+        if pending is None:
+            edges = deque([dict(params)], maxlen=COALESCE_HISTORY)
+            self._pending[port_id] = (dict(params), ext, edges)
+            self._counts[port_id] = 1
+            self._handles[port_id] = asyncio.get_running_loop().call_later(
+                window, self._flush, port_id
+            )
+        else:
+            merged, pending_ext, edges = pending
+            merged.update(params)
+            edges.append(dict(params))
+            self._counts[port_id] += 1
+            self._pending[port_id] = (merged, pending_ext or ext, edges)
+
+    def _flush(self, port_id: int):
+        """Окно порта закрылось - передаём объединённое событие."""
+        self._handles.pop(port_id, None)
+        pending = self._pending.pop(port_id, None)
+        count = self._counts.pop(port_id, 0)
+        if pending is None:
+            return
+        merged, ext, edges = pending
+        self._stats['emitted'] += 1
+        _LOGGER.debug(f'{self.name}: порт {port_id}, объединено событий за '
+                      f'окно {self._windows[port_id]} с: {count}, '
+                      f'итог {merged}')
+        self._emit(port_id, merged, ext, tuple(edges), count)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, 'pending': len(self._pending)}
+
+    def close(self):
+        """Отменяет открытые окна, их события отбрасываются."""
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        self._pending.clear()
+        self._counts.clear()
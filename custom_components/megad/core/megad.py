@@ -2,33 +2,34 @@ import asyncio
 import logging
 import os
 import sys
+import time
+from collections import deque, namedtuple
+from copy import copy
 from datetime import datetime
 from http import HTTPStatus
 from typing import Union
 
 import aiofiles.os as aios
-import async_timeout
 from aiohttp import ClientResponse
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .base_pids import PIDControl
 from .base_ports import (
     BinaryPortIn, RelayPortOut, PWMPortOut, BinaryPortClick, BinaryPortCount,
     BasePort, OneWireSensorPort, DHTSensorPort, OneWireBusSensorPort,
     I2CSensorSCD4x, I2CSensorSTH31, AnalogSensor, I2CSensorHTUxxD,
     I2CSensorMBx280, I2CExtraMCP230xx, I2CExtraPCA9685, ReaderPort,
-    I2CSensorINA226, I2CSensorBH1750, I2CSensorILLUM, I2CSensorMAX44009,
+    I2CSensorINA226, I2CSensorBH1750, I2CSensorMAX44009,
     I2CSensorTSL2591, I2CSensorT67xx, I2CSensorBMP180, I2CSensorPT,
-    I2CDisplayPort, I2CSensorOPT3001
+    I2CDisplayPort, I2CSensorOPT3001, DigitalSensorBase, I2CExtraBase
 )
 from .config_parser import (
-    get_uptime, async_get_page_config, get_temperature_megad,
-    get_version_software, async_get_page_port, get_set_temp_thermostat,
-    get_status_thermostat, async_get_page, get_params_pid, get_latest_version,
-    get_names_i2c
+    get_uptime, get_temperature_megad, get_version_software,
+    get_thermostat_params, get_params_pid,
+    get_latest_version, get_names_i2c
 )
 from .const_fw import FW_PATH
+from .const_parse import EXTRA
 from .enums import (
     TypePortMegaD, ModeInMegaD, ModeOutMegaD, TypeDSensorMegaD, DeviceI2CMegaD,
     ModeI2CMegaD, ModeSensorMegaD, ModeWiegandMegaD
@@ -36,18 +37,50 @@ from .enums import (
 from .exceptions import (
     MegaDBusy, InvalidPasswordMegad, FirmwareUpdateInProgress
 )
+from .governor import RequestGovernor
 from .models_megad import DeviceMegaD, PIDConfig, LatestVersionMegaD
+from .poll_scheduler import (
+    PollScheduler, PollJob, JOB_STATE, JOB_THERMOSTAT, JOB_PID
+)
 from .request_to_ablogru import FirmwareChecker
+from .state_store import StateStore, PinStates
+from .status_parser import StatusParser
+from .transport import MegaDTransport, request_priority
 from ..const import (
     MAIN_CONFIG, START_CONFIG, TIME_OUT_UPDATE_DATA, PORT, COMMAND, ALL_STATES,
-    LIST_STATES, SCL_PORT, I2C_DEVICE, TIME_SLEEP_REQUEST, SET_TEMPERATURE,
+    LIST_STATES, SCL_PORT, I2C_DEVICE, SET_TEMPERATURE, PLC_BUSY,
     STATUS_THERMO, CONFIG, PID, NOT_AVAILABLE, PID_E, PID_SET_POINT, PID_INPUT,
     PID_OFF, CRON, SET_TIME, MCP_MODUL, PCA_MODUL, GET_STATUS, SCAN,
-    I2C_PARAMETER
+    I2C_PARAMETER, TIME_UPDATE_TELEMETRY, DEFAULT_PUSH_FIRST,
+    DEFAULT_PUSH_FRESHNESS, TIME_REUSE_REQUEST, GET_ID, PRIORITY_INTERACTIVE,
+    GOVERNOR_BUSY_RETRIES
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+READ_ONLY_COMMANDS = (ALL_STATES, LIST_STATES, GET_STATUS, SCAN, GET_ID)
+I2C_READ_PARAMS = {PORT, SCL_PORT, I2C_DEVICE, I2C_PARAMETER}
+PAGE_PARAMS = {CONFIG, PORT, PID}
+
+# Чтение одного параметра сенсора I2C
+I2CRead = namedtuple('I2CRead', ['port', 'device', 'parameter'])
+
+
+def port_key(port_id, ext_id=None) -> int | str:
+    """Ключ порта в наборе изменений: id порта или 'XeY' для расширителя."""
+    if ext_id is None:
+        return int(port_id)
+    return f'{port_id}e{ext_id}'
+
+
+def pid_key(pid_id) -> str:
+    """Ключ ПИД регулятора в наборе изменений."""
+    return f'pid{pid_id}'
+
+
+# Ключ сенсоров watchdog: входящие данные и события обратной связи
+FEEDBACK_KEY = 'feedback'
+
 
 class MegaD:
     """Класс контроллера MegaD"""
@@ -59,10 +92,15 @@ class MegaD:
             url: str,
             config_path: str,
             fw_checker: FirmwareChecker,
+            poll_intervals: dict | None = None,
+            push_first: bool = DEFAULT_PUSH_FIRST,
+            push_freshness: int = DEFAULT_PUSH_FRESHNESS,
+            reuse_window: float = TIME_REUSE_REQUEST,
+            transport: MegaDTransport | None = None,
     ):
         self.hass = hass
         self.fw_checker: FirmwareChecker = fw_checker
-        self.session = async_get_clientsession(hass)
+        self.transport: MegaDTransport = transport or MegaDTransport(url)
         self.config: DeviceMegaD = config
         self.id = config.plc.megad_id
         self.pids: list[PIDControl] = []
@@ -76,124 +114,51 @@ class MegaD:
             I2CDisplayPort, I2CSensorOPT3001
         ]] = []
         self.extra_ports: list[Union[I2CExtraMCP230xx, I2CExtraPCA9685]]
+        self._ports_by_id: dict[int, BasePort] = {}
+        self._interrupts: dict[int, I2CExtraMCP230xx] = {}
+        self._groups: dict[int, list[int | str]] = {}
+        self._pids_by_id: dict[int, PIDControl] = {}
+        self.status_parser: StatusParser | None = None
+        self.state_store = StateStore()
+        self._changes: set[int | str] = set()
         self.config_ports_bus_i2c = []
         self.url: str = url
         self.config_path: str = config_path
         self.domain: str = url.split('/')[2]
         self.uptime: int = 0
         self.temperature: float = 0
-        self._port_states = {}  # Кэш состояний портов
-        self._ext_port_states = {}  # Кэш для дополнительных портов
         self.software: str | None = None
         self.lt_version_sw: LatestVersionMegaD = LatestVersionMegaD()
         self.lt_version_sw_local: LatestVersionMegaD = LatestVersionMegaD()
         self.is_flashing = False
         self.is_available = False
+        self._static_valid = False
+        self._telemetry_deadline: float = 0
+        self._fw_checked_at: datetime | None = None
+        self.reuse_window: float = reuse_window
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._recent: dict[tuple, tuple[float, str]] = {}
+        self.governor = RequestGovernor(f'MegaD-{self.id}')
+        self.poll_scheduler = PollScheduler(
+            poll_intervals, push_first, push_freshness
+        )
         self.init_ports()
         self.init_pids()
+        self.rebuild_indexes()
+        self.init_poll_scheduler()
         _LOGGER.debug(f'Создан объект MegaD: {self}')
 
     def __repr__(self):
         return (f"<MegaD(id={self.config.plc.megad_id}, "
                 f"ip={self.config.plc.ip_megad}, ports={self.ports})>")
     
-    async def update_port_state_internal(self, port_id: int, state: any) -> None:
-        """Безопасное обновление состояния порта через внутренние атрибуты."""
-        port = self.get_port(port_id)
-        if not port:
-            _LOGGER.warning(f"Порт {port_id} не найден для обновления состояния")
-            return
-
-        # Сохраняем состояние в кэше
-        self._port_states[port_id] = state
-        
-        # Способ 1: Если у порта есть атрибут _state (внутренний)
-        if hasattr(port, '_state'):
-            port._state = state
-            _LOGGER.debug(f"Обновлен порт {port_id} через _state: {state}")
-        
-        # Способ 2: Если у порта есть метод update_state
-        elif hasattr(port, 'update_state') and callable(port.update_state):
-            port.update_state(state)
-            _LOGGER.debug(f"Обновлен порт {port_id} через update_state: {state}")
-        
-        # Способ 3: Попытка прямого обновления через object.__setattr__
-        else:
-            try:
-                object.__setattr__(port, 'state', state)
-                _LOGGER.debug(f"Обновлен порт {port_id} через __setattr__: {state}")
-            except (AttributeError, TypeError) as e:
-                _LOGGER.debug(f"Не удалось обновить порт {port_id} напрямую: {e}")
-                # Используем внутренний атрибут
-                if not hasattr(port, '_internal_state'):
-                    object.__setattr__(port, '_internal_state', state)
-                else:
-                    port._internal_state = state
-                _LOGGER.debug(f"Обновлен порт {port_id} через _internal_state: {state}")
-
-    async def update_port_ext_state(self, port_id: int, ext_id: int, state: any) -> None:
-        """Безопасное обновление состояния дополнительного порта."""
-        port = self.get_port(port_id, ext=True)
-        if not port:
-            _LOGGER.warning(f"Порт {port_id} не найден для обновления доп. состояния")
-            return
-
-        # Сохраняем состояние в кэше
-        key = f"{port_id}.{ext_id}"
-        self._ext_port_states[key] = state
-        
-        # Для расширителей портов
-        if isinstance(port, (I2CExtraMCP230xx, I2CExtraPCA9685)):
-            try:
-                # Получаем текущий словарь состояний
-                current_state = port.state
-                if isinstance(current_state, dict):
-                    # Обновляем конкретное состояние
-                    current_state[ext_id] = state
-                    port.update_state(current_state)
-                else:
-                    # Создаем новый словарь
-                    port.update_state({ext_id: state})
-                _LOGGER.debug(f"Обновлен доп. порт {key}: {state}")
-            except (AttributeError, TypeError) as e:
-                _LOGGER.warning(f"Не удалось обновить доп. порт {key}: {e}")
-                # Используем внутренний атрибут
-                if not hasattr(port, '_ext_states'):
-                    object.__setattr__(port, '_ext_states', {})
-                port._ext_states[ext_id] = state
-        else:
-            _LOGGER.warning(f"Порт {port_id} не является расширителем")
-
-    def get_port_state_internal(self, port_id: int) -> any:
-        """Получение состояния порта из кэша."""
-        return self._port_states.get(port_id)
-
-    def get_ext_port_state_internal(self, port_id: int, ext_id: int) -> any:
-        """Получение состояния дополнительного порта из кэша."""
-        key = f"{port_id}.{ext_id}"
-        return self._ext_port_states.get(key)
-
-    # МОДИФИЦИРУЕМ СУЩЕСТВУЮЩИЙ МЕТОД update_port:
-    
-    def update_port(self, port_id, data):
-        """Обновить данные порта по его id"""
-        port = self.get_port(port_id)
-        if port:
-            old_state = port.state
-            # Используем безопасный метод обновления
-            asyncio.create_task(self.update_port_state_internal(port_id, data))
-            new_state = port.state
-            self._check_change_port(port, old_state, new_state)
-
-    # ДОБАВЛЯЕМ МЕТОД ДЛЯ БЕЗОПАСНОГО ВЫКЛЮЧЕНИЯ СВЕТА:
-    
     async def safe_turn_off_port(self, port_id: int) -> None:
         """Безопасное выключение порта (реле)."""
         # 1. Отправляем команду на устройство
         await self.set_port(port_id, 0)
         
         # 2. Обновляем внутреннее состояние
-        await self.update_port_state_internal(port_id, 0)
+        self.update_port(port_id, 0)
         
         _LOGGER.info(f"Порт {port_id} безопасно выключен")
 
@@ -203,7 +168,7 @@ class MegaD:
         await self.set_port(port_id, 1)
         
         # 2. Обновляем внутреннее состояние
-        await self.update_port_state_internal(port_id, 1)
+        self.update_port(port_id, 1)
         
         _LOGGER.info(f"Порт {port_id} безопасно включен")
 
@@ -249,35 +214,85 @@ class MegaD:
             _LOGGER.debug('Нет данных о последней доступной версии прошивки на'
                           ' сайте ab-log.ru')
 
-    async def request_to_megad(self, params) -> ClientResponse:
-        """Отправка запроса к контроллеру"""
+    async def request_to_megad(
+            self, params, priority: int | None = None) -> ClientResponse:
+        """
+        Отправка запроса к контроллеру через регулятор частоты.
+
+        Команды записи по умолчанию считаются интерактивными: они встают в
+        начало очереди транспорта и проходят регулятор вне очереди опроса.
+        Команду, на которую контроллер ответил busy, регулятор повторяет.
+        Приоритет запросов на чтение берётся из контекста (опрос или вебхук).
+        """
         if self.is_flashing:
             _LOGGER.warning(f'Управление контроллером MegaD-{self.id}'
                             f'{self.config.plc.ip_megad}  невозможно! '
                             f'Идет процесс прошивки!')
             raise FirmwareUpdateInProgress
-        
-        # ✅ ИСПРАВЛЕНИЕ: поддержка новых версий Python (3.11+) и старых
-        try:
-            # Для Python 3.11+ используем встроенный asyncio.timeout
-            async with asyncio.timeout(TIME_OUT_UPDATE_DATA):
-                if isinstance(params, dict):
-                    response = await self.session.get(url=self.url, params=params)
-                else:
-                    response = await self.session.get(url=f'{self.url}?{params}')
-        except AttributeError:
-            # Fallback для старых версий Python
-            async with async_timeout.timeout(TIME_OUT_UPDATE_DATA):
-                if isinstance(params, dict):
-                    response = await self.session.get(url=self.url, params=params)
-                else:
-                    response = await self.session.get(url=f'{self.url}?{params}')
-        
+
+        is_read = self.is_read_request(params)
+        if not is_read:
+            self._recent.clear()
+        if priority is None:
+            priority = (request_priority.get() if is_read
+                        else PRIORITY_INTERACTIVE)
+        if isinstance(params, dict):
+            url, query = self.url, params
+        else:
+            url, query = f'{self.url}?{params}', None
+        interactive = priority == PRIORITY_INTERACTIVE
+        retries = 0 if is_read else GOVERNOR_BUSY_RETRIES
+        while True:
+            await self.governor.acquire(interactive)
+            try:
+                response, latency = await self.transport.request_timed(
+                    url, query, TIME_OUT_UPDATE_DATA, priority
+                )
+            except asyncio.TimeoutError:
+                self.governor.on_timeout()
+                raise
+            body = await response.read()
+            if body.strip().lower() != PLC_BUSY.encode():
+                self.governor.on_success(latency)
+                break
+            self.governor.on_busy()
+            if retries <= 0:
+                break
+            retries -= 1
+            _LOGGER.debug(f'MegaD-{self.id} занят, повтор команды {params}')
+
         _LOGGER.debug(f'Отправлен запрос контроллеру id {self.id}: {params}')
         return response
 
-    async def get_status(self, params: dict) -> str:
-        """Получение статуса по переданным параметрам"""
+    async def get_page(self, params: dict) -> str:
+        """Получение страницы конфигурации контроллера"""
+        response = await self.request_to_megad(params)
+        response.raise_for_status()
+        return await response.text(encoding='windows-1251')
+
+    @staticmethod
+    def get_read_only_key(params) -> tuple | None:
+        """Ключ запроса на чтение состояния или None для команд записи."""
+        if not isinstance(params, dict):
+            return None
+        keys = set(params)
+        if (
+                keys <= {COMMAND, PORT}
+                and params.get(COMMAND) in READ_ONLY_COMMANDS
+        ) or (
+                {PORT, SCL_PORT, I2C_DEVICE} <= keys <= I2C_READ_PARAMS
+        ):
+            return tuple(sorted((k, str(v)) for k, v in params.items()))
+        return None
+
+    def is_read_request(self, params) -> bool:
+        """Проверяет, что запрос только читает данные контроллера."""
+        if self.get_read_only_key(params) is not None:
+            return True
+        return isinstance(params, dict) and set(params) <= PAGE_PARAMS
+
+    async def _fetch_status(self, params: dict) -> str:
+        """Запрос к контроллеру с проверкой авторизации."""
         response = await self.request_to_megad(params)
         if response.status == HTTPStatus.UNAUTHORIZED:
             _LOGGER.error(f'Неверный пароль для устройства с id {self.id}')
@@ -285,6 +300,43 @@ class MegaD:
                                        f'с id {self.id}')
         return await response.text()
 
+    def _finish_flight(self, key: tuple, task: asyncio.Task):
+        """Завершение общего запроса на чтение."""
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        text = task.result()
+        if text.strip().lower() != PLC_BUSY:
+            self._recent[key] = (time.monotonic(), text)
+
+    async def get_status(self, params: dict) -> str:
+        """
+        Получение статуса по переданным параметрам.
+
+        Одинаковые одновременные запросы на чтение выполняются одним
+        HTTP-запросом, а его ответ используется повторно в течение
+        reuse_window секунд. Команды записи отправляются всегда.
+        """
+        key = self.get_read_only_key(params)
+        if key is None:
+            return await self._fetch_status(params)
+        recent = self._recent.get(key)
+        if recent and time.monotonic() - recent[0] <= self.reuse_window:
+            _LOGGER.debug(f'Повторно использован ответ MegaD-{self.id} '
+                          f'на запрос {params}')
+            return recent[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_status(params))
+            task.add_done_callback(
+                lambda done_task: self._finish_flight(key, done_task)
+            )
+            self._inflight[key] = task
+        else:
+            _LOGGER.debug(f'Запрос {params} к MegaD-{self.id} уже '
+                          f'выполняется, ожидаем его ответ')
+        return await asyncio.shield(task)
+
     async def get_status_ports(self) -> str:
         """Запрос состояния всех портов"""
         params = {COMMAND: ALL_STATES}
@@ -293,34 +345,57 @@ class MegaD:
         return text
 
     async def update_data(self):
-        """Обновление всех данных контроллера."""
+        """
+        Обновление данных контроллера.
+
+        Состояния портов, терморегуляторов и ПИД регуляторов обновляются по
+        планировщику опроса, телеметрия платы - раз в TIME_UPDATE_TELEMETRY
+        секунд, версия прошивки - при запуске и после перезагрузки
+        контроллера.
+        """
         if self.is_flashing:
             _LOGGER.debug(f'Контроллер {self.config.plc.ip_megad} в процессе '
                           f'обновления ПО. Обновление данных невозможно.')
             return
         await self.update_ports()
         await self.update_current_time()
-        await asyncio.sleep(TIME_SLEEP_REQUEST)
-        page_cf0 = await async_get_page_config(
-            START_CONFIG, self.url, self.session
-        )
+        if not self._static_valid:
+            await self.update_static_data()
+        await self.update_firmware_info()
+        if time.monotonic() >= self._telemetry_deadline:
+            await self.update_telemetry()
+
+    def invalidate_static(self):
+        """Сбрасывает данные, которые меняются только при перезагрузке."""
+        self._static_valid = False
+        self._telemetry_deadline = 0
+        self.poll_scheduler.expedite(JOB_THERMOSTAT)
+        self.poll_scheduler.expedite(JOB_PID)
+
+    async def update_static_data(self):
+        """Обновление версии прошивки контроллера."""
+        page_cf0 = await self.get_page({CONFIG: START_CONFIG})
         self.software = get_version_software(page_cf0)
         _LOGGER.debug(f'Версия ПО контроллера id: {self.id}: {self.software}')
+        self._static_valid = True
+        self._fw_checked_at = None
 
+    async def update_firmware_info(self):
+        """Обновление последней доступной версии прошивки."""
         await self.fw_checker.update_page_firmwares()
-        await self.update_latest_software()
+        if self.fw_checker._last_check != self._fw_checked_at:
+            await self.update_latest_software()
+            self._fw_checked_at = self.fw_checker._last_check
 
-        await asyncio.sleep(TIME_SLEEP_REQUEST)
-        page_cf1 = await async_get_page_config(
-            MAIN_CONFIG, self.url, self.session
-        )
+    async def update_telemetry(self):
+        """Обновление времени работы и температуры платы контроллера."""
+        page_cf1 = await self.get_page({CONFIG: MAIN_CONFIG})
         self.uptime = get_uptime(page_cf1)
         _LOGGER.debug(f'Время работы контроллера id:{self.id}: {self.uptime}')
         self.temperature = get_temperature_megad(page_cf1)
         _LOGGER.debug(f'Температура платы контролера '
                       f'id:{self.id}: {self.temperature}')
-        if self.pids:
-            await self.update_pids()
+        self._telemetry_deadline = time.monotonic() + TIME_UPDATE_TELEMETRY
 
     async def update_current_time(self):
         """Синхронизирует время контроллера с сервером раз в сутки"""
@@ -330,19 +405,18 @@ class MegaD:
         if control_time_max > now >= control_time_min:
             await self.set_current_time()
 
-    async def update_pids(self):
-        """Обновление данных ПИД регуляторов"""
-        for pid in self.pids:
-            params = {CONFIG: 11, PID: pid.conf.id}
-            page = await async_get_page(
-                params=params, url=self.url, session=self.session
-            )
-            if page != NOT_AVAILABLE:
-                params_pid = get_params_pid(page)
-                conf_pid = PIDConfig(**params_pid)
-                pid.update_state(conf_pid)
-                _LOGGER.debug(f'Обновлённые данные ПИД регулятора '
-                              f'{pid.conf.id}: {conf_pid.model_dump()}')
+    async def update_pid_settings(self, pid: PIDControl):
+        """Сверка настроек ПИД регулятора с контроллером."""
+        page = await self.get_page({CONFIG: 11, PID: pid.conf.id})
+        if page != NOT_AVAILABLE:
+            params_pid = get_params_pid(page)
+            conf_pid = PIDConfig(**params_pid)
+            old_state = dict(pid.state)
+            pid.update_state(conf_pid)
+            if pid.state != old_state:
+                self._changes.add(pid_key(pid.conf.id))
+            _LOGGER.debug(f'Обновлённые данные ПИД регулятора '
+                          f'{pid.conf.id}: {conf_pid.model_dump()}')
 
     @staticmethod
     def check_port_is_thermostat(port) -> bool:
@@ -355,67 +429,180 @@ class MegaD:
                 return True
         return False
 
-    async def update_ports(self):
-        """Обновление данных настроенных портов"""
-        status_ports_raw = await self.get_status_ports()
-        status_ports = status_ports_raw.split(';')
+    def init_poll_scheduler(self):
+        """Заполнение планировщика опроса настроенными портами."""
+        self.poll_scheduler.clear()
         for port in self.ports:
-            state = status_ports[port.conf.id]
-            if self.check_port_is_thermostat(port):
-                await asyncio.sleep(TIME_SLEEP_REQUEST)
-                page = await async_get_page_port(
-                    port.conf.id, self.url, self.session
+            self.poll_scheduler.add_port(
+                port, self.check_port_is_thermostat(port)
+            )
+        for pid in self.pids:
+            self.poll_scheduler.add_pid(pid)
+        _LOGGER.debug(f'Задания опроса MegaD-{self.id}: '
+                      f'{self.poll_scheduler.jobs}')
+
+    async def update_ports(self):
+        """Обновление данных портов, срок опроса которых наступил."""
+        due = deque()
+        for job in self.poll_scheduler.pop_due():
+            if self.poll_scheduler.is_fresh(job):
+                self.poll_scheduler.reschedule(job)
+            else:
+                due.append(job)
+        if not due:
+            return
+        try:
+            status_ports = []
+            decoded = {}
+            state_slots = [
+                job.port.conf.id for job in due if job.kind == JOB_STATE
+            ]
+            if state_slots:
+                status_ports_raw = await self.get_status_ports()
+                status_ports = status_ports_raw.split(';')
+                decoded = self.status_parser.parse(status_ports, state_slots)
+            i2c_values = await self.read_i2c_batch([
+                read for job in due
+                if self.is_i2c_bus_job(job, status_ports)
+                for read in self.get_i2c_reads(job.port)
+            ])
+            while due:
+                job = due[0]
+                await self.update_port_job(
+                    job, status_ports, i2c_values, decoded
                 )
-                status = get_status_thermostat(page)
-                set_temperature = get_set_temp_thermostat(page)
-                port.update_state({STATUS_THERMO: status})
-                port.conf.set_value = set_temperature
-                _LOGGER.debug(f'Состояние терморегулятора порта '
-                              f'№{port.conf.id}: статус - {status}, заданная'
-                              f'температура - {set_temperature}')
+                due.popleft()
+                self.poll_scheduler.reschedule(job)
+        finally:
+            for job in due:
+                self.poll_scheduler.requeue(job)
+
+    def apply_status(
+            self,
+            status_ports: list[str],
+            ext_states: dict[int, str] | None = None
+    ) -> set:
+        """
+        Применяет снимок состояний портов, присланный контроллером.
+
+        Позиции разбираются тем же планом, что и ответ cmd=all, выводы
+        расширителей - как ответ cmd=get. Порты, по которым в снимке нет
+        данных, не меняются и опрашиваются как обычно.
+
+        :return: ключи изменившихся портов (см. port_key).
+        """
+        ext_states = ext_states or {}
+        changes = set()
+        decoded = self.status_parser.parse(status_ports)
+        for port in self.ports:
+            slot = port.conf.id
+            state = status_ports[slot] if slot < len(status_ports) else ''
             if state in (MCP_MODUL, PCA_MODUL):
-                await asyncio.sleep(TIME_SLEEP_REQUEST)
-                state = await self.get_status(
-                    {PORT: port.conf.id, COMMAND: GET_STATUS}
-                )
-                port.update_state(state)
-            elif state:
-                port.update_state(state)
-            elif isinstance(port, OneWireBusSensorPort):
-                await asyncio.sleep(TIME_SLEEP_REQUEST)
-                state = await self.get_status_one_wire_bus(port)
-                port.update_state(state)
-            elif isinstance(port, I2CDisplayPort):
+                state = ext_states.get(slot, '')
+            elif port in self.status_parser and slot not in decoded:
+                # Позиция не изменилась с прошлого разбора
+                self.poll_scheduler.mark_push(slot)
                 continue
-            elif hasattr(port, 'prefix'):
-                if not port.prefix:
-                    continue
-                name_sensor = port.prefix.split('_')[1].lower()
-                if isinstance(port, (I2CSensorHTUxxD, I2CSensorSTH31)):
-                    state = await self.get_status_htu(port, name_sensor)
-                elif isinstance(port, (
-                        I2CSensorBH1750,
-                        I2CSensorMAX44009,
-                        I2CSensorTSL2591,
-                        I2CSensorOPT3001)):
-                    state = await self.get_status_lux(port, name_sensor)
-                elif isinstance(port, I2CSensorMBx280):
-                    state = await self.get_status_bmx280(port, name_sensor)
-                elif isinstance(port, I2CSensorSCD4x):
-                    state = await self.get_status_scd4x(port, name_sensor)
-                elif isinstance(port, I2CSensorINA226):
-                    state = await self.get_status_ina226(port, name_sensor)
-                elif isinstance(port, I2CSensorT67xx):
-                    state = await self.get_status_t67xx(port, name_sensor)
-                elif isinstance(port, I2CSensorBMP180):
-                    state = await self.get_status_bmp180(port, name_sensor)
-                elif isinstance(port, I2CSensorPT):
-                    state = await self.get_status_pt(port, name_sensor)
-
-                _LOGGER.debug(
-                    f'State {port.conf.id}{port.prefix}: {state}'
-                )
-                port.update_state(state)
+            if not state:
+                continue
+            before = self.snapshot_port(port)
+            try:
+                if decoded.get(slot) is not None and port in self.status_parser:
+                    port.set_decoded(decoded[slot])
+                else:
+                    port.update_state(state)
+            except Exception as e:
+                _LOGGER.warning(f'MegaD-{self.id}: состояние порта {slot} '
+                                f'из снимка не применено: {state}, {e}')
+                continue
+            self.poll_scheduler.mark_push(slot)
+            changes |= self.get_port_changes(port, before)
+        return changes
+
+    async def update_thermostat(self, port: OneWireSensorPort):
+        """Обновление статуса и заданной температуры терморегулятора."""
+        page = await self.get_page({PORT: port.conf.id})
+        status, set_temperature = get_thermostat_params(page)
+        before = self.snapshot_port(port)
+        port.update_state({STATUS_THERMO: status})
+        if port.conf.set_value != set_temperature:
+            port.conf.set_value = set_temperature
+            self._changes.add(port_key(port.conf.id))
+        self._changes |= self.get_port_changes(port, before)
+        _LOGGER.debug(f'Состояние терморегулятора порта '
+                      f'№{port.conf.id}: статус - {status}, заданная'
+                      f'температура - {set_temperature}')
+
+    @staticmethod
+    def is_i2c_bus_job(job: PollJob, status_ports: list[str]) -> bool:
+        """Проверяет, что задание опрашивает сенсор из шины I2C."""
+        port = job.port
+        return (
+                job.kind == JOB_STATE
+                and isinstance(port, DigitalSensorBase)
+                and bool(getattr(port, 'prefix', ''))
+                and not status_ports[port.conf.id]
+        )
+
+    async def update_port_job(
+            self,
+            job: PollJob,
+            status_ports: list[str],
+            i2c_values: dict | None = None,
+            decoded: dict | None = None
+    ):
+        """Обновление данных порта по заданию планировщика."""
+        port = job.port
+        if job.kind == JOB_THERMOSTAT:
+            await self.update_thermostat(port)
+        elif job.kind == JOB_PID:
+            await self.update_pid_settings(port)
+        else:
+            slot = port.conf.id
+            if decoded is not None and port in self.status_parser:
+                if slot not in decoded:
+                    return
+                if decoded[slot] is not None:
+                    before = self.snapshot_port(port)
+                    port.set_decoded(decoded[slot])
+                    self._changes |= self.get_port_changes(port, before)
+                    return
+            before = self.snapshot_port(port)
+            await self.poll_port_state(port, status_ports, i2c_values)
+            self._changes |= self.get_port_changes(port, before)
+
+    async def poll_port_state(
+            self,
+            port: BasePort,
+            status_ports: list[str],
+            i2c_values: dict | None = None
+    ):
+        """Обновление состояния порта по ответу cmd=all."""
+        state = status_ports[port.conf.id]
+        if state in (MCP_MODUL, PCA_MODUL):
+            state = await self.get_status(
+                {PORT: port.conf.id, COMMAND: GET_STATUS}
+            )
+            port.update_state(state)
+        elif state:
+            port.update_state(state)
+        elif isinstance(port, OneWireBusSensorPort):
+            state = await self.get_status_one_wire_bus(port)
+            port.update_state(state)
+        elif isinstance(port, I2CDisplayPort):
+            return
+        elif hasattr(port, 'prefix'):
+            if not port.prefix:
+                return
+            values = (i2c_values or {}).get(port)
+            if values is None:
+                batch = await self.read_i2c_batch(self.get_i2c_reads(port))
+                values = batch[port]
+            state = self.get_i2c_state(port, values)
+            _LOGGER.debug(
+                f'State {port.conf.id}{port.prefix}: {state}'
+            )
+            port.update_state(state)
 
     async def get_status_one_wire_bus(self, port: OneWireBusSensorPort) -> str:
         """Обновление шины сенсоров порта 1 wire"""
@@ -434,51 +621,68 @@ class MegaD:
                 I2C_DEVICE: name_sensor,
                 I2C_PARAMETER: i2c_parameter
             }
-            await asyncio.sleep(TIME_SLEEP_REQUEST)
             return await self.get_status(params)
         except Exception as e:
             _LOGGER.warning(f'Не удалось получить состояние сенсора '
                             f'{name_sensor} для порта №{port.conf.id}. '
                             f'Ошибка: {e}')
 
-    async def get_status_bmx280(
-            self, port: I2CSensorMBx280, name_sensor: str
-    ):
-        """Получаем состояние сенсоров bmx280 в виде temp/press/hum."""
-        return await self.get_status_i2c(port, name_sensor, 3)
-
-    async def get_status_htu(
-            self, port: I2CSensorHTUxxD | I2CSensorSTH31, name_sensor: str
-    ):
-        """Получаем состояние сенсоров типа HTUxxx в виде temp/hum."""
-        temperature = await self.get_status_i2c(port, name_sensor, 1)
-        humidity = await self.get_status_i2c(port, name_sensor)
-        return f'{temperature}/{humidity}'
-
-    async def get_status_lux(self, port: I2CSensorILLUM, name_sensor: str):
-        """Получаем состояние сенсоров освещённости."""
-        return await self.get_status_i2c(port, name_sensor)
-
-    async def get_status_scd4x(self, port: I2CSensorSCD4x, name_sensor: str):
-        """Обновление сенсора СО2 типа SCD4x"""
-        return await self.get_status_i2c(port, name_sensor)
+    @staticmethod
+    def get_i2c_reads(port: DigitalSensorBase) -> list[I2CRead]:
+        """
+        Чтения, необходимые для получения состояния сенсора шины I2C.
 
-    async def get_status_ina226(self, port: I2CSensorINA226, name_sensor: str):
-        """Обновление сенсора тока типа INA226"""
-        return await self.get_status_i2c(port, name_sensor)
+        HTUxxx и SHT31 отдают температуру и влажность отдельными
+        параметрами. PTsensor отдаёт значение параметра 2 только после
+        чтения параметра 1, поэтому порядок чтений важен.
+        """
+        device = port.prefix.split('_')[1].lower()
+        if isinstance(port, (I2CSensorHTUxxD, I2CSensorSTH31)):
+            parameters = (1, 0)
+        elif isinstance(port, I2CSensorMBx280):
+            parameters = (3, )
+        elif isinstance(port, I2CSensorBMP180):
+            parameters = (2, )
+        elif isinstance(port, I2CSensorPT):
+            parameters = (1, 2)
+        else:
+            parameters = (0, )
+        return [I2CRead(port, device, parameter) for parameter in parameters]
 
-    async def get_status_t67xx(self, port: I2CSensorT67xx, name_sensor: str):
-        """Обновление сенсора тока типа T67xx"""
-        return await self.get_status_i2c(port, name_sensor)
+    @staticmethod
+    def get_i2c_state(
+            port: DigitalSensorBase, values: dict[int, str | None]
+    ) -> str | None:
+        """Собирает состояние сенсора шины I2C из прочитанных параметров."""
+        if isinstance(port, (I2CSensorHTUxxD, I2CSensorSTH31)):
+            return f'{values.get(1)}/{values.get(0)}'
+        if isinstance(port, I2CSensorPT):
+            return values.get(2)
+        return next(iter(values.values()), None)
 
-    async def get_status_bmp180(self, port: I2CSensorBMP180, name_sensor: str):
-        """Обновление сенсора тока типа BMP180"""
-        return await self.get_status_i2c(port, name_sensor, 2)
+    async def read_i2c_batch(
+            self, reads: list[I2CRead]
+    ) -> dict[DigitalSensorBase, dict[int, str | None]]:
+        """
+        Пакетное чтение сенсоров I2C.
 
-    async def get_status_pt(self, port: I2CSensorPT, name_sensor: str):
-        """Обновление сенсора тока типа PTsensor"""
-        await self.get_status_i2c(port, name_sensor, 1)
-        return await self.get_status_i2c(port, name_sensor, 2)
+        Все запросы сразу ставятся в очередь транспорта и выполняются друг
+        за другом в порядке списка под контролем регулятора частоты, без
+        пауз между ними. Возвращает значения параметров по каждому сенсору,
+        None - если параметр прочитать не удалось.
+        """
+        if not reads:
+            return {}
+        values = await asyncio.gather(*(
+            self.get_status_i2c(read.port, read.device, read.parameter)
+            for read in reads
+        ))
+        result = {}
+        for read, value in zip(reads, values):
+            result.setdefault(read.port, {})[read.parameter] = value
+        _LOGGER.debug(f'Пакетное чтение I2C MegaD-{self.id}: '
+                      f'{len(reads)} запросов, {len(result)} сенсоров')
+        return result
 
     def init_ports(self):
         """Инициализация портов. Разделение их на устройства."""
@@ -652,6 +856,42 @@ class MegaD:
                         _LOGGER.info(f'Интеграция пока не поддерживает в шине '
                                      f'I2C устройство: {sensor_name}. '
                                      f'Обратитесь к разработчику.')
+        if self.config_ports_bus_i2c:
+            self.rebuild_indexes()
+            self.init_poll_scheduler()
+
+    def rebuild_indexes(self):
+        """
+        Перестраивает индексы портов, прерываний расширителей, групп и ПИД.
+
+        Вызывается после каждого изменения списков портов и ПИД регуляторов.
+        Новые порты при этом переносят состояние в общее хранилище.
+        При совпадении id (сенсоры шины I2C) в индексе остаётся первый порт.
+        """
+        self._ports_by_id.clear()
+        self._interrupts.clear()
+        self._groups.clear()
+        self._pids_by_id.clear()
+        for port in self.ports:
+            port.attach(self.state_store)
+            self._ports_by_id.setdefault(port.conf.id, port)
+            if isinstance(port, I2CExtraMCP230xx):
+                if port.conf.interrupt is not None:
+                    self._interrupts.setdefault(port.conf.interrupt, port)
+            if isinstance(port, (I2CExtraMCP230xx, I2CExtraPCA9685)):
+                for conf in port.extra_confs:
+                    group = getattr(conf, 'group', None)
+                    if group is not None:
+                        self._groups.setdefault(group, []).append(
+                            f'{port.conf.id}e{conf.id}'
+                        )
+            elif getattr(port.conf, 'group', None) is not None:
+                self._groups.setdefault(port.conf.group, []).append(
+                    port.conf.id
+                )
+        for pid in self.pids:
+            self._pids_by_id.setdefault(pid.conf.id, pid)
+        self.status_parser = StatusParser(self.ports)
 
     def init_pids(self, ):
         """Инициализация ПИД регуляторов."""
@@ -660,47 +900,157 @@ class MegaD:
                 self.pids.append(PIDControl(pid, self.id))
         _LOGGER.debug(f'Инициализированные ПИД регуляторы: {self.pids}')
 
-    def update_port(self, port_id, data):
-        """Обновить данные порта по его id"""
+    @staticmethod
+    def snapshot_port(port: BasePort) -> tuple:
+        """Снимок состояния порта для поиска изменений."""
+        state = port.state
+        if isinstance(state, (list, dict, PinStates)):
+            state = copy(state)
+        return state, getattr(port, '_count', None)
+
+    @staticmethod
+    def _ext_states(state) -> dict:
+        if isinstance(state, (list, PinStates)):
+            return dict(enumerate(state))
+        return state if isinstance(state, dict) else {}
+
+    def get_port_changes(self, port: BasePort, before: tuple) -> set:
+        """
+        Сравнивает состояние порта со снимком.
+
+        :return: ключи изменившихся портов, для расширителя - его выводов.
+        """
+        old_state, old_count = before
+        if isinstance(port, I2CExtraBase):
+            old = self._ext_states(old_state)
+            new = self._ext_states(port.state)
+            changed = {
+                port_key(port.conf.id, ext_id) for ext_id in old.keys() | new
+                if old.get(ext_id) != new.get(ext_id)
+            }
+        elif (
+                old_state != port.state
+                or old_count != getattr(port, '_count', None)
+        ):
+            changed = {port_key(port.conf.id)}
+        else:
+            changed = set()
+        return changed
+
+    def pop_changes(self) -> set:
+        """Возвращает и сбрасывает изменения, накопленные при опросе."""
+        changes, self._changes = self._changes, set()
+        return changes
+
+    def update_port(self, port_id, data) -> set:
+        """
+        Обновить данные порта по его id.
+
+        :return: ключи изменившихся портов (см. port_key).
+        """
         port = self.get_port(port_id)
-        if port:
-            old_state = port.state
-            port.update_state(data)
-            new_state = port.state
-            self._check_change_port(port, old_state, new_state)
+        if not port:
+            return set()
+        before = self.snapshot_port(port)
+        port.update_state(data)
+        self.status_parser.forget(port.conf.id)
+        self._check_change_port(port, before[0], port.state)
+        return self.get_port_changes(port, before)
+
+    def expedite_port(self, port_id):
+        """Опросить порт в ближайшем цикле, его состояние изменено не из HA."""
+        self.poll_scheduler.expedite(JOB_STATE, port_id)
+
+    def apply_reply_value(self, port_id: int, value: str) -> set | None:
+        """
+        Применяет значение порта из команды ответа контроллеру (N:V).
+
+        :return: ключи изменившихся портов или None, если значение для
+                 этого порта неизвестно и его нужно прочитать.
+        """
+        port = self.get_port(port_id)
+        if (
+                isinstance(port, RelayPortOut) and value in ('0', '1')
+                or isinstance(port, PWMPortOut)
+        ):
+            return self.update_port(port_id, value)
+        return None
+
+    async def read_ports(self, port_ids) -> set:
+        """
+        Немедленно читает состояние портов, изменённых не из HA.
+
+        Ответ, полученный до изменения, устарел, поэтому cmd=all
+        запрашивается мимо общего ответа get_status.
 
-    def update_pid(self, pid_id, data):
+        :param port_ids: id портов или 'XeY' для выводов расширителей.
+        :return: ключи изменившихся портов (см. port_key).
+        """
+        ports = {}
+        for port_id in port_ids:
+            port = self.get_port(str(port_id).partition('e')[0])
+            if port is not None:
+                ports[port.conf.id] = port
+        if not ports:
+            return set()
+        self._recent.clear()
+        status_ports = (
+            await self._fetch_status({COMMAND: ALL_STATES})
+        ).split(';')
+        changes = set()
+        for port in ports.values():
+            before = self.snapshot_port(port)
+            self.status_parser.forget(port.conf.id)
+            await self.poll_port_state(port, status_ports)
+            changes |= self.get_port_changes(port, before)
+        return changes
+
+    def mark_port_push(self, port_id, data: dict):
+        """Отмечает состояние порта, присланное контроллером."""
+        ext_ids = [
+            int(key[len(EXTRA):]) for key in data
+            if key.startswith(EXTRA) and key[len(EXTRA):].isdigit()
+        ]
+        port = self.get_port(port_id, ext=bool(ext_ids))
+        if port is None:
+            return
+        if not isinstance(port, (I2CExtraMCP230xx, I2CExtraPCA9685)):
+            ext_ids = []
+        self.poll_scheduler.mark_push(port.conf.id, ext_ids)
+
+    def update_pid(self, pid_id, data) -> set:
         """Обновить данные ПИД регулятора по его id."""
         pid = self.get_pid(pid_id)
-        if pid:
-            pid.update_state(data)
+        if not pid:
+            return set()
+        old_state = dict(pid.state)
+        pid.update_state(data)
+        if pid.state == old_state:
+            return set()
+        return {pid_key(pid.conf.id)}
 
     def get_port_interrupt(self, port_id: int):
         """Проверяет, является ли порт прерыванием для расширителя портов."""
-        for port in self.ports:
-            if isinstance(port, I2CExtraMCP230xx):
-                if port.conf.interrupt == port_id:
-                    return port
+        return self._interrupts.get(int(port_id))
 
     def get_port(self, port_id, ext=False):
         """Получить порт по его id."""
+        port_id = int(port_id)
         if ext:
-            port_ext = self.get_port_interrupt(int(port_id))
+            port_ext = self._interrupts.get(port_id)
             if port_ext is not None:
                 return port_ext
-        return next(
-            (port for port in self.ports
-             if port.conf.id == int(port_id)),
-            None
-        )
+        return self._ports_by_id.get(port_id)
+
+    def get_group_ports(self, group_id: int) -> list[int | str]:
+        """
+        Порты группы: id основных портов и 'XeY' для портов расширителей.
+        """
+        return self._groups.get(int(group_id), [])
 
     def get_pid(self, pid_id):
         """Получить ПИД по его id."""
-        return next(
-            (pid for pid in self.pids
-             if pid.conf.id == int(pid_id)),
-            None
-        )
+        return self._pids_by_id.get(int(pid_id))
 
     async def set_pid(self, pid_id: int, commands: dict):
         """Установка новых параметров ПИД регулятора."""
@@ -716,6 +1066,7 @@ class MegaD:
             case _:
                 _LOGGER.debug(f'Параметры ПИД №{pid_id} (MegaD-{self.id}) '
                               f'успешно изменены на {commands}')
+                self.poll_scheduler.expedite(JOB_PID, pid_id)
 
     async def set_current_time(self):
         """Установка текущего времени сервера на контроллер."""
@@ -756,6 +1107,7 @@ class MegaD:
             case _:
                 _LOGGER.debug(f'Заданная температура порта №{port_id} '
                               f'изменена на {temperature}')
+                self.poll_scheduler.expedite(JOB_THERMOSTAT, port_id)
 
     async def set_port(self, port_id, command):
         """Управление выходом релейным и шим."""
@@ -0,0 +1,256 @@
+import heapq
+import itertools
+import logging
+import math
+import time
+
+from .base_ports import (
+    BinaryPortIn, BinaryPortClick, BinaryPortCount, ReaderPort, RelayPortOut,
+    PWMPortOut, OneWireSensorPort, DHTSensorPort, OneWireBusSensorPort,
+    AnalogSensor, I2CExtraBase, I2CSensorSCD4x, I2CSensorT67xx,
+    I2CDisplayPort, DigitalSensorBase
+)
+from ..const import (
+    DEFAULT_POLL_INTERVALS, POLL_PRIORITIES, POLL_MIN_INTERVAL,
+    POLL_MAX_INTERVAL, TIME_UPDATE, POLL_CLASS_RELAY, POLL_CLASS_INPUT,
+    POLL_CLASS_ONE_WIRE, POLL_CLASS_ONE_WIRE_BUS, POLL_CLASS_ANALOG,
+    POLL_CLASS_I2C_SENSOR, POLL_CLASS_I2C_CO2, POLL_CLASS_EXTENDER,
+    POLL_CLASS_THERMOSTAT, POLL_CLASS_PID, DEFAULT_PUSH_FIRST,
+    DEFAULT_PUSH_FRESHNESS
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+JOB_STATE = 'state'
+JOB_THERMOSTAT = 'thermostat'
+JOB_PID = 'pid'
+
+
+def get_poll_class(port) -> str | None:
+    """Возвращает класс опроса порта или None, если порт не опрашивается."""
+    if isinstance(port, I2CDisplayPort):
+        return None
+    if isinstance(port, (RelayPortOut, PWMPortOut)):
+        return POLL_CLASS_RELAY
+    if isinstance(port, (
+            BinaryPortIn, BinaryPortClick, BinaryPortCount, ReaderPort)):
+        return POLL_CLASS_INPUT
+    if isinstance(port, I2CExtraBase):
+        return POLL_CLASS_EXTENDER
+    if isinstance(port, OneWireBusSensorPort):
+        return POLL_CLASS_ONE_WIRE_BUS
+    if isinstance(port, (OneWireSensorPort, DHTSensorPort)):
+        return POLL_CLASS_ONE_WIRE
+    if isinstance(port, AnalogSensor):
+        return POLL_CLASS_ANALOG
+    if isinstance(port, (I2CSensorSCD4x, I2CSensorT67xx)):
+        return POLL_CLASS_I2C_CO2
+    if isinstance(port, DigitalSensorBase):
+        return POLL_CLASS_I2C_SENSOR
+    return None
+
+
+class PollJob:
+    """Задание опроса одного порта."""
+
+    __slots__ = ('port', 'kind', 'poll_class', 'interval', 'priority',
+                 'deadline')
+
+    def __init__(self, port, kind: str, poll_class: str, interval: int,
+                 priority: int):
+        self.port = port
+        self.kind = kind
+        self.poll_class = poll_class
+        self.interval = interval
+        self.priority = priority
+        self.deadline: float = 0
+
+    def __repr__(self):
+        return (f'<PollJob(port={self.port.conf.id}'
+                f'{getattr(self.port, "prefix", "")}, kind={self.kind}, '
+                f'class={self.poll_class}, interval={self.interval})>')
+
+
+class PollScheduler:
+    """
+    Планировщик опроса портов контроллера.
+
+    Каждый класс портов имеет собственный интервал и приоритет. Задания
+    хранятся в очереди, упорядоченной по сроку следующего опроса.
+
+    Настройки терморегуляторов и ПИД регуляторов меняются только по нашим
+    командам, поэтому их задания - медленная сверка, а после изменения
+    настроек задание переносится на ближайший цикл (expedite).
+
+    В режиме push_first порт, состояние которого контроллер сам прислал
+    не позднее push_freshness секунд назад, не опрашивается.
+    """
+
+    def __init__(
+            self,
+            intervals: dict | None = None,
+            push_first: bool = DEFAULT_PUSH_FIRST,
+            push_freshness: int = DEFAULT_PUSH_FRESHNESS
+    ):
+        self.intervals: dict[str, int] = self.normalize_intervals(intervals)
+        self.push_first: bool = push_first
+        self.push_freshness: int = push_freshness
+        self._queue: list[tuple[float, int, int, PollJob]] = []
+        self._counter = itertools.count()
+        self._jobs: list[PollJob] = []
+        self._last_push: dict[int, float] = {}
+        self._last_push_ext: dict[tuple[int, int], float] = {}
+
+    @staticmethod
+    def normalize_intervals(intervals: dict | None) -> dict[str, int]:
+        """Дополняет интервалы значениями по умолчанию и ограничивает их."""
+        result = dict(DEFAULT_POLL_INTERVALS)
+        for poll_class, value in (intervals or {}).items():
+            if poll_class not in result:
+                _LOGGER.debug(f'Неизвестный класс опроса: {poll_class}')
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                _LOGGER.warning(f'Неверный интервал опроса {poll_class}: '
+                                f'{value}')
+                continue
+            result[poll_class] = min(
+                max(value, POLL_MIN_INTERVAL), POLL_MAX_INTERVAL
+            )
+        return result
+
+    @property
+    def tick_interval(self) -> int:
+        """Интервал, с которым координатор должен вызывать опрос."""
+        return min(TIME_UPDATE, min(self.intervals.values()))
+
+    @property
+    def jobs(self) -> list[PollJob]:
+        return self._jobs
+
+    def clear(self):
+        """Удаляет все задания планировщика."""
+        self._queue.clear()
+        self._jobs.clear()
+
+    def _push(self, job: PollJob):
+        heapq.heappush(
+            self._queue,
+            (job.deadline, job.priority, next(self._counter), job)
+        )
+
+    def _create_job(self, port, kind: str, poll_class: str):
+        job = PollJob(
+            port=port,
+            kind=kind,
+            poll_class=poll_class,
+            interval=self.intervals[poll_class],
+            priority=POLL_PRIORITIES.get(poll_class, 0),
+        )
+        self._jobs.append(job)
+        self._push(job)
+
+    def add_port(self, port, is_thermostat: bool = False):
+        """Добавляет порт в планировщик. Первый опрос - немедленно."""
+        poll_class = get_poll_class(port)
+        if poll_class is None:
+            return
+        self._create_job(port, JOB_STATE, poll_class)
+        if is_thermostat:
+            self._create_job(port, JOB_THERMOSTAT, POLL_CLASS_THERMOSTAT)
+
+    def add_pid(self, pid):
+        """Добавляет сверку настроек ПИД регулятора."""
+        self._create_job(pid, JOB_PID, POLL_CLASS_PID)
+
+    def pop_due(self, now: float | None = None) -> list[PollJob]:
+        """
+        Извлекает задания, срок опроса которых наступил.
+
+        Сроки в пределах половины цикла координатора тоже считаются
+        наступившими: иначе из-за неточности таймера задание с интервалом,
+        кратным циклу, опрашивалось бы на цикл позже.
+        """
+        now = time.monotonic() if now is None else now
+        limit = now + self.tick_interval / 2
+        due = []
+        while self._queue and self._queue[0][0] <= limit:
+            deadline, _, _, job = heapq.heappop(self._queue)
+            # Запись устарела: задание было перенесено через expedite
+            if deadline == job.deadline and job not in due:
+                # Первый опрос или опрос, опоздавший на целый интервал:
+                # следующие сроки отсчитываются от текущего цикла
+                if job.deadline + job.interval <= now:
+                    job.deadline = now
+                due.append(job)
+        return due
+
+    def reschedule(self, job: PollJob, now: float | None = None):
+        """
+        Планирует следующий опрос задания через интервал от прошлого срока.
+
+        Срок не зависит от длительности запроса, поэтому опрос не сползает
+        на следующий цикл. Пропущенные сроки не навёрстываются.
+        """
+        now = time.monotonic() if now is None else now
+        job.deadline += job.interval
+        if job.deadline <= now:
+            missed = math.floor((now - job.deadline) / job.interval) + 1
+            job.deadline += missed * job.interval
+        self._push(job)
+
+    def requeue(self, job: PollJob, now: float | None = None):
+        """Возвращает необработанное задание в очередь на следующий цикл."""
+        job.deadline = time.monotonic() if now is None else now
+        self._push(job)
+
+    def expedite(self, kind: str, obj_id: int | None = None,
+                 now: float | None = None):
+        """
+        Переносит задания вида kind на ближайший цикл опроса.
+
+        :param obj_id: id порта или ПИД регулятора, None - все задания вида.
+        """
+        now = time.monotonic() if now is None else now
+        for job in self._jobs:
+            if job.kind != kind or job.deadline <= now:
+                continue
+            if obj_id is not None and job.port.conf.id != int(obj_id):
+                continue
+            job.deadline = now
+            self._push(job)
+
+    def next_deadline(self) -> float | None:
+        """Срок ближайшего задания."""
+        return self._queue[0][0] if self._queue else None
+
+    def mark_push(self, port_id: int, ext_ids=(), now: float | None = None):
+        """Отмечает получение состояния порта от контроллера."""
+        now = time.monotonic() if now is None else now
+        if ext_ids:
+            for ext_id in ext_ids:
+                self._last_push_ext[(port_id, ext_id)] = now
+        else:
+            self._last_push[port_id] = now
+
+    def clear_pushes(self):
+        """Сбрасывает отметки о полученных состояниях (перезагрузка)."""
+        self._last_push.clear()
+        self._last_push_ext.clear()
+
+    def is_fresh(self, job: PollJob, now: float | None = None) -> bool:
+        """Проверяет, что состояние порта недавно пришло от контроллера."""
+        if not self.push_first or job.kind != JOB_STATE:
+            return False
+        now = time.monotonic() if now is None else now
+        threshold = now - self.push_freshness
+        port = job.port
+        if isinstance(port, I2CExtraBase):
+            if not port.extra_confs:
+                return False
+            return all(
+                self._last_push_ext.get((port.conf.id, i), threshold)
+                > threshold for i in range(len(port.extra_confs))
+            )
+        return self._last_push.get(port.conf.id, threshold) > threshold
@@ -0,0 +1,164 @@
+import logging
+import re
+from collections import namedtuple
+
+from ..const import MODE, CLICK, PORT, STATE_BUTTON, VALUE
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_PRESS = 'press'
+EVENT_RELEASE = 'release'
+REPLY_EVENTS = {
+    EVENT_PRESS, EVENT_RELEASE,
+    STATE_BUTTON.SINGLE, STATE_BUTTON.DOUBLE, STATE_BUTTON.LONG
+}
+
+# Команда ответа: действия MegaD через ';' (7:1;8:2;p20;g1:0)
+REPLY_COMMAND = re.compile(r'^[0-9a-z:;/.]+$', re.IGNORECASE)
+# Простое действие над портом, состояние которого меняется ответом
+REPLY_TARGET = re.compile(r'^(\d+):(\d+)$')
+# Действие над группой портов
+REPLY_GROUP = re.compile(r'^g(\d+):(\d+)$', re.IGNORECASE)
+# Пауза: следующие действия контроллер выполнит позже
+REPLY_PAUSE = re.compile(r'^p\d+$', re.IGNORECASE)
+# Значение переключения порта или группы
+REPLY_TOGGLE = '2'
+
+# Результат команды ответа: известные значения портов {порт: значение},
+# порты и группы, состояние которых нужно прочитать
+ReplyActions = namedtuple('ReplyActions', ['values', 'ports', 'groups'])
+
+
+def get_event(params: dict) -> str | None:
+    """
+    Вид события порта из параметров запроса контроллера.
+
+    {'pt': '7'}, {'pt': '7', 'm': '0'} - press
+    {'pt': '7', 'm': '1'} - release
+    {'pt': '7', 'm': '2'} - long
+    {'pt': '7', 'click': '1'} - single, click=2 - double
+    {'pt': '7', 'v': '25'} - показания, а не событие порта: None
+    """
+    match params.get(CLICK):
+        case '1':
+            return STATE_BUTTON.SINGLE
+        case '2':
+            return STATE_BUTTON.DOUBLE
+        case None:
+            pass
+        case _:
+            return None
+    match params.get(MODE):
+        case None if VALUE not in params:
+            return EVENT_PRESS
+        case '0':
+            return EVENT_PRESS
+        case '1':
+            return EVENT_RELEASE
+        case '2':
+            return STATE_BUTTON.LONG
+    return None
+
+
+def parse_reply_rules(text: str) -> dict[tuple[int, str | None], str]:
+    """
+    Разбирает таблицу ответов на события портов.
+
+    :param text: правила через ',' или с новой строки, 'порт[.событие]=команда',
+                 например '7.single=8:2, 7.long=8:0;9:0, 12=13:1'. Событие:
+                 press, release, long, single, double; без события правило
+                 действует для любого события порта.
+    :return: {(порт, событие или None): команда}
+    """
+    rules = {}
+    for item in re.split(r'[,\n]', text or ''):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, command = item.partition('=')
+        command = command.strip()
+        if not sep or not REPLY_COMMAND.match(command):
+            raise ValueError(f'Ожидалось порт[.событие]=команда, '
+                             f'получено {item}')
+        port, _, event = key.strip().partition('.')
+        event = event.lower() or None
+        if event is not None and event not in REPLY_EVENTS:
+            raise ValueError(f'Неизвестное событие {event} в правиле {item}')
+        rules[(int(port), event)] = command
+    return rules
+
+
+class ReplyRules:
+    """
+    Ответы контроллеру на события портов.
+
+    Контроллер выполняет команды, полученные в теле ответа на своё
+    событие, поэтому реакция на нажатие (например, переключение реле)
+    выполняется в том же HTTP-обмене, без отдельного запроса cmd=.
+    Правило для события порта важнее правила для порта без события.
+    """
+
+    def __init__(self, rules: dict[tuple[int, str | None], str]):
+        self._rules = rules
+        self._ports = {port for port, _ in rules}
+        self._hits = 0
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def match(self, params: dict) -> str | None:
+        """Команда ответа на событие или None."""
+        port = params.get(PORT)
+        if not self._ports or port is None or not port.isdigit():
+            return None
+        port = int(port)
+        if port not in self._ports:
+            return None
+        event = get_event(params)
+        if event is None:
+            return None
+        command = self._rules.get((port, event))
+        if command is None:
+            command = self._rules.get((port, None))
+        if command is not None:
+            self._hits += 1
+            _LOGGER.debug(f'Ответ на событие {event} порта {port}: {command}')
+        return command
+
+    @staticmethod
+    def get_actions(command: str) -> ReplyActions:
+        """
+        Разбирает команду ответа по действиям.
+
+        Значение порта из N:V известно сразу, кроме переключения (N:2) и
+        действий после паузы. Такие порты и группы (gN:V) нужно прочитать.
+        """
+        values = {}
+        ports = []
+        groups = []
+        paused = False
+        for action in command.split(';'):
+            if REPLY_PAUSE.match(action):
+                paused = True
+                continue
+            found = REPLY_GROUP.match(action)
+            if found:
+                groups.append(int(found.group(1)))
+                continue
+            found = REPLY_TARGET.match(action)
+            if found is None:
+                continue
+            port, value = int(found.group(1)), found.group(2)
+            if paused or value == REPLY_TOGGLE:
+                values.pop(port, None)
+                ports.append(port)
+            else:
+                values[port] = value
+        return ReplyActions(
+            values,
+            [port for port in dict.fromkeys(ports) if port not in values],
+            list(dict.fromkeys(groups))
+        )
+
+    def get_stats(self) -> dict:
+        return {'rules': len(self._rules), 'hits': self._hits}
@@ -0,0 +1,66 @@
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ControllerRouter:
+    """
+    Индекс координаторов контроллеров для обработки запросов от MegaD.
+
+    Координатор находится по адресу отправителя (domain контроллера или
+    IP из конфигурации), а если адрес не совпал - по mdid из запроса.
+    Индекс обновляется при загрузке и выгрузке записи интеграции, смена
+    IP-адреса проходит через перезагрузку записи.
+    """
+
+    def __init__(self):
+        self._by_host: dict[str, object] = {}
+        self._by_id: dict[str, object] = {}
+        self._entries: dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def get_hosts(megad) -> set[str]:
+        """Адреса, с которых приходят запросы контроллера."""
+        return {megad.domain.split(':')[0], str(megad.config.plc.ip_megad)}
+
+    def _index(self, coordinator, hosts: set[str], megad_id: str,
+               warn: bool = False):
+        for host in hosts:
+            other = self._by_host.setdefault(host, coordinator)
+            if warn and other is not coordinator:
+                _LOGGER.warning(f'Адрес {host} MegaD-{megad_id} уже '
+                                f'используется MegaD-{other.megad.id}')
+        self._by_id.setdefault(megad_id, coordinator)
+
+    def add(self, entry_id: str, coordinator):
+        """Добавляет координатор записи, прежние ключи записи заменяются."""
+        self.remove(entry_id)
+        hosts = self.get_hosts(coordinator.megad)
+        megad_id = str(coordinator.megad.id)
+        self._entries[entry_id] = (coordinator, hosts, megad_id)
+        self._index(coordinator, hosts, megad_id, warn=True)
+
+    def remove(self, entry_id: str):
+        """Удаляет координатор записи из индекса."""
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        coordinator, hosts, megad_id = entry
+        for host in hosts:
+            if self._by_host.get(host) is coordinator:
+                del self._by_host[host]
+        if self._by_id.get(megad_id) is coordinator:
+            del self._by_id[megad_id]
+        # Освободившиеся ключи могут принадлежать и другим записям
+        for other in self._entries.values():
+            self._index(*other)
+
+    def find(self, host: str, megad_id: str | None = None):
+        """Координатор контроллера, приславшего запрос, или None."""
+        coordinator = self._by_host.get(host)
+        if coordinator is None and megad_id:
+            coordinator = self._by_id.get(megad_id)
+        return coordinator
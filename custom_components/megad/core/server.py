@@ -1,5 +1,4 @@
 import logging
-from datetime import datetime
 from http import HTTPStatus
 
 from aiohttp.web_request import Request
@@ -7,7 +6,13 @@ from aiohttp.web_response import Response
 
 from homeassistant.components.http import HomeAssistantView
 from .const_parse import EXTRA
-from ..const import DOMAIN, ENTRIES, MEGAD_ID, MEGAD_STATE, PORT_ID
+from .megad import FEEDBACK_KEY
+from .status_parser import decode_bulk
+from .transport import request_priority
+from ..const import (
+    DOMAIN, ROUTER, MEGAD_ID, MEGAD_STATE, PORT_ID, PRIORITY_WEBHOOK,
+    FEEDBACK_EVENT
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,13 +34,8 @@ class MegadHttpView(HomeAssistantView):
         # ОТМЕЧАЕМ СОБЫТИЕ ВОССТАНОВЛЕНИЯ В WATCHDOG
         if hasattr(coordinator, 'watchdog') and coordinator.watchdog:
             coordinator.watchdog.mark_data_received()
-            coordinator.watchdog.mark_feedback_event({
-                "type": "restore_after_reboot",
-                "megad_id": coordinator.megad.id,
-                "timestamp": datetime.now().isoformat(),
-                "is_feedback": True,
-                "is_meaningful": True
-            })
+            coordinator.watchdog.mark_feedback_event(FEEDBACK_EVENT.RESTORE)
+            coordinator.schedule_update({FEEDBACK_KEY})
             _LOGGER.info(f"MegaD-{coordinator.megad.id}: watchdog обновлен после восстановления")
 
     @staticmethod
@@ -78,6 +78,8 @@ class MegadHttpView(HomeAssistantView):
 
     async def get(self, request: Request):
         """Обрабатываем GET-запрос."""
+        # Чтения, запущенные по событию контроллера, опережают опрос
+        request_priority.set(PRIORITY_WEBHOOK)
         host = request.remote
         params: dict = dict(request.query)
         _LOGGER.debug(f'MegaD request от {host}: {params}')
@@ -85,58 +87,18 @@ class MegadHttpView(HomeAssistantView):
 
         _LOGGER.debug(f"HTTP запрос получен на {self.url} от {host}")
 
-        if hass.data.get(DOMAIN) is None:
+        if ROUTER not in hass.data.get(DOMAIN, {}):
             _LOGGER.info(f'Интеграция загружается, запрос не обработан: {params}')
             return Response(status=HTTPStatus.NOT_FOUND)
 
-        entry_ids = hass.data[DOMAIN][ENTRIES]
         id_megad = params.get(MEGAD_ID)
         state_megad = params.get(MEGAD_STATE)
         ext = any(EXTRA in key for key in params)
         port_id = params.get(PORT_ID)
-        coordinator = None
-
-        _LOGGER.debug(f"Поиск контроллера: host={host}, id_megad={id_megad}, port_id={port_id}")
-
-        # Ищем координатор по нескольким критериям
-        for entry_id in entry_ids:
-            coordinator_temp = hass.data[DOMAIN][ENTRIES][entry_id]
-            if coordinator_temp is None:
-                _LOGGER.debug(f"Координатор {entry_id} равен None, пропускаем")
-                continue
-
-            try:
-                megad_id = coordinator_temp.megad.id if hasattr(coordinator_temp.megad, 'id') else "unknown"
-
-                # 1. По domain (основной метод)
-                if hasattr(coordinator_temp.megad, 'domain') and coordinator_temp.megad.domain == host:
-                    coordinator = coordinator_temp
-                    _LOGGER.debug(f"Найден контроллер по domain: MegaD-{megad_id} (domain: {host})")
-                    break
-
-                # 2. По IP из конфига (резервный метод)
-                if hasattr(coordinator_temp.megad, 'config') and hasattr(coordinator_temp.megad.config.plc, 'ip_megad'):
-                    config_ip = str(coordinator_temp.megad.config.plc.ip_megad)
-                    if config_ip == host:
-                        coordinator = coordinator_temp
-                        _LOGGER.debug(f"Найден контроллер по IP: MegaD-{megad_id} (IP: {host})")
-                        break
-
-                # 3. По MEGAD_ID из параметров запроса
-                if id_megad and hasattr(coordinator_temp.megad, 'id') and str(coordinator_temp.megad.id) == id_megad:
-                    coordinator = coordinator_temp
-                    _LOGGER.debug(f"Найден контроллер по ID: MegaD-{megad_id} (ID из запроса: {id_megad})")
-                    break
-
-            except AttributeError as e:
-                _LOGGER.warning(
-                    f'Ошибка при поиске координатора: {e}. '
-                    f'params: {params}, host: {host}'
-                )
+        coordinator = hass.data[DOMAIN][ROUTER].find(host, id_megad)
 
         if coordinator is None:
             _LOGGER.warning(f'Контроллер ip={host} не найден в конфигурации HA')
-            _LOGGER.debug(f"Доступные координаторы: {list(entry_ids.keys())}")
             return Response(status=HTTPStatus.NOT_FOUND)
 
         megad_id = coordinator.megad.id if hasattr(coordinator.megad, 'id') else "unknown"
@@ -152,19 +114,12 @@ class MegadHttpView(HomeAssistantView):
         try:
             if hasattr(coordinator, 'watchdog') and coordinator.watchdog:
                 coordinator.watchdog.mark_data_received()
+                coordinator.schedule_update({FEEDBACK_KEY})
 
                 if is_meaningful:
-                    coordinator.watchdog.mark_feedback_event({
-                        "type": "http_callback",
-                        "megad_id": megad_id,
-                        "host": host,
-                        "port_id": port_id,
-                        "state_megad": state_megad,
-                        "is_feedback": True,
-                        "is_meaningful": True,
-                        "params": {k: v for k, v in params.items() if k not in ['password', 'auth']},
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    coordinator.watchdog.mark_feedback_event(
+                        FEEDBACK_EVENT.CALLBACK, port_id, state_megad
+                    )
                     _LOGGER.debug(
                         f"MegaD-{megad_id}: отмечено ЗНАЧИМОЕ событие через callback "
                         f"(host: {host}, port: {port_id}, state: {state_megad})"
@@ -194,21 +149,36 @@ class MegadHttpView(HomeAssistantView):
         # ОБРАБАТЫВАЕМ ПЕРЕЗАГРУЗКУ КОНТРОЛЛЕРА
         if state_megad == '1':
             _LOGGER.info(f'MegaD-{megad_id} был перезагружен, начинаем восстановление')
+            coordinator.megad.poll_scheduler.clear_pushes()
+            coordinator.megad.invalidate_static()
             hass.async_create_task(self.restore_after_reboot(coordinator))
             hass.async_create_task(coordinator.async_request_refresh())
 
         # ОБРАБАТЫВАЕМ ИЗМЕНЕНИЯ ПОРТОВ
+        # Контроллер ждёт ответа перед следующим событием, поэтому событие
+        # ставится в очередь, а ответ отправляется сразу
+        reply = None
         if port_id is not None:
             _LOGGER.info(f"MegaD-{megad_id}: обновление состояния порта {port_id}, данные: {params}")
             try:
-                await coordinator.update_port_state(
-                    port_id=port_id, data=params, ext=ext
-                )
-                # ВТОРОЙ ВЫЗОВ mark_feedback_event УДАЛЁН – не дублируем
+                coordinator.megad.mark_port_push(port_id, params)
+                coordinator.coalescer.push(port_id, params, ext)
             except Exception as e:
                 _LOGGER.error(f"MegaD-{megad_id}: ошибка при обновлении порта {port_id}: {e}")
 
+            # Реакцию на событие контроллер выполнит сам по тексту ответа,
+            # изменённые ей выходы обновляются сразу (см. apply_reply)
+            reply = coordinator.reply_rules.match(params)
+            if reply:
+                try:
+                    coordinator.apply_reply(reply)
+                except Exception as e:
+                    _LOGGER.error(f"MegaD-{megad_id}: ошибка применения "
+                                  f"ответа {reply}: {e}")
+
         _LOGGER.debug(f"MegaD-{megad_id}: запрос успешно обработан")
+        if reply:
+            return Response(status=HTTPStatus.OK, text=reply)
         return Response(status=HTTPStatus.OK)
 
     async def post(self, request: Request):
@@ -220,31 +190,11 @@ class MegadHttpView(HomeAssistantView):
 
             hass = request.app['hass']
 
-            if hass.data.get(DOMAIN) is None:
+            if ROUTER not in hass.data.get(DOMAIN, {}):
                 _LOGGER.info(f'Интеграция загружается, POST запрос не обработан')
                 return Response(status=HTTPStatus.NOT_FOUND)
 
-            entry_ids = hass.data[DOMAIN][ENTRIES]
-            coordinator = None
-
-            for entry_id in entry_ids:
-                coordinator_temp = hass.data[DOMAIN][ENTRIES][entry_id]
-                if coordinator_temp is None:
-                    continue
-                try:
-                    megad_id = coordinator_temp.megad.id if hasattr(coordinator_temp.megad, 'id') else "unknown"
-                    if hasattr(coordinator_temp.megad, 'domain') and coordinator_temp.megad.domain == host:
-                        coordinator = coordinator_temp
-                        _LOGGER.debug(f"POST: найден контроллер по domain: MegaD-{megad_id}")
-                        break
-                    if hasattr(coordinator_temp.megad, 'config') and hasattr(coordinator_temp.megad.config.plc, 'ip_megad'):
-                        config_ip = str(coordinator_temp.megad.config.plc.ip_megad)
-                        if config_ip == host:
-                            coordinator = coordinator_temp
-                            _LOGGER.debug(f"POST: найден контроллер по IP: MegaD-{megad_id}")
-                            break
-                except AttributeError as e:
-                    _LOGGER.debug(f"POST: ошибка при поиске координатора: {e}")
+            coordinator = hass.data[DOMAIN][ROUTER].find(host)
 
             if coordinator is None:
                 _LOGGER.warning(f"POST: контроллер {host} не найден")
@@ -257,17 +207,11 @@ class MegadHttpView(HomeAssistantView):
 
             if hasattr(coordinator, 'watchdog') and coordinator.watchdog:
                 coordinator.watchdog.mark_data_received()
+                coordinator.schedule_update({FEEDBACK_KEY})
                 if is_meaningful:
-                    coordinator.watchdog.mark_feedback_event({
-                        "type": "http_post",
-                        "megad_id": megad_id,
-                        "host": host,
-                        "data_length": len(data),
-                        "data_preview": data[:100] if data else "",
-                        "is_feedback": True,
-                        "is_meaningful": True,
-                        "timestamp": datetime.now().isoformat()
-                    })
+                    coordinator.watchdog.mark_feedback_event(
+                        FEEDBACK_EVENT.POST, detail=len(data)
+                    )
                     coordinator.watchdog._failure_count = 0
                     coordinator.watchdog._was_offline = False
                     _LOGGER.debug(f"POST: значимые данные получены от MegaD-{megad_id}, длина: {len(data)} байт")
@@ -275,17 +219,23 @@ class MegadHttpView(HomeAssistantView):
                     _LOGGER.debug(f"POST: незначимые данные от MegaD-{megad_id}, пропущены")
 
             if data and data.strip() and is_meaningful:
+                payload = data
                 try:
                     import json
-                    json_data = json.loads(data)
-                    _LOGGER.debug(f"POST: JSON данные от MegaD-{megad_id}: {json.dumps(json_data)[:200]}...")
-                    if isinstance(json_data, dict) and 'ports' in json_data:
-                        _LOGGER.info(f"POST: получены данные о портах от MegaD-{megad_id}")
+                    payload = json.loads(data)
+                    _LOGGER.debug(f"POST: JSON данные от MegaD-{megad_id}: {json.dumps(payload)[:200]}...")
                 except json.JSONDecodeError:
                     _LOGGER.debug(f"POST: текстовые данные от MegaD-{megad_id}: {data[:100]}...")
                 except Exception as e:
                     _LOGGER.debug(f"POST: ошибка обработки данных: {e}")
 
+                # Снимок всех портов применяется как ответ cmd=all, в общей
+                # очереди с остальными событиями контроллера
+                bulk = decode_bulk(payload)
+                if bulk is not None:
+                    _LOGGER.info(f"POST: получены данные о портах от MegaD-{megad_id}")
+                    coordinator.ingest.put_call(coordinator.process_bulk, *bulk)
+
             return Response(status=HTTPStatus.OK)
 
         except Exception as e:
@@ -0,0 +1,171 @@
+import math
+from array import array
+
+
+class StateStore:
+    """
+    Компактное хранилище состояний портов одного контроллера.
+
+    Состояния реле, бинарных входов и выводов MCP230xx хранятся битами
+    одного целого числа, значения ШИМ, счётчики и выводы PCA9685 - в массиве
+    целых, показания сенсоров - в массиве вещественных с параллельными
+    массивами времени приёма и кода качества. Порт получает индексы при
+    привязке к хранилищу, а его свойства читают и пишут значения по этим
+    индексам.
+    """
+
+    __slots__ = (
+        '_bits', '_bit_count', '_values', '_readings', '_timestamps',
+        '_qualities'
+    )
+
+    def __init__(self):
+        self._bits: int = 0
+        self._bit_count: int = 0
+        self._values: array = array('q')
+        self._readings: array = array('d')
+        self._timestamps: array = array('d')
+        self._qualities: array = array('b')
+
+    def __repr__(self):
+        return (f'<StateStore(bits={self._bit_count}, '
+                f'values={len(self._values)}, '
+                f'readings={len(self._readings)})>')
+
+    def alloc_bits(self, count: int = 1) -> int:
+        """Выделяет биты, возвращает индекс первого."""
+        start = self._bit_count
+        self._bit_count += count
+        return start
+
+    def alloc_values(self, count: int = 1) -> int:
+        """Выделяет ячейки массива значений, возвращает индекс первой."""
+        start = len(self._values)
+        self._values.extend([0] * count)
+        return start
+
+    def get_bit(self, index: int) -> bool:
+        return bool(self._bits >> index & 1)
+
+    def set_bit(self, index: int, value):
+        if value:
+            self._bits |= 1 << index
+        else:
+            self._bits &= ~(1 << index)
+
+    def get_value(self, index: int) -> int:
+        return self._values[index]
+
+    def set_value(self, index: int, value: int):
+        self._values[index] = value
+
+    def alloc_readings(self, count: int = 1) -> int:
+        """
+        Выделяет ячейки показаний, возвращает индекс первой.
+
+        Показание без значения хранится как NaN.
+        """
+        start = len(self._readings)
+        self._readings.extend([math.nan] * count)
+        self._timestamps.extend([0.0] * count)
+        self._qualities.extend([0] * count)
+        return start
+
+    def get_reading(self, index: int) -> float | None:
+        value = self._readings[index]
+        return None if math.isnan(value) else value
+
+    def get_timestamp(self, index: int) -> float:
+        return self._timestamps[index]
+
+    def get_quality(self, index: int) -> int:
+        return self._qualities[index]
+
+    def set_reading(
+            self, index: int, value: float | None, timestamp: float,
+            quality: int
+    ):
+        self._readings[index] = math.nan if value is None else value
+        self._timestamps[index] = timestamp
+        self._qualities[index] = quality
+
+    def set_timestamp(self, index: int, timestamp: float):
+        self._timestamps[index] = timestamp
+
+    def set_quality(self, index: int, quality: int):
+        self._qualities[index] = quality
+
+
+class PinStates:
+    """
+    Состояния выводов расширителя портов, хранящиеся в StateStore.
+
+    Ведёт себя как список значений выводов (пустой, пока расширитель не
+    опрошен) и поддерживает get() по номеру вывода.
+    """
+
+    __slots__ = ('_store', '_start', '_size', '_length', '_bits')
+
+    def __init__(self, store: StateStore, size: int, bits: bool = False):
+        self._store = store
+        self._size = size
+        self._bits = bits
+        self._length = 0
+        if bits:
+            self._start = store.alloc_bits(size)
+        else:
+            self._start = store.alloc_values(size)
+
+    def _write(self, index: int, value):
+        if self._bits:
+            self._store.set_bit(self._start + index, value)
+        else:
+            self._store.set_value(self._start + index, int(value))
+
+    def _check_index(self, index: int):
+        if not 0 <= index < self._length:
+            raise IndexError(f'Нет вывода {index}')
+
+    def assign(self, values):
+        """Записывает состояния всех выводов."""
+        values = list(values)
+        if len(values) > self._size:
+            raise IndexError(f'Выводов {len(values)}, ожидалось не более '
+                             f'{self._size}')
+        for index, value in enumerate(values):
+            self._write(index, value)
+        self._length = len(values)
+
+    def get(self, index: int, default=None):
+        try:
+            return self[index]
+        except (IndexError, TypeError):
+            return default
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        self._check_index(index)
+        if self._bits:
+            return int(self._store.get_bit(self._start + index))
+        return self._store.get_value(self._start + index)
+
+    def __setitem__(self, index: int, value):
+        self._check_index(index)
+        self._write(index, value)
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield self[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (PinStates, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __copy__(self) -> list:
+        return list(self)
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,220 @@
+import logging
+from collections.abc import Mapping
+
+from .base_ports import (
+    RelayPortOut, PWMPortOut, BinaryPortIn, BinaryPortClick, BinaryPortCount,
+    AnalogSensor, OneWireBusSensorPort, DigitalSensorBase
+)
+from ..const import RELAY_ON, RELAY_OFF, NOT_AVAILABLE, STATE_BUTTON
+
+_LOGGER = logging.getLogger(__name__)
+
+CLICK_STATES = {
+    STATE_BUTTON.SINGLE, STATE_BUTTON.DOUBLE, STATE_BUTTON.LONG
+}
+
+
+def decode_relay(text: str) -> bool | None:
+    """ON, OFF, 1, 0"""
+    value = text.lower()
+    if value in RELAY_ON:
+        return True
+    if value in RELAY_OFF:
+        return False
+    return None
+
+
+def decode_pwm(text: str) -> int | None:
+    """100"""
+    return int(text) if text.isdigit() else None
+
+
+def decode_analog(text: str) -> str | None:
+    """224, значение остаётся строкой, как в AnalogSensor.update_state"""
+    return text if text.isdigit() else None
+
+
+def _split_count(text: str) -> tuple[str, int | None] | None:
+    state, sep, count = text.partition('/')
+    if not state.isalnum():
+        return None
+    if not sep:
+        return state, None
+    if not count.isdigit():
+        return None
+    return state, int(count)
+
+
+def decode_binary(text: str) -> tuple[bool, int | None] | None:
+    """ON, OFF/7"""
+    parts = _split_count(text)
+    if parts is None:
+        return None
+    state, count = parts
+    return state.lower() in RELAY_ON, count
+
+
+def decode_click(text: str) -> tuple[str, int | None] | None:
+    """
+    off, single, OFF/7
+
+    Как и в BinaryPortClick.update_state, регистр состояния не учитывается
+    только без счётчика: LONG/9 - это off.
+    """
+    parts = _split_count(text)
+    if parts is None:
+        return None
+    state, count = parts
+    if count is None:
+        state = state.lower()
+    return (state if state in CLICK_STATES else STATE_BUTTON.OFF), count
+
+
+def decode_count(text: str) -> tuple[None, int] | None:
+    """OFF/7"""
+    parts = _split_count(text)
+    if parts is None or parts[1] is None:
+        return None
+    return None, parts[1]
+
+
+def decode_sensor(text: str) -> dict[str, str | None] | None:
+    """
+    temp:24/hum:43
+    CO2:980/temp:25/hum:38
+    Короткая запись (25/38), busy и off разбираются классом порта.
+    """
+    if ':' not in text:
+        return None
+    states = {}
+    for sensor in text.split('/'):
+        category, sep, value = sensor.partition(':')
+        if not sep:
+            return None
+        states[category] = value if value != NOT_AVAILABLE else None
+    return states
+
+
+def decode_bulk(payload) -> tuple[list[str], dict[int, str]] | None:
+    """
+    Снимок состояний портов из тела POST-запроса контроллера.
+
+    Текст в формате ответа cmd=all: ON;OFF/7;temp:24/hum:43;MCP;...
+    JSON: {"ports": "ON;OFF/7;...", "ext": {"30": "OFF;ON;..."}}, позиции
+    портов и выводы расширителей могут быть и списками.
+
+    :return: (позиции ответа cmd=all, {порт расширителя: ответ cmd=get})
+             или None, если в теле нет снимка портов.
+    """
+    if isinstance(payload, str):
+        if ';' not in payload:
+            return None
+        return payload.strip().split(';'), {}
+    if not isinstance(payload, Mapping):
+        return None
+    ports = payload.get('ports')
+    if isinstance(ports, str):
+        ports = ports.strip().split(';')
+    elif isinstance(ports, list):
+        ports = ['' if slot is None else str(slot) for slot in ports]
+    else:
+        return None
+    ext_states = {}
+    ext = payload.get('ext')
+    if isinstance(ext, Mapping):
+        for port_id, states in ext.items():
+            if isinstance(states, list):
+                states = ';'.join(str(state) for state in states)
+            if str(port_id).isdigit() and isinstance(states, str):
+                ext_states[int(port_id)] = states
+    return ports, ext_states
+
+
+# Порядок важен: первый подходящий класс определяет декодер позиции,
+# None - позиция разбирается общим путём (отдельный запрос к порту).
+DECODERS = (
+    (RelayPortOut, decode_relay),
+    (PWMPortOut, decode_pwm),
+    (BinaryPortClick, decode_click),
+    (BinaryPortCount, decode_count),
+    (BinaryPortIn, decode_binary),
+    (AnalogSensor, decode_analog),
+    (OneWireBusSensorPort, None),
+    (DigitalSensorBase, decode_sensor),
+)
+
+
+def get_decoder(port):
+    """Декодер позиции ответа cmd=all для порта или None."""
+    if getattr(port, 'prefix', ''):
+        return None
+    for port_class, decoder in DECODERS:
+        if isinstance(port, port_class):
+            return decoder
+    return None
+
+
+class StatusParser:
+    """
+    План разбора ответа cmd=all одного контроллера.
+
+    Строится один раз по портам контроллера: каждой позиции ответа
+    сопоставлен декодер класса её порта. Позиция декодируется, только если
+    её текст изменился с момента, когда её значение последний раз было
+    применено к порту.
+    """
+
+    def __init__(self, ports: list):
+        self._plan: dict[int, tuple] = {}
+        for port in ports:
+            decoder = get_decoder(port)
+            if decoder is not None:
+                self._plan.setdefault(port.conf.id, (port, decoder))
+        self._snapshot: dict[int, str] = {}
+
+    def __contains__(self, port) -> bool:
+        """Разбирается ли состояние порта планом."""
+        plan = self._plan.get(port.conf.id)
+        return plan is not None and plan[0] is port
+
+    def __len__(self) -> int:
+        return len(self._plan)
+
+    def parse(self, slots: list[str], due: list[int] | None = None) -> dict:
+        """
+        Декодирует изменившиеся позиции ответа.
+
+        :param slots: ответ cmd=all, разделённый по ';'.
+        :param due: позиции, которые нужно разобрать, None - все из плана.
+        :return: {позиция: значение} только для изменившихся позиций;
+                 None - позицию не удалось декодировать, её нужно
+                 разобрать классом порта.
+        """
+        changed = {}
+        for slot in self._plan if due is None else due:
+            plan = self._plan.get(slot)
+            if plan is None or slot >= len(slots):
+                continue
+            decoder = plan[1]
+            text = slots[slot]
+            if self._snapshot.get(slot) == text:
+                continue
+            value = decoder(text)
+            if value is None:
+                self._snapshot.pop(slot, None)
+            else:
+                self._snapshot[slot] = text
+            changed[slot] = value
+        return changed
+
+    def forget(self, slot: int | None = None):
+        """
+        Сбрасывает запомненный текст позиции.
+
+        Вызывается, когда состояние порта изменено не опросом (push
+        контроллера, команда), чтобы следующий ответ cmd=all был применён.
+        """
+        if slot is None:
+            self._snapshot.clear()
+        else:
+            self._snapshot.pop(int(slot), None)
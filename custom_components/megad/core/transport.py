@@ -0,0 +1,156 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Callable, Coroutine
+from contextvars import ContextVar
+
+import aiohttp
+from aiohttp import ClientResponse
+
+from ..const import (
+    TIME_OUT_UPDATE_DATA, TRANSPORT_CONNECT_TIMEOUT, TRANSPORT_KEEPALIVE,
+    PRIORITY_POLL
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Приоритет запросов, отправляемых из текущего контекста (задачи)
+request_priority: ContextVar[int] = ContextVar(
+    'megad_request_priority', default=PRIORITY_POLL
+)
+
+
+class MegaDTransport:
+    """
+    HTTP-транспорт одного контроллера.
+
+    Контроллер обслуживает одно соединение за раз, поэтому у каждого
+    контроллера своя сессия с лимитом в одно соединение, а запросы
+    выполняются строго по одному. Из очереди первым берётся запрос с
+    наименьшим приоритетом, при равных приоритетах - по порядку поступления.
+    """
+
+    def __init__(
+            self, name: str = '',
+            create_task: Callable[[Coroutine], asyncio.Task] | None = None
+    ):
+        """
+        :param create_task: запуск задачи обработки очереди, например
+                            фоновой задачей записи интеграции; по
+                            умолчанию - asyncio.create_task.
+        """
+        self.name = name
+        self._create_task = create_task or asyncio.create_task
+        self._session: aiohttp.ClientSession | None = None
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._counter = itertools.count()
+        self._worker: asyncio.Task | None = None
+        self._current: asyncio.Future | None = None
+        self._closed = False
+
+    def __repr__(self):
+        return (f'<MegaDTransport({self.name}, '
+                f'queue={self._queue.qsize()})>')
+
+    @property
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Создаёт сессию с одним соединением к контроллеру."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=1, keepalive_timeout=TRANSPORT_KEEPALIVE
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=TIME_OUT_UPDATE_DATA,
+                    connect=TRANSPORT_CONNECT_TIMEOUT
+                )
+            )
+        return self._session
+
+    def _ensure_worker(self):
+        if self._worker is None or self._worker.done():
+            self._worker = self._create_task(self._run())
+
+    async def request_timed(
+            self, url: str, params: dict | None = None,
+            timeout: float = TIME_OUT_UPDATE_DATA,
+            priority: int | None = None
+    ) -> tuple[ClientResponse, float]:
+        """
+        Ставит запрос в очередь и ожидает ответ.
+
+        :param priority: класс запроса, по умолчанию - из request_priority.
+        :return: ответ с прочитанным телом и время его выполнения.
+        """
+        if self._closed:
+            raise aiohttp.ClientConnectionError(
+                f'Транспорт {self.name} закрыт'
+            )
+        if priority is None:
+            priority = request_priority.get()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(
+            (priority, next(self._counter), url, params, timeout, future)
+        )
+        self._ensure_worker()
+        return await future
+
+    async def request(
+            self, url: str, params: dict | None = None,
+            timeout: float = TIME_OUT_UPDATE_DATA,
+            priority: int | None = None
+    ) -> ClientResponse:
+        """Запрос к контроллеру через очередь."""
+        response, _ = await self.request_timed(
+            url, params, timeout, priority
+        )
+        return response
+
+    async def _run(self):
+        """Последовательно выполняет запросы из очереди."""
+        while True:
+            _, _, url, params, timeout, future = await self._queue.get()
+            if future.done():
+                continue
+            self._current = future
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(timeout):
+                    async with self._get_session().get(
+                            url=url, params=params) as response:
+                        await response.read()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result((response, time.monotonic() - start))
+            finally:
+                self._current = None
+
+    async def close(self):
+        """Останавливает очередь и закрывает сессию. Повторный вызов
+        ничего не делает."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+        pending = [self._current] if self._current is not None else []
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            pending.append(future)
+        for future in pending:
+            if not future.done():
+                future.set_exception(aiohttp.ClientConnectionError(
+                    f'Транспорт {self.name} закрыт'
+                ))
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        _LOGGER.debug(f'Транспорт {self.name} закрыт')
@@ -18,10 +18,34 @@ from .exceptions import (
     SearchMegaDError, InvalidIpAddress, InvalidPasswordMegad,
     ChangeIPMegaDError, CreateSocketReceiveError, CreateSocketSendError
 )
+from ..const import COALESCE_MAX_WINDOW
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def parse_coalesce_windows(text: str) -> dict[int, float]:
+    """
+    Разбирает окна объединения событий портов.
+
+    :param text: '3:0.5;12:2' - номер порта и окно в секундах.
+    :return: {порт: окно}
+    """
+    windows = {}
+    for item in (text or '').split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        port, sep, seconds = item.partition(':')
+        if not sep:
+            raise ValueError(f'Ожидалось порт:секунды, получено {item}')
+        window = float(seconds)
+        if not 0 < window <= COALESCE_MAX_WINDOW:
+            raise ValueError(f'Окно порта {port} должно быть от 0 до '
+                             f'{COALESCE_MAX_WINDOW} секунд')
+        windows[int(port)] = window
+    return windows
+
+
 async def get_list_config_megad(first_file='', path='') -> list:
     """Возвращает список сохранённых файлов конфигураций контроллера"""
     config_list = await asyncio.to_thread(os.listdir, path)
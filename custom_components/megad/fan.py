@@ -18,7 +18,7 @@ from .core.base_ports import (
 from .core.enums import ModeOutMegaD
 from .core.entities import PortOutEntity, PortOutExtraEntity
 from .core.enums import DeviceClassControl
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key
 from .core.models_megad import (
     PCA9685RelayConfig, MCP230RelayConfig, PCA9685PWMConfig
 )
@@ -115,10 +115,6 @@ class FanMegaD(PortOutEntity, FanEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
 
     @property
     def name(self) -> str:
@@ -219,9 +215,10 @@ class FanPWMBaseMegaD(CoordinatorEntity, FanEntity):
     def __init__(
             self, coordinator: MegaDCoordinator,
             min_speed,
-            max_speed
+            max_speed,
+            context=None
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=context)
         self.min_speed = min_speed
         self.max_speed = max_speed
         self._attr_assumed_state = True  # Включаем assumed_state
@@ -279,7 +276,9 @@ class FanPWMMegaD(FanPWMBaseMegaD):
             self, coordinator: MegaDCoordinator, port: PWMPortOut,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator, port.conf.min_value, 255)
+        super().__init__(
+            coordinator, port.conf.min_value, 255, port_key(port.conf.id)
+        )
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port: PWMPortOut = port
@@ -301,10 +300,6 @@ class FanPWMMegaD(FanPWMBaseMegaD):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
 
     def _update_state_from_port(self):
         """Обновить состояние из данных порта."""
@@ -487,10 +482,6 @@ class FanExtraMegaD(PortOutExtraEntity, FanEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
 
     @property
     def name(self) -> str:
@@ -593,7 +584,8 @@ class FanPWMExtraMegaD(FanPWMBaseMegaD):
         super().__init__(
             coordinator,
             config_extra_port.min_value,
-            config_extra_port.max_value
+            config_extra_port.max_value,
+            port_key(port.conf.id, config_extra_port.id)
         )
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
@@ -618,10 +610,6 @@ class FanPWMExtraMegaD(FanPWMBaseMegaD):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
 
     def _update_state_from_port(self):
         """Обновить состояние из данных порта."""
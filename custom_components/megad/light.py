@@ -16,7 +16,7 @@ from .core.base_ports import (
     RelayPortOut, PWMPortOut, I2CExtraPCA9685, I2CExtraMCP230xx
 )
 from .core.enums import TypePortMegaD
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key
 from .core.models_megad import (
     PCA9685RelayConfig, MCP230RelayConfig, PCA9685PWMConfig
 )
@@ -163,7 +163,7 @@ class LightRelayMegaD(CoordinatorEntity, LightEntity):
     _attr_color_mode = ColorMode.ONOFF
 
     def __init__(self, coordinator: MegaDCoordinator, port: RelayPortOut, unique_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._coordinator = coordinator
         self._megad = coordinator.megad
         self._port = port
@@ -193,9 +193,6 @@ class LightRelayMegaD(CoordinatorEntity, LightEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         self._handle_coordinator_update()
         
         # ✅ Логирование для отладки
@@ -343,7 +340,11 @@ class LightPWMBaseMegaD(CoordinatorEntity, LightEntity):
             port_id: int = None,
             extra_port_id: int = None
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=(None if port_id is None
+                     else port_key(port_id, extra_port_id))
+        )
         self._coordinator: MegaDCoordinator = coordinator
         self.min_brightness = min_brightness
         self.max_brightness = max_brightness
@@ -358,9 +359,6 @@ class LightPWMBaseMegaD(CoordinatorEntity, LightEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         self._handle_coordinator_update()
         
         # ✅ Логирование для отладки
@@ -584,7 +582,10 @@ class LightExtraMegaD(CoordinatorEntity, LightEntity):
             config_extra_port: PCA9685RelayConfig | MCP230RelayConfig,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=port_key(port.conf.id, config_extra_port.id)
+        )
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port = port
@@ -618,9 +619,6 @@ class LightExtraMegaD(CoordinatorEntity, LightEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         self._handle_coordinator_update()
         
         # ✅ Логирование для отладки
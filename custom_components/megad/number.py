@@ -15,7 +15,7 @@ from .const import (
 )
 from .core.base_pids import PIDControl
 from .core.exceptions import SetFactorPIDError
-from .core.megad import MegaD
+from .core.megad import MegaD, pid_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -60,7 +60,7 @@ class PIDCoefficientNumber(CoordinatorEntity, NumberEntity):
             unique_id: str
     ):
         """Инициализация."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=pid_key(pid.conf.id))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._pid = pid
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import math
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from .const import ORCHESTRATOR_MAX_CONCURRENT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class PollOrchestrator:
+    """
+    Общий планировщик опроса всех контроллеров интеграции.
+
+    Распределяет циклы опроса контроллеров равномерно внутри интервала и
+    ограничивает число одновременно опрашиваемых контроллеров.
+    """
+
+    def __init__(
+            self, hass: HomeAssistant,
+            max_concurrent: int = ORCHESTRATOR_MAX_CONCURRENT
+    ):
+        self.hass = hass
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._coordinators: dict = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._durations: dict[str, dict] = {}
+        self._epoch: float = time.monotonic()
+
+    def register(self, config_entry: ConfigEntry, coordinator):
+        """
+        Добавляет контроллер в опрос. Фазы остальных пересчитываются.
+
+        Цикл опроса - фоновая задача записи: HA отменит её при выгрузке
+        записи и остановке, не дожидаясь её при запуске.
+        """
+        entry_id = config_entry.entry_id
+        self._coordinators[entry_id] = coordinator
+        self._durations.setdefault(entry_id, {
+            'last': None, 'average': None, 'max': None, 'count': 0
+        })
+        self._tasks[entry_id] = config_entry.async_create_background_task(
+            self.hass, self._run(entry_id, coordinator),
+            f'megad_poll_{entry_id}'
+        )
+        _LOGGER.debug(f'Оркестратор: добавлен MegaD-{coordinator.megad.id}, '
+                      f'всего контроллеров: {len(self._coordinators)}')
+
+    async def unregister(self, entry_id: str):
+        """Удаляет контроллер из опроса."""
+        self._coordinators.pop(entry_id, None)
+        self._durations.pop(entry_id, None)
+        task = self._tasks.pop(entry_id, None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def _get_delay(self, entry_id: str, interval: float) -> float:
+        """
+        Время до следующего слота опроса контроллера.
+
+        Слоты всех контроллеров отсчитываются от общего начала, а фаза
+        контроллера зависит от его номера, поэтому циклы распределены
+        равномерно внутри интервала.
+        """
+        ids = list(self._coordinators)
+        phase = interval * ids.index(entry_id) / len(ids)
+        now = time.monotonic()
+        cycles = math.floor((now - self._epoch - phase) / interval) + 1
+        return max(0.0, self._epoch + phase + cycles * interval - now)
+
+    async def _run(self, entry_id: str, coordinator):
+        """Цикл опроса одного контроллера."""
+        interval = coordinator.megad.poll_scheduler.tick_interval
+        while True:
+            await asyncio.sleep(self._get_delay(entry_id, interval))
+            async with self._semaphore:
+                start = time.monotonic()
+                try:
+                    await coordinator.async_refresh()
+                except Exception as e:
+                    _LOGGER.error(f'Оркестратор: ошибка опроса '
+                                  f'MegaD-{coordinator.megad.id}: {e}')
+                duration = time.monotonic() - start
+                self._record_duration(entry_id, duration)
+            if duration > interval:
+                _LOGGER.warning(f'Цикл опроса MegaD-{coordinator.megad.id} '
+                                f'длился {duration:.1f} с, дольше интервала '
+                                f'{interval} с')
+
+    def _record_duration(self, entry_id: str, duration: float):
+        stats = self._durations.get(entry_id)
+        if stats is None:
+            return
+        stats['count'] += 1
+        stats['last'] = duration
+        stats['max'] = max(stats['max'] or 0, duration)
+        if stats['average'] is None:
+            stats['average'] = duration
+        else:
+            stats['average'] += (duration - stats['average']) / stats['count']
+
+    def get_cycle_stats(self, entry_id: str) -> dict:
+        """Длительность циклов опроса контроллера в секундах."""
+        stats = self._durations.get(entry_id, {})
+        return {
+            key: round(value, 3) if isinstance(value, float) else value
+            for key, value in stats.items()
+        }
+
@@ -15,8 +15,7 @@ from . import MegaDCoordinator
 from .const import (
     DOMAIN, STATE_BUTTON, SENSOR_UNIT, SENSOR_CLASS, TEMPERATURE, UPTIME,
     HUMIDITY, ENTRIES, CURRENT_ENTITY_IDS, CO2, TYPE_SENSOR_RUS, PRESSURE,
-    TYPE_SENSOR, TEMPERATURE_CONDITION, DEVIATION_TEMPERATURE,
-    ALLOWED_TEMP_JUMP, ALLOWED_HUM_JUMP, CURRENT, VOLTAGE, RAW_VALUE, LUXURY,
+    CURRENT, VOLTAGE, RAW_VALUE, LUXURY,
     BAR, SINGLE_CLICK, DOUBLE_CLICK, LONG_CLICK, CLICK_TYPES, CLICK_STATES,
     CLICK_STATE_SINGLE, CLICK_STATE_DOUBLE, CLICK_STATE_LONG, CLICK_STATE_NONE,
     WATCHDOG_CHECK_INTERVAL, WATCHDOG_MAX_FAILURES, WATCHDOG_INACTIVITY_TIMEOUT
@@ -29,7 +28,7 @@ from .core.base_ports import (
     I2CSensorINA226, I2CSensorBH1750, I2CSensorT67xx, I2CSensorBMP180,
     I2CSensorPT, I2CSensorILLUM, AnalogSensor
 )
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key, pid_key, FEEDBACK_KEY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -267,7 +266,7 @@ class StringSensorMegaD(CoordinatorEntity, SensorEntity):
             self, coordinator: MegaDCoordinator, port,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._megad: MegaD = coordinator.megad
         self._port = port
         self._sensor_name: str = port.conf.name
@@ -331,7 +330,7 @@ class ClickSensorMegaD(CoordinatorEntity, SensorEntity):
             port: BinaryPortClick,
             unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._megad: MegaD = coordinator.megad
         self._port = port
         self._unique_id: str = unique_id
@@ -441,7 +440,7 @@ class SensorMegaD(CoordinatorEntity, SensorEntity):
             unique_id: str, type_sensor: str, prefix: str = '',
             device_suffix: str = None  # ✅ НОВЫЙ ПАРАМЕТР
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._megad: MegaD = coordinator.megad
         self._port: DigitalSensorBase = port
         self.type_sensor = type_sensor
@@ -485,7 +484,6 @@ class SensorMegaD(CoordinatorEntity, SensorEntity):
         
         # ❌ НЕ создаем entity_id вручную - HA сделает это автоматически
         
-        self.last_value: None | int | float = None
         self.info_filter()
 
     def __repr__(self) -> str:
@@ -499,57 +497,6 @@ class SensorMegaD(CoordinatorEntity, SensorEntity):
             _LOGGER.info(f'Включена фильтрация значения у сенсора '
                          f'{self.entity_id}')
 
-    def general_filter(self, min_value, max_value, value, value_jump):
-        """Общий фильтр значений сенсоров."""
-        if value < min_value: value = min_value
-        elif value > max_value: value = max_value
-        if self.last_value is not None:
-            if value in (min_value, max_value) and (
-                    abs(value - self.last_value) > value_jump):
-                return self.last_value
-            elif value == 0 and abs(self.last_value) > value_jump:
-                return self.last_value
-        self.last_value = value
-        return value
-
-    def filter_temperature(self, value):
-        """Фильтр для значений температуры."""
-        min_value, max_value = TEMPERATURE_CONDITION[
-            self._port.conf.device_class
-        ]
-        min_value -= DEVIATION_TEMPERATURE
-        max_value += DEVIATION_TEMPERATURE
-        return self.general_filter(
-            min_value, max_value, value, ALLOWED_TEMP_JUMP
-        )
-
-    def filter_humidity(self, value):
-        """Фильтр для значений влажности."""
-        min_value, max_value = 0, 100
-        return self.general_filter(
-            min_value, max_value, value, ALLOWED_HUM_JUMP
-        )
-
-    def filter_bad_value(self, value):
-        """Фильтрация неадекватных значений сенсоров."""
-        if self._port.conf.filter:
-            try:
-                value = float(value)
-            except (ValueError, TypeError):
-                pass
-            if not isinstance(value, float):
-                return self.last_value
-            match self.type_sensor:
-                case TYPE_SENSOR.TEMPERATURE:
-                    return self.filter_temperature(value)
-                case TYPE_SENSOR.HUMIDITY:
-                    return self.filter_humidity(value)
-                case _:
-                    self.last_value = value
-                    return value
-        else:
-            return value
-
     @cached_property
     def name(self) -> str:
         return self._sensor_name
@@ -564,10 +511,9 @@ class SensorMegaD(CoordinatorEntity, SensorEntity):
         return SensorStateClass.MEASUREMENT
 
     @property
-    def native_value(self) -> float | str:
-        """Возвращает состояние сенсора"""
-        value = self._port.state.get(self.type_sensor)
-        return self.filter_bad_value(value)
+    def native_value(self) -> float | None:
+        """Возвращает показание сенсора, декодированное при приёме"""
+        return self._port.get_value(self.type_sensor)
 
     @cached_property
     def native_unit_of_measurement(self) -> str | None:
@@ -598,10 +544,9 @@ class SensorBusMegaD(SensorMegaD):
         self._unique_id: str = unique_id
 
     @property
-    def native_value(self) -> float | str:
-        """Возвращает состояние сенсора"""
-        value = self._port.state.get(self.id_one_wire)
-        return self.filter_bad_value(value)
+    def native_value(self) -> float | None:
+        """Возвращает показание сенсора, декодированное при приёме"""
+        return self._port.get_value(self.id_one_wire)
 
 
 class SensorDeviceMegaD(CoordinatorEntity, SensorEntity):
@@ -678,7 +623,7 @@ class AnalogSensorMegaD(CoordinatorEntity, SensorEntity):
             self, coordinator: MegaDCoordinator, port: AnalogSensor,
             unique_id: str, type_sensor: str | None = None
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._megad: MegaD = coordinator.megad
         self._port: AnalogSensor = port
         self.type_sensor = type_sensor
@@ -733,7 +678,7 @@ class PIDSensorMegaD(CoordinatorEntity, SensorEntity):
             self, coordinator: MegaDCoordinator, pid: PIDControl,
             unique_id: str, type_sensor: str | None = None
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=pid_key(pid.conf.id))
         self._megad: MegaD = coordinator.megad
         self._pid: PIDControl = pid
         self.type_sensor = type_sensor
@@ -789,7 +734,7 @@ class WatchdogStatusSensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENUM
     
     def __init__(self, coordinator: MegaDCoordinator, unique_id: str):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=FEEDBACK_KEY)
         self._coordinator = coordinator
         self._attr_unique_id = unique_id
         self._attr_name = f"MegaD {coordinator.megad.id} Watchdog Status"
@@ -837,7 +782,7 @@ class WatchdogInactivitySensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.DURATION
     
     def __init__(self, coordinator: MegaDCoordinator, unique_id: str):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=FEEDBACK_KEY)
         self._coordinator = coordinator
         self._attr_unique_id = unique_id
         self._attr_name = f"MegaD {coordinator.megad.id} Watchdog Inactivity"
@@ -867,7 +812,7 @@ class WatchdogFeedbackStatusSensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.ENUM
     
     def __init__(self, coordinator: MegaDCoordinator, unique_id: str):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=FEEDBACK_KEY)
         self._coordinator = coordinator
         self._attr_unique_id = unique_id
         self._attr_name = f"MegaD {coordinator.megad.id} Feedback Status"
@@ -904,7 +849,7 @@ class WatchdogFeedbackInactivitySensor(CoordinatorEntity, SensorEntity):
     _attr_device_class = SensorDeviceClass.DURATION
     
     def __init__(self, coordinator: MegaDCoordinator, unique_id: str):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=FEEDBACK_KEY)
         self._coordinator = coordinator
         self._attr_unique_id = unique_id
         self._attr_name = f"MegaD {coordinator.megad.id} Feedback Inactivity"
@@ -931,7 +876,7 @@ class MegaDWatchdogSensor(CoordinatorEntity, SensorEntity):
     """Сенсор статуса watchdog."""
     
     def __init__(self, coordinator, megad_id):
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=FEEDBACK_KEY)
         self._megad_id = megad_id
         self._attr_name = f"MegaD-{megad_id} Status"
         self._attr_unique_id = f"megad_{megad_id}_watchdog_status"
@@ -11,7 +11,7 @@ from .const import DOMAIN, PORT_COMMAND, ENTRIES, CURRENT_ENTITY_IDS
 from .core.base_ports import (
     RelayPortOut, PWMPortOut, I2CExtraPCA9685, I2CExtraMCP230xx
 )
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key
 from .core.enums import TypePortMegaD, DeviceClassControl
 from .core.models_megad import (
     PCA9685RelayConfig, MCP230RelayConfig, PCA9685PWMConfig
@@ -136,7 +136,7 @@ class SwitchMegaD(CoordinatorEntity, SwitchEntity):
     _attr_has_entity_name = True  # ✅ ДОБАВИТЬ ЭТУ СТРОКУ
 
     def __init__(self, coordinator: MegaDCoordinator, port: RelayPortOut, unique_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port: RelayPortOut = port
@@ -165,10 +165,6 @@ class SwitchMegaD(CoordinatorEntity, SwitchEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         # Первоначальное обновление состояния
         self._handle_coordinator_update()
         
@@ -334,7 +330,7 @@ class SwitchGroupMegaD(CoordinatorEntity, SwitchEntity):
             self, coordinator: MegaDCoordinator, group: int, name: str,
             ports: list, unique_id: str
     ) -> None:
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset(ports))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._ports: list = ports
@@ -362,10 +358,6 @@ class SwitchGroupMegaD(CoordinatorEntity, SwitchEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         # Первоначальное обновление состояния
         self._handle_coordinator_update()
         
@@ -571,7 +563,10 @@ class SwitchExtraMegaD(CoordinatorEntity, SwitchEntity):
                  port: I2CExtraPCA9685 | I2CExtraMCP230xx,
                  config_extra_port: PCA9685RelayConfig | MCP230RelayConfig,
                  unique_id: str) -> None:
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=port_key(port.conf.id, config_extra_port.id)
+        )
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port = port
@@ -603,10 +598,6 @@ class SwitchExtraMegaD(CoordinatorEntity, SwitchEntity):
     async def async_added_to_hass(self):
         """Когда сущность добавлена в HA."""
         await super().async_added_to_hass()
-        # Слушаем обновления координатора
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
         # Первоначальное обновление состояния
         self._handle_coordinator_update()
         
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 from urllib.parse import urlencode
 
@@ -12,11 +11,11 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from . import MegaDCoordinator
 from .const import (
     DOMAIN, ENTRIES, CURRENT_ENTITY_IDS, PORT, DISPLAY_COMMAND, TEXT, ROW,
-    COLUMN, SPACE, TIME_DISPLAY
+    COLUMN, SPACE
 )
 from .core.base_ports import I2CDisplayPort
 from .core.enums import DeviceI2CMegaD
-from .core.megad import MegaD
+from .core.megad import MegaD, port_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,7 +57,7 @@ class MegaDDisplayEntity(CoordinatorEntity, TextEntity):
             unique_id: str
     ):
         """Инициализация."""
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=port_key(port.conf.id))
         self._coordinator: MegaDCoordinator = coordinator
         self._megad: MegaD = coordinator.megad
         self._port: I2CDisplayPort = port
@@ -155,10 +154,8 @@ class DisplayLCD1602(MegaDDisplayEntity):
         """Set the text value."""
         _LOGGER.debug(f'Текст переданный на дисплей: {value}')
         await self._megad.request_to_megad(self.clean_line())
-        await asyncio.sleep(TIME_DISPLAY)
         params_display = self.write_line(value)
         for params in params_display:
-            await asyncio.sleep(TIME_DISPLAY)
             await self._megad.request_to_megad(params)
 
 
@@ -273,28 +270,22 @@ class DisplaySSD1306(MegaDDisplayEntity):
         count_lines = len(params_display)
         if count_lines == 1:
             await self._megad.request_to_megad(self.clean_line())
-            await asyncio.sleep(TIME_DISPLAY)
         else:
             if params_display[1].get('row') is None:
                 for i, params in enumerate(params_display):
                     if params.get('row') is None:
                         params_str = urlencode(self.clean_line())
                         await self._megad.request_to_megad(params_str)
-                        await asyncio.sleep(TIME_DISPLAY)
                     elif i == 0:
                         await self._megad.request_to_megad(self.clean_line(0))
-                        await asyncio.sleep(TIME_DISPLAY)
                     elif i == count_lines - 1:
                         await self._megad.request_to_megad(self.clean_line(6))
-                        await asyncio.sleep(TIME_DISPLAY)
             else:
                 for i, params in enumerate(params_display):
                     if params.get('text') != '':
                         await self._megad.request_to_megad(
                             self.clean_line(i * 2)
                         )
-                        await asyncio.sleep(TIME_DISPLAY)
         for params in params_display:
-            await asyncio.sleep(TIME_DISPLAY)
             params_str = urlencode(params, safe='%')
             await self._megad.request_to_megad(params_str)
@@ -149,7 +149,8 @@ class MegaDFirmwareUpdate(CoordinatorEntity, UpdateEntity):
         manager_config = MegaDConfigManager(
             url,
             self._megad.config_path,
-            async_get_clientsession(self.hass)
+            async_get_clientsession(self.hass),
+            self._megad.transport
         )
         await manager_config.read_config_file()
         _LOGGER.debug(f'Прочитан файл конфигурации. Всего строк: '
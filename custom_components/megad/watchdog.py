@@ -3,19 +3,26 @@ import logging
 import platform
 import socket
 import re
-from datetime import datetime
+import time
+from collections import deque
+from datetime import datetime, timedelta
 from typing import Optional, Callable, Any, List
 
 import async_timeout
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from .const import (
     WATCHDOG_MAX_FAILURES,
     WATCHDOG_INACTIVITY_TIMEOUT,
     WATCHDOG_CHECK_INTERVAL,
     WATCHDOG_FEEDBACK_TIMEOUT,
+    WATCHDOG_EVENT_HISTORY,
+    FEEDBACK_EVENT,
     DOMAIN,
     DEFAULT_CF1_SETTINGS,
+    COMMAND,
+    GET_ID,
+    RESTART,
+    ON,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -35,6 +42,7 @@ class MegaDWatchdog:
         self._max_failures = WATCHDOG_MAX_FAILURES
         self._recovering = False
         self._last_success = None
+        # Отметки времени watchdog - по time.monotonic()
         self._last_incoming_data = None  # любые данные (включая команды HA)
         self._health_check_interval = WATCHDOG_CHECK_INTERVAL
         self._was_offline = False
@@ -55,6 +63,8 @@ class MegaDWatchdog:
         self._feedback_check_attempts = 0
         self._meaningful_event_counter = 0
         self._non_meaningful_event_counter = 0
+        # Последние события: (время, вид, порт, подробность)
+        self._events: deque = deque(maxlen=WATCHDOG_EVENT_HISTORY)
 
     async def start(self):
         if self._is_running:
@@ -63,16 +73,18 @@ class MegaDWatchdog:
         self._failure_count = 0
         self._recovering = False
         self._was_offline = False
-        self._last_incoming_data = datetime.now()
+        now = time.monotonic()
+        self._last_incoming_data = now
         self._last_success = datetime.now()
         self._last_reboot_attempt = None
         self._last_restore_time = None
 
-        self._feedback_last_event = datetime.now()
-        self._last_meaningful_feedback = datetime.now()
+        self._feedback_last_event = now
+        self._last_meaningful_feedback = now
         self._feedback_check_attempts = 0
         self._meaningful_event_counter = 0
         self._non_meaningful_event_counter = 0
+        self._events.clear()
 
         self._watchdog_task = asyncio.create_task(self._watchdog_loop())
         _LOGGER.info(f"Watchdog для MegaD-{self.megad.id} запущен")
@@ -97,37 +109,48 @@ class MegaDWatchdog:
 
     def mark_data_received(self):
         """Вызывается при любом получении данных от контроллера."""
-        self._last_incoming_data = datetime.now()
+        self._last_incoming_data = time.monotonic()
         self._failure_count = 0
 
-    def mark_feedback_event(self, event_data: Any = None):
-        """Вызывается ТОЛЬКО при получении реальных событий от контроллера."""
-        is_real_feedback = False
-        if isinstance(event_data, dict):
-            # Только входящие HTTP-запросы от контроллера (с портом) и перезагрузка
-            if event_data.get("type") == "http_callback" and event_data.get("port_id") is not None:
-                is_real_feedback = True
-            elif event_data.get("type") == "restore_after_reboot":
-                is_real_feedback = True
-            # Игнорируем port_updated, periodic_update, и любые другие типы
-
-        self.mark_data_received()
-
-        if is_real_feedback:
-            self._feedback_last_event = datetime.now()
-            self._last_meaningful_feedback = datetime.now()
+    def mark_feedback_event(
+            self,
+            kind: str | dict | None = None,
+            port_id: Any = None,
+            detail: Any = None
+    ):
+        """
+        Учитывает событие обратной связи.
+
+        Событие хранится кортежем в кольцевом буфере, словари для
+        диагностики строятся только в get_recent_events. Обратной связью
+        считаются только запросы контроллера с портом и перезагрузка.
+
+        :param kind: вид события (FEEDBACK_EVENT) или словарь прежнего
+                     формата с ключами type и port_id.
+        """
+        if isinstance(kind, dict):
+            port_id = kind.get('port_id', port_id)
+            kind = kind.get('type')
+        now = time.monotonic()
+        self._last_incoming_data = now
+        self._failure_count = 0
+        self._events.append((now, kind, port_id, detail))
+
+        if (kind == FEEDBACK_EVENT.CALLBACK and port_id is not None
+                or kind == FEEDBACK_EVENT.RESTORE):
+            self._feedback_last_event = now
+            self._last_meaningful_feedback = now
             self._feedback_check_attempts = 0
             self._meaningful_event_counter += 1
 
             # Если мы ожидаем подтверждения восстановления, отменяем таймер
             if self._restore_verification_task and not self._restore_verification_task.done():
                 self._restore_verification_task.cancel()
-                _LOGGER.info(f"MegaD-{self.megad.id}: ✅ обратная связь подтверждена через {(datetime.now() - self._last_restore_time).total_seconds():.0f} сек")
+                _LOGGER.info(f"MegaD-{self.megad.id}: ✅ обратная связь подтверждена через {now - self._last_restore_time:.0f} сек")
             _LOGGER.info(f"MegaD-{self.megad.id}: ✅ обратная связь от контроллера! (#{self._meaningful_event_counter})")
         else:
             self._non_meaningful_event_counter += 1
-            # Для отладки можно залогировать, что событие проигнорировано
-            _LOGGER.debug(f"MegaD-{self.megad.id}: игнорируем событие (не обратная связь): {event_data}")
+            _LOGGER.debug(f"MegaD-{self.megad.id}: игнорируем событие (не обратная связь): {kind}")
 
     async def _watchdog_loop(self):
         _LOGGER.debug(f"Watchdog запущен с интервалом {self._health_check_interval} сек")
@@ -175,30 +198,30 @@ class MegaDWatchdog:
     def _get_inactivity_seconds(self) -> int:
         if not self._last_incoming_data:
             return 0
-        return int((datetime.now() - self._last_incoming_data).total_seconds())
+        return int(time.monotonic() - self._last_incoming_data)
 
     def _get_feedback_inactivity_seconds(self) -> int:
         if not self._last_meaningful_feedback:
             return 999999
-        return int((datetime.now() - self._last_meaningful_feedback).total_seconds())
+        return int(time.monotonic() - self._last_meaningful_feedback)
 
     def _get_meaningful_inactivity_seconds(self) -> int:
         if not self._last_meaningful_feedback:
             return 999999
-        return int((datetime.now() - self._last_meaningful_feedback).total_seconds())
+        return int(time.monotonic() - self._last_meaningful_feedback)
+
+    @staticmethod
+    def _to_datetime(timestamp: float) -> datetime:
+        """Время по time.monotonic() в локальное время."""
+        return datetime.now() - timedelta(seconds=time.monotonic() - timestamp)
 
     async def _check_megad_health_basic(self) -> bool:
         if not await self._ping_megad():
             return False
         try:
-            session = async_get_clientsession(self.hass)
-            base_url = self.megad.url.rstrip('/')
             async with async_timeout.timeout(3):
-                async with session.get(f"{base_url}/sec/?cmd=id") as resp:
-                    if resp.status == 200:
-                        text = await resp.text()
-                        return bool(text and text.strip() and "timeout" not in text.lower())
-            return False
+                text = await self.megad.get_status({COMMAND: GET_ID})
+            return bool(text and text.strip() and "timeout" not in text.lower())
         except Exception:
             return False
 
@@ -233,7 +256,7 @@ class MegaDWatchdog:
     async def _restore_feedback(self) -> bool:
         """Одна попытка восстановления обратной связи (отправка Save)."""
         if self._last_restore_time:
-            if (datetime.now() - self._last_restore_time).total_seconds() < self._restore_cooldown:
+            if time.monotonic() - self._last_restore_time < self._restore_cooldown:
                 return False
 
         _LOGGER.warning(f"MegaD-{self.megad.id}: === ВОССТАНОВЛЕНИЕ ОБРАТНОЙ СВЯЗИ ===")
@@ -243,9 +266,9 @@ class MegaDWatchdog:
             await self._create_manual_intervention_notification()
             return False
 
-        self._last_restore_time = datetime.now()
+        self._last_restore_time = time.monotonic()
         # Сбрасываем таймер обратной связи, чтобы статус временно стал "ok"/"waiting"
-        self._last_meaningful_feedback = datetime.now()
+        self._last_meaningful_feedback = self._last_restore_time
         self._feedback_check_attempts = 0
 
         # Запускаем фоновую проверку: если за _restore_wait_seconds не придёт ни одного события – тревога
@@ -270,7 +293,6 @@ class MegaDWatchdog:
     async def _send_restore_request(self) -> bool:
         """Формирует и отправляет правильный GET-запрос с параметрами CF1 и save=1."""
         try:
-            session = async_get_clientsession(self.hass)
             controller_ip = str(self.megad.config.plc.ip_megad)
             password = getattr(self.megad.config.plc, "password", "sec")
             ha_ip = await self._get_home_assistant_ip()
@@ -282,11 +304,10 @@ class MegaDWatchdog:
             server_address = f"{ha_ip}:8123"
             encoded_server = server_address.replace(":", "%3A")
             standard = DEFAULT_CF1_SETTINGS.copy()
-            base_url = self.megad.url.rstrip("/")
 
-            # Формируем URL
-            url = (
-                f"{base_url}/sec/?cf=1"
+            # Формируем строку запроса
+            query = (
+                f"cf=1"
                 f"&eip={controller_ip}"
                 f"&emsk={standard.get('emsk', '255.255.255.0')}"
                 f"&pwd={password}"
@@ -305,12 +326,11 @@ class MegaDWatchdog:
             _LOGGER.info(f"  IP контроллера: {controller_ip}")
             _LOGGER.info(f"  Адрес сервера HA: {server_address}")
 
-            async with async_timeout.timeout(5):
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        return True
-                    _LOGGER.warning(f"HTTP статус {resp.status}")
-                    return False
+            resp = await self.megad.request_to_megad(query)
+            if resp.status == 200:
+                return True
+            _LOGGER.warning(f"HTTP статус {resp.status}")
+            return False
 
         except asyncio.TimeoutError:
             # Таймаут – контроллер начал перезагрузку, считаем успехом
@@ -338,11 +358,9 @@ class MegaDWatchdog:
 
     async def _send_reboot_command(self) -> bool:
         try:
-            session = async_get_clientsession(self.hass)
-            base_url = self.megad.url.rstrip("/")
             async with async_timeout.timeout(3):
-                async with session.get(f"{base_url}/sec/?restart=1") as resp:
-                    return resp.status == 200
+                resp = await self.megad.request_to_megad({RESTART: ON})
+            return resp.status == 200
         except asyncio.TimeoutError:
             return True
         except Exception:
@@ -455,6 +473,29 @@ class MegaDWatchdog:
             "non_meaningful_event_counter": self._non_meaningful_event_counter,
         }
 
+    def get_recent_events(self, limit: int | None = None) -> list[dict]:
+        """Последние события обратной связи для диагностики."""
+        events = list(self._events)
+        if limit is not None:
+            events = events[-limit:]
+        return [
+            {
+                "type": kind,
+                "port_id": port_id,
+                "detail": detail,
+                "timestamp": self._to_datetime(timestamp).isoformat(
+                    timespec='seconds'
+                ),
+            }
+            for timestamp, kind, port_id, detail in events
+        ]
+
+    def get_last_data_time(self) -> datetime | None:
+        """Время последнего получения данных."""
+        if not self._last_incoming_data:
+            return None
+        return self._to_datetime(self._last_incoming_data)
+
     def get_inactivity_seconds(self) -> int:
         return self._get_inactivity_seconds()
 
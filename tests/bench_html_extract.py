@@ -0,0 +1,66 @@
+"""
+Сравнение разбора страниц контроллера: BeautifulSoup + lxml и html_extract.
+
+Запуск из корня репозитория: python -m tests.bench_html_extract
+"""
+import timeit
+
+from bs4 import BeautifulSoup
+
+from custom_components.megad.core.html_extract import (
+    START, find_input_value, find_text, get_form_params, get_link_texts,
+    get_select_tail, get_text_after
+)
+from .test_html_extract import PAGE_NAMES, bs4_get_params, read_page
+
+REPEAT = 5
+NUMBER = 100
+
+
+def parse_bs4(page: str):
+    """Разбор страницы, как в прежних функциях config_parser: каждая
+    функция строила своё дерево."""
+    bs4_get_params(page)
+    BeautifulSoup(page, 'lxml').find(string=lambda text: 'Uptime' in text)
+    BeautifulSoup(page, 'lxml').find(string=lambda text: '(fw:' in text)
+    BeautifulSoup(page, 'lxml').find('input', {'name': 'mdid'})
+    select = BeautifulSoup(page, 'lxml').find('select', {'name': 'm'})
+    if select is not None:
+        str(select.next_sibling)
+    soup = BeautifulSoup(page, 'lxml')
+    [str(br.next_sibling) for br in soup.find_all('br')]
+    [a.text for a in BeautifulSoup(page, 'lxml').find_all('a')]
+
+
+def parse_extract(page: str):
+    """Тот же разбор через html_extract."""
+    get_form_params(page)
+    find_text(page, 'Uptime')
+    find_text(page, '(fw:')
+    find_input_value(page, 'mdid')
+    get_select_tail(page, 'm')
+    list(get_text_after(page, START, 'br'))
+    get_link_texts(page)
+
+
+def bench(parse) -> float:
+    """Лучшее время разбора одной страницы в микросекундах."""
+    pages = [read_page(name) for name in PAGE_NAMES]
+    best = min(timeit.repeat(
+        lambda: [parse(page) for page in pages],
+        repeat=REPEAT, number=NUMBER
+    ))
+    return best / NUMBER / len(pages) * 1e6
+
+
+def main():
+    old = bench(parse_bs4)
+    new = bench(parse_extract)
+    print(f'Страниц: {len(PAGE_NAMES)}, повторов: {REPEAT}x{NUMBER}')
+    print(f'BeautifulSoup + lxml: {old:8.0f} мкс/страница')
+    print(f'html_extract:         {new:8.0f} мкс/страница')
+    print(f'Ускорение:            {old / new:8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Разбор ответа cmd=all: прежний путь (update_state каждого порта) и
+StatusParser с декодерами и пропуском неизменившихся позиций.
+
+Запуск из корня репозитория: python -m tests.bench_status_parser
+"""
+import logging
+import timeit
+
+from custom_components.megad.core.status_parser import StatusParser
+from .test_status_parser import SPECS, apply_decoded
+
+SLOTS = 45
+REPEAT = 5
+NUMBER = 2000
+
+# Строки, в которых меняется каждая позиция, без ошибочных значений
+LINES = (
+    {'relay': 'ON', 'pwm': '100', 'binary': 'ON/12', 'click': 'single/8',
+     'count': 'OFF/7', 'analog': '224', 'dht': 'temp:24/hum:43',
+     'one_wire': 'temp:24.5'},
+    {'relay': 'OFF', 'pwm': '17', 'binary': 'OFF/13', 'click': 'off/9',
+     'count': 'ON/8', 'analog': '225', 'dht': 'temp:24.5/hum:41',
+     'one_wire': 'temp:24.75'},
+)
+
+
+def make_ports() -> list:
+    specs = [spec for spec in SPECS if spec.name in LINES[0]]
+    return [specs[i % len(specs)].make(i) for i in range(SLOTS)]
+
+
+def make_line(ports: list, variant: int) -> list[str]:
+    return [LINES[variant][port.conf.name] for port in ports]
+
+
+def update_ports_previous(ports: list, slots: list[str]):
+    """Прежний MegaD.update_ports: каждая позиция разбирается портом."""
+    for port in ports:
+        port.update_state(slots[port.conf.id])
+
+
+def update_ports_parser(parser: StatusParser, ports: list, slots: list[str]):
+    decoded = parser.parse(slots)
+    for port in ports:
+        apply_decoded(port, decoded, slots)
+
+
+def bench(func) -> float:
+    """Лучшее время разбора одной строки в микросекундах."""
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER))
+    return best / NUMBER * 1e6
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    ports = make_ports()
+    lines = [make_line(ports, 0), make_line(ports, 1)]
+    parser = StatusParser(ports)
+    step = iter(range(10 ** 9))
+
+    previous = bench(
+        lambda: update_ports_previous(ports, lines[next(step) % 2])
+    )
+    changed = bench(
+        lambda: update_ports_parser(parser, ports, lines[next(step) % 2])
+    )
+    steady = bench(lambda: update_ports_parser(parser, ports, lines[0]))
+    print(f'Позиций в строке: {SLOTS}, повторов: {REPEAT}x{NUMBER}')
+    print(f'update_state всех позиций:           {previous:6.1f} мкс/строка')
+    print(f'StatusParser, изменились все:        {changed:6.1f} мкс/строка')
+    print(f'StatusParser, без изменений:         {steady:6.1f} мкс/строка')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup, NavigableString
+
+from custom_components.megad.core.html_extract import (
+    START, END, find_input_value, find_text, get_form_params,
+    get_link_texts, get_select_tail, get_text_after
+)
+
+PAGES = Path(__file__).parent / 'fixtures' / 'pages'
+PAGE_NAMES = sorted(path.name for path in PAGES.glob('*.html'))
+
+
+def read_page(name: str) -> str:
+    return (PAGES / name).read_text(encoding='utf-8')
+
+
+def bs4_get_params(page: str) -> str:
+    """Прежний MegaDConfigManager.get_params на BeautifulSoup."""
+    params = ''
+    soup = BeautifulSoup(page, 'lxml')
+    for form in soup.find_all('form'):
+        if form.get('style') == 'display:inline':
+            continue
+        for inp in form.find_all('input'):
+            if inp.get('type') != "submit":
+                name = inp.get('name')
+                value = inp.get('value', '')
+                if inp.get('type') == "checkbox":
+                    value = '1' if inp.has_attr('checked') else ''
+                params += f"{name}={value}&"
+
+        for select in soup.find_all('select'):
+            name = select.get('name')
+            selected_option = select.find('option', selected=True)
+            if selected_option:
+                value = selected_option.get('value', '')
+                params += f"{name}={value}&"
+    return params.rstrip('&')
+
+
+def sibling_text(node) -> str:
+    """Текст соседнего узла или пустая строка, если это тег."""
+    return str(node) if isinstance(node, NavigableString) else ''
+
+
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_form_params_match_bs4(name):
+    page = read_page(name)
+    assert get_form_params(page) == bs4_get_params(page)
+
+
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_text_after_br_match_bs4(name):
+    page = read_page(name)
+    soup = BeautifulSoup(page, 'lxml')
+    expected = [sibling_text(br.next_sibling) for br in soup.find_all('br')]
+    assert list(get_text_after(page, START, 'br')) == expected
+
+
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_select_tail_match_bs4(name):
+    page = read_page(name)
+    soup = BeautifulSoup(page, 'lxml')
+    for select in soup.find_all('select'):
+        assert get_select_tail(page, select.get('name')) == sibling_text(
+            select.next_sibling
+        )
+    assert get_select_tail(page, 'missing') is None
+
+
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_link_texts_match_bs4(name):
+    page = read_page(name)
+    soup = BeautifulSoup(page, 'lxml')
+    assert get_link_texts(page) == [a.text for a in soup.find_all('a')]
+
+
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_input_values_match_bs4(name):
+    page = read_page(name)
+    soup = BeautifulSoup(page, 'lxml')
+    for inp in soup.find_all('input'):
+        name = inp.get('name')
+        if name is None:
+            continue
+        first = soup.find('input', {'name': name})
+        assert find_input_value(page, name) == first.get('value', '')
+    assert find_input_value(page, 'missing') is None
+
+
+@pytest.mark.parametrize('marker', ['Uptime', 'Temp', '(fw:', 'Val:'])
+@pytest.mark.parametrize('name', PAGE_NAMES)
+def test_find_text_match_bs4(name, marker):
+    page = read_page(name)
+    soup = BeautifulSoup(page, 'lxml')
+    found = soup.find(string=lambda text: marker in text)
+    assert find_text(page, marker) == (str(found) if found else None)
+
+
+def test_config_main_values():
+    page = read_page('config_main.html')
+    assert find_text(page, '(fw:') == ' (fw: 4.62b6)'
+    assert find_text(page, 'Uptime').strip() == 'Uptime: 30d 18:34'
+    assert find_input_value(page, 'mdid') == 'megad01'
+    assert find_input_value(page, 'sct') == 'megad'
+
+
+def test_thermostat_disabled():
+    page = read_page('port_thermostat_dis.html')
+    assert 'DIS' in get_select_tail(page, 'm')
+    assert find_input_value(page, 'misc') == '31.0'
+    assert 'DIS' not in get_select_tail(read_page('port_in.html'), 'm')
+
+
+def test_entities_and_raw_text():
+    page = ('<style>a<b{}</style><form><input name=t value="a &amp; b">'
+            '<select name=s><option value=1>1<option value=2 selected>2'
+            '</select></form><br>x &lt; y')
+    assert get_form_params(page) == 't=a & b&s=2'
+    assert list(get_text_after(page, START, 'br')) == ['x < y']
+    assert list(get_text_after(page, END, 'style')) == ['']
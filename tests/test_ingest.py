@@ -0,0 +1,51 @@
+import asyncio
+
+from custom_components.megad.const import COALESCE_HISTORY
+from custom_components.megad.core.ingest import PortCoalescer
+
+WINDOW = 0.01
+
+
+def run_burst(events: list[tuple[int, dict]]) -> list[tuple]:
+    """События через PortCoalescer с окном для порта 7."""
+    emitted = []
+
+    async def burst():
+        coalescer = PortCoalescer('test', {7: WINDOW}, lambda *event: (
+            emitted.append(event)
+        ))
+        for port_id, params in events:
+            coalescer.push(port_id, params, False)
+        await asyncio.sleep(WINDOW * 5)
+        coalescer.close()
+
+    asyncio.run(burst())
+    return emitted
+
+
+def test_click_burst_keeps_edges():
+    first = {'pt': '7', 'click': '1'}
+    second = {'pt': '7', 'click': '2'}
+    emitted = run_burst([(7, first), (7, second)])
+    assert emitted == [(7, second, False, (first, second), 2)]
+
+
+def test_count_burst_keeps_count_and_last_edges():
+    events = [(7, {'pt': '7', 'm': '0', 'cnt': str(cnt)})
+              for cnt in range(1, 41)]
+    emitted = run_burst(events)
+    assert len(emitted) == 1
+    port_id, merged, ext, edges, count = emitted[0]
+    assert merged['cnt'] == '40'
+    assert count == 40
+    assert len(edges) == COALESCE_HISTORY
+    assert [edge['cnt'] for edge in edges] == [
+        str(cnt) for cnt in range(41 - COALESCE_HISTORY, 41)
+    ]
+
+
+def test_port_without_window_is_not_coalesced():
+    params = {'pt': '8', 'm': '0'}
+    assert run_burst([(8, params), (8, params)]) == [
+        (8, params, False), (8, params, False)
+    ]
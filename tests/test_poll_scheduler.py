@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from custom_components.megad.const import POLL_CLASS_PID
+from custom_components.megad.core.poll_scheduler import PollScheduler
+
+START = 1000.0
+REQUEST_TIME = 0.05
+
+
+def make_scheduler(interval: int) -> PollScheduler:
+    scheduler = PollScheduler(intervals={POLL_CLASS_PID: interval})
+    scheduler.add_pid(SimpleNamespace(conf=SimpleNamespace(id=0)))
+    return scheduler
+
+
+def run_ticks(scheduler: PollScheduler, ticks: int, jitter=()) -> list[int]:
+    """Номера циклов координатора, в которых задание было опрошено."""
+    polled = []
+    tick = scheduler.tick_interval
+    for number in range(ticks):
+        now = START + number * tick + (jitter[number] if jitter else 0)
+        for job in scheduler.pop_due(now):
+            polled.append(number)
+            scheduler.reschedule(job, now + REQUEST_TIME)
+    return polled
+
+
+def test_interval_equal_to_tick_polled_every_tick():
+    scheduler = make_scheduler(60)
+    assert scheduler.tick_interval == 60
+    assert run_ticks(scheduler, 10) == list(range(10))
+
+
+def test_interval_equal_to_tick_with_timer_jitter():
+    scheduler = make_scheduler(60)
+    jitter = [0.004, 0, 0.01, -0.003, 0.002, 0, -0.001, 0.008, 0, 0]
+    assert run_ticks(scheduler, 10, jitter) == list(range(10))
+
+
+def test_multiple_of_tick_polled_every_other_tick():
+    scheduler = make_scheduler(120)
+    # Цикл координатора задаёт самый короткий интервал (60 с)
+    assert scheduler.tick_interval == 60
+    assert run_ticks(scheduler, 10) == [0, 2, 4, 6, 8]
+
+
+def test_missed_deadlines_are_not_caught_up():
+    scheduler = make_scheduler(60)
+    (job,) = scheduler.pop_due(START)
+    scheduler.reschedule(job, START + 200)
+    assert job.deadline == START + 240
+    assert scheduler.pop_due(START + 180) == []
+    assert scheduler.pop_due(START + 240) == [job]
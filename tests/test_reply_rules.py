@@ -0,0 +1,43 @@
+import pytest
+
+from custom_components.megad.core.reply_rules import (
+    EVENT_PRESS, EVENT_RELEASE, ReplyRules, get_event, parse_reply_rules
+)
+
+
+@pytest.mark.parametrize('params, event', [
+    ({'pt': '7'}, EVENT_PRESS),
+    ({'pt': '7', 'm': '0'}, EVENT_PRESS),
+    ({'pt': '7', 'm': '1'}, EVENT_RELEASE),
+    ({'pt': '7', 'm': '2'}, 'long'),
+    ({'pt': '7', 'click': '2'}, 'double'),
+    ({'pt': '7', 'v': '25'}, None),
+    ({'pt': '7', 'm': '0', 'v': '1'}, EVENT_PRESS),
+])
+def test_get_event(params, event):
+    assert get_event(params) == event
+
+
+@pytest.mark.parametrize('command, values, ports, groups', [
+    ('8:1', {8: '1'}, [], []),
+    ('8:0;9:1', {8: '0', 9: '1'}, [], []),
+    ('8:2', {}, [8], []),
+    ('8:1;8:2', {}, [8], []),
+    ('8:2;8:0', {8: '0'}, [], []),
+    ('g1:0;10:1', {10: '1'}, [], [1]),
+    ('8:1;p20;9:1', {8: '1'}, [9], []),
+    ('8:100', {8: '100'}, [], []),
+])
+def test_get_actions(command, values, ports, groups):
+    actions = ReplyRules.get_actions(command)
+    assert actions.values == values
+    assert actions.ports == ports
+    assert actions.groups == groups
+
+
+def test_match_prefers_event_rule():
+    rules = ReplyRules(parse_reply_rules('7.single=8:2, 7=9:1'))
+    assert rules.match({'pt': '7', 'click': '1'}) == '8:2'
+    assert rules.match({'pt': '7'}) == '9:1'
+    assert rules.match({'pt': '7', 'v': '25'}) is None
+    assert rules.match({'pt': '6'}) is None
@@ -0,0 +1,85 @@
+from custom_components.megad.core.base_ports import (
+    DHTSensorPort, OneWireBusSensorPort, OneWireSensorPort
+)
+from custom_components.megad.core.models_megad import (
+    DHTSensorConfig, OneWireBusSensorConfig, OneWireSensorConfig
+)
+from custom_components.megad.core.state_store import StateStore
+from custom_components.megad.const import (
+    DIRECTION, HUMIDITY, READING_QUALITY, STATUS_THERMO, TEMPERATURE
+)
+
+
+def make_port(port_class, config_class, port_id=0, **fields):
+    conf = config_class.model_construct(
+        id=port_id, name='sensor', type_port=None, **fields
+    )
+    return port_class(conf, 'megad01')
+
+
+def test_reading_slots():
+    store = StateStore()
+    index = store.alloc_readings(2)
+    assert store.get_reading(index) is None
+    store.set_reading(index + 1, 24.5, 10.0, 2)
+    assert store.get_reading(index + 1) == 24.5
+    assert store.get_timestamp(index + 1) == 10.0
+    assert store.get_quality(index + 1) == 2
+    store.set_reading(index + 1, None, 11.0, 1)
+    assert store.get_reading(index + 1) is None
+
+
+def test_sensor_readings_live_in_store():
+    port = make_port(DHTSensorPort, DHTSensorConfig)
+    port.update_state('temp:24/hum:43')
+    store = StateStore()
+    store.alloc_readings(3)
+    port.attach(store)
+    assert port.get_value(TEMPERATURE) == 24.0
+    assert port.get_value(HUMIDITY) == 43.0
+    assert repr(store) == '<StateStore(bits=0, values=0, readings=5)>'
+    port.update_state('temp:NA/hum:41')
+    readings = port.readings
+    assert readings[TEMPERATURE].value is None
+    assert readings[TEMPERATURE].quality == READING_QUALITY.NA
+    assert readings[HUMIDITY].value == 41.0
+    port.update_state('busy')
+    assert port.readings[HUMIDITY].quality == READING_QUALITY.BUSY
+    assert port.get_value(HUMIDITY) == 41.0
+
+
+def test_bus_sensor_slots_are_allocated_on_first_reading():
+    port = make_port(OneWireBusSensorPort, OneWireBusSensorConfig)
+    port.attach(StateStore())
+    port.update_state('fed000412106:24.37')
+    port.update_state('fed000412106:24.5;619303000000:24.68')
+    assert port.get_value('fed000412106') == 24.5
+    assert port.get_value('619303000000') == 24.68
+    assert port.get_value('missing') is None
+
+
+def test_unchanged_reading_updates_only_timestamp():
+    port = make_port(DHTSensorPort, DHTSensorConfig)
+    port.update_state('temp:24/hum:43')
+    first = port.readings
+    port.update_state('temp:24/hum:44')
+    second = port.readings
+    assert second[TEMPERATURE].value == first[TEMPERATURE].value
+    assert second[TEMPERATURE].timestamp >= first[TEMPERATURE].timestamp
+    assert second[HUMIDITY].value == 44.0
+    assert port.state == {TEMPERATURE: 24.0, HUMIDITY: 44.0}
+
+
+def test_one_wire_service_flags_live_in_store():
+    port = make_port(OneWireSensorPort, OneWireSensorConfig)
+    assert port.state == {DIRECTION: False, STATUS_THERMO: True}
+    port.update_state({'pt': '0', 'v': '2712', 'dir': '1'})
+    port.update_state({STATUS_THERMO: False})
+    store = StateStore()
+    port.attach(store)
+    assert port.state == {
+        TEMPERATURE: 27.12, DIRECTION: True, STATUS_THERMO: False
+    }
+    port.update_state('temp:24.5')
+    assert port.state[TEMPERATURE] == 24.5
+    assert port.state[DIRECTION] is True
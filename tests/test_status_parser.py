@@ -0,0 +1,128 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from custom_components.megad.core.base_ports import (
+    RelayPortOut, PWMPortOut, BinaryPortIn, BinaryPortClick, BinaryPortCount,
+    AnalogSensor, DHTSensorPort, OneWireSensorPort
+)
+from custom_components.megad.core.models_megad import (
+    PortOutRelayConfig, PortOutPWMConfig, PortInConfig, AnalogPortConfig,
+    DHTSensorConfig, OneWireSensorConfig
+)
+from custom_components.megad.core.status_parser import (
+    StatusParser, get_decoder
+)
+
+
+@dataclass
+class PortSpec:
+    """Порт для проверки и последовательность его позиций ответа cmd=all."""
+
+    name: str
+    port_class: type
+    config_class: type
+    samples: list[str]
+    fields: dict = field(default_factory=dict)
+
+    def make(self, port_id: int = 0):
+        conf = self.config_class.model_construct(
+            id=port_id, name=self.name, type_port=None, **self.fields
+        )
+        return self.port_class(conf, 'megad01')
+
+
+BINARY_SAMPLES = [
+    'ON', 'OFF', 'OFF/7', 'ON/12', 'on/13', '1', '0/14', 'ON/', 'OFF/x',
+    'busy', 'ON/15'
+]
+SPECS = [
+    PortSpec('relay', RelayPortOut, PortOutRelayConfig,
+             ['ON', 'OFF', '1', '0', 'on', 'busy', 'ON', 'x']),
+    PortSpec('relay_inverse', RelayPortOut, PortOutRelayConfig,
+             ['ON', 'OFF', '1', '0', 'busy'], {'inverse': True}),
+    PortSpec('pwm', PWMPortOut, PortOutPWMConfig,
+             ['100', '0', '255', 'abc', '-1', '17']),
+    PortSpec('binary', BinaryPortIn, PortInConfig, BINARY_SAMPLES),
+    PortSpec('binary_inverse', BinaryPortIn, PortInConfig, BINARY_SAMPLES,
+             {'inverse': True}),
+    PortSpec('click', BinaryPortClick, PortInConfig,
+             ['off', 'single', 'double', 'long', 'OFF/7', 'single/8',
+              'SINGLE', 'LONG/9', 'off/', 'busy', 'double/10']),
+    PortSpec('count', BinaryPortCount, PortInConfig,
+             ['OFF/7', 'ON/12', 'OFF', 'ON/', 'busy', 'OFF/13']),
+    PortSpec('analog', AnalogSensor, AnalogPortConfig,
+             ['224', '0', 'busy', 'off', 'x', '1023']),
+    PortSpec('dht', DHTSensorPort, DHTSensorConfig,
+             ['temp:24/hum:43', 'temp:NA/hum:40', '25/38', 'busy',
+              'temp:24.5/hum:41', 'off', 'temp:24.5/hum:41']),
+    PortSpec('one_wire', OneWireSensorPort, OneWireSensorConfig,
+             ['temp:24.5', 'temp:NA', '25', 'busy', 'temp:-3.25', 'off']),
+]
+
+
+def observe(port) -> tuple:
+    """Наблюдаемое состояние порта без времени приёма показаний."""
+    readings = {
+        key: (reading.value, reading.quality)
+        for key, reading in getattr(port, 'readings', {}).items()
+    }
+    return port.state, getattr(port, 'count', None), readings
+
+
+def apply_decoded(port, decoded: dict, slots: list[str]):
+    """Применяет результат StatusParser.parse, как MegaD.update_port_job."""
+    slot = port.conf.id
+    if slot not in decoded:
+        return
+    if decoded[slot] is not None:
+        port.set_decoded(decoded[slot])
+    elif slots[slot]:
+        port.update_state(slots[slot])
+
+
+@pytest.mark.parametrize('spec', SPECS, ids=lambda spec: spec.name)
+def test_decoder_matches_update_state(spec):
+    reference = spec.make()
+    port = spec.make()
+    decoder = get_decoder(port)
+    assert decoder is not None
+    for text in spec.samples:
+        reference.update_state(text)
+        value = decoder(text)
+        if value is None:
+            port.update_state(text)
+        else:
+            port.set_decoded(value)
+        assert observe(port) == observe(reference), text
+
+
+def test_parser_matches_update_state():
+    references = [spec.make(i) for i, spec in enumerate(SPECS)]
+    ports = [spec.make(i) for i, spec in enumerate(SPECS)]
+    parser = StatusParser(ports)
+    assert len(parser) == len(ports)
+    steps = max(len(spec.samples) for spec in SPECS)
+    lines = [
+        [spec.samples[step % len(spec.samples)] for spec in SPECS]
+        for step in range(steps)
+    ]
+    # Повтор строк проверяет пропуск неизменившихся позиций
+    for slots in lines + lines[-1:] + lines:
+        for reference, text in zip(references, slots):
+            reference.update_state(text)
+        decoded = parser.parse(slots)
+        for port in ports:
+            apply_decoded(port, decoded, slots)
+        for port, reference in zip(ports, references):
+            assert observe(port) == observe(reference), (port, slots)
+
+
+def test_unchanged_slots_are_not_decoded():
+    ports = [spec.make(i) for i, spec in enumerate(SPECS)]
+    parser = StatusParser(ports)
+    slots = [spec.samples[0] for spec in SPECS]
+    assert set(parser.parse(slots)) == set(range(len(SPECS)))
+    assert parser.parse(slots) == {}
+    parser.forget(0)
+    assert set(parser.parse(slots)) == {0}